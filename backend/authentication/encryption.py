@@ -1,6 +1,18 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from sqlalchemy.util import await_only
+
+from backend.config import BCRYPT_ROUNDS, DB_ASYNC, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+password_pool: ProcessPoolExecutor | None = None
+password_pool_lock = threading.Lock()
+password_tasks_in_flight = 0
 
 def hash_password(password:str) -> str:
     return pwd_context.hash(password)
@@ -8,3 +20,43 @@ def hash_password(password:str) -> str:
 def verify_password(password:str, hashed_password: str) -> bool:
     return pwd_context.verify(password,hashed_password)
 
+def hash_password_in_pool(password: str) -> str:
+    return run_in_password_pool(hash_password, password)
+
+def verify_password_in_pool(password: str, hashed_password: str) -> bool:
+    return run_in_password_pool(verify_password, password, hashed_password)
+
+# bcrypt is CPU bound, so it runs in a bounded process pool instead of pinning request workers.
+# When more than workers + queue limit calls are in flight the request fails fast with a 503.
+# Called from controllers through run_db: in async mode this runs in a greenlet, so the wait
+# is handed back to the event loop with await_only, otherwise it blocks the threadpool thread.
+def run_in_password_pool(function, *args):
+    global password_pool, password_tasks_in_flight
+    if PASSWORD_HASH_WORKERS <= 0:
+        return function(*args)
+
+    with password_pool_lock:
+        if password_tasks_in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again later",
+                headers={"Retry-After": "1"},
+            )
+        if password_pool is None:
+            password_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        password_tasks_in_flight += 1
+    try:
+        future = password_pool.submit(function, *args)
+        if DB_ASYNC:
+            return await_only(asyncio.wrap_future(future))
+        return future.result()
+    finally:
+        with password_pool_lock:
+            password_tasks_in_flight -= 1
+
+def shutdown_password_pool():
+    global password_pool
+    with password_pool_lock:
+        if password_pool is not None:
+            password_pool.shutdown(cancel_futures=True)
+            password_pool = None
@@ -1,3 +1,6 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta, UTC
 
 import jwt
@@ -5,11 +8,16 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 
-from backend.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
+from backend.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, \
+    TOKEN_CACHE_SIZE
 from backend.schemas.authentication import TokenData
+from backend.utils.cache_utils import TTLCache, MISSING
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='login')
 
+# decoded access tokens keyed by a digest of the token, each kept until its own exp
+token_cache = TTLCache(max_size=TOKEN_CACHE_SIZE, ttl_seconds=0)
+
 def create_access_token(data: dict) -> str :
     to_encode = data.copy()
     expire = datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -20,7 +28,7 @@ def create_access_token(data: dict) -> str :
 def create_refresh_token(data: dict) -> str :
     to_encode = data.copy()
     expire = datetime.now(UTC) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -41,7 +49,14 @@ def verify_token(token: str, exception_message: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"}
         )
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData :
+# FastAPI already resolves this once per request however many dependencies share it,
+# the cache saves the signature check across requests made with the same token.
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData :
+    token_digest = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(token_digest)
+    if token_data is not MISSING:
+        return token_data
+
     payload = verify_token(token, "Authorization token is missing")
     user_id = payload.get("sub")
     user_roles = payload.get("roles")
@@ -51,6 +66,9 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData :
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return TokenData(id=user_id, roles=user_roles)
+    token_data = TokenData(id=user_id, roles=user_roles)
+    if "exp" in payload:
+        token_cache.set(token_digest, token_data, ttl_seconds=payload["exp"] - time.time())
+    return token_data
 
 
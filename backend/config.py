@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -10,3 +11,65 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
 BACK_DOMAIN = os.getenv("BACK_DOMAIN")
 BACK_PORT = int(os.getenv("BACK_PORT"))
+
+# when enabled requests run on an asyncio engine (asyncpg / aiosqlite) instead of the sync threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+MEMBERSHIP_CACHE_SIZE = int(os.getenv("MEMBERSHIP_CACHE_SIZE", "10000"))
+MEMBERSHIP_CACHE_TTL_SECONDS = float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "60"))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_POOL_SLOW_CHECKOUT_MS = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", "100"))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 hashes inline in the request worker instead of using the process pool
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "16"))
+
+REVOKED_TOKEN_CACHE_SIZE = int(os.getenv("REVOKED_TOKEN_CACHE_SIZE", "100000"))
+REVOKED_TOKEN_PURGE_INTERVAL_SECONDS = float(os.getenv("REVOKED_TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
+# the board stats counters are rebuilt from the task table this often to repair any drift
+TASK_COUNT_REBUILD_INTERVAL_SECONDS = float(os.getenv("TASK_COUNT_REBUILD_INTERVAL_SECONDS", "3600"))
+# a deleted board's rows are removed this many tasks per transaction, so no lock is held for long
+BOARD_PURGE_BATCH_SIZE = int(os.getenv("BOARD_PURGE_BATCH_SIZE", "1000"))
+# boards whose purge was interrupted, by a restart for instance, are picked up again this often
+BOARD_PURGE_INTERVAL_SECONDS = float(os.getenv("BOARD_PURGE_INTERVAL_SECONDS", "3600"))
+# a purge claim that has not been renewed for this long is taken to belong to a purge that died
+BOARD_PURGE_CLAIM_TIMEOUT_SECONDS = float(os.getenv("BOARD_PURGE_CLAIM_TIMEOUT_SECONDS", "600"))
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+# "memory" keeps serialized responses per process, "sqlite" shares them between the workers of a host
+# through RESPONSE_CACHE_PATH, "none" disables the cache
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH",
+                                os.path.join(tempfile.gettempdir(), "taskflow-response-cache.sqlite3"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+
+# a list is rebalanced in the background once a move or insert produces a rank longer than this
+RANK_REBALANCE_LENGTH = int(os.getenv("RANK_REBALANCE_LENGTH", "12"))
+
+# applies pending schema migrations when the app starts; disable to run them with the migrations CLI instead
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").lower() == "true"
+
+# "memory" delivers board events to the subscribers of the publishing process only, "sqlite" relays them
+# between the workers of a host through EVENT_BACKEND_PATH
+EVENT_BACKEND = os.getenv("EVENT_BACKEND", "memory")
+EVENT_BACKEND_PATH = os.getenv("EVENT_BACKEND_PATH", os.path.join(tempfile.gettempdir(), "taskflow-events.sqlite3"))
+EVENT_POLL_INTERVAL_SECONDS = float(os.getenv("EVENT_POLL_INTERVAL_SECONDS", "0.1"))
+EVENT_RETENTION_SECONDS = float(os.getenv("EVENT_RETENTION_SECONDS", "60"))
+# events a subscriber may fall behind by before they are dropped and it is told to resync
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+# idle streams get a keepalive this often so proxies keep them open and dead clients are noticed
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+
+# activity rows are inserted in batches of this size, or every ACTIVITY_FLUSH_INTERVAL_SECONDS if fewer are waiting
+ACTIVITY_BATCH_SIZE = int(os.getenv("ACTIVITY_BATCH_SIZE", "500"))
+ACTIVITY_FLUSH_INTERVAL_SECONDS = float(os.getenv("ACTIVITY_FLUSH_INTERVAL_SECONDS", "1"))
+# activity rows waiting to be written beyond this are dropped
+ACTIVITY_QUEUE_LIMIT = int(os.getenv("ACTIVITY_QUEUE_LIMIT", "100000"))
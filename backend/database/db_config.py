@@ -1,9 +1,13 @@
 import os
 
 from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine
 
 from backend.authentication.encryption import hash_password
+from backend.config import DB_ASYNC, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS, DB_POOL_RECYCLE_SECONDS, \
+    DB_POOL_PRE_PING
+from backend.database.db_pool import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool
 
 load_dotenv()
 
@@ -12,7 +16,24 @@ postgres_password = os.getenv("POSTGRES_PASSWORD")
 postgres_host = os.getenv("POSTGRES_HOST")
 postgres_port = os.getenv("POSTGRES_PORT")
 postgres_db = os.getenv("POSTGRES_DB")
-postgres_url = f"postgresql://{postgres_user}:{postgres_password}@{postgres_host}:{postgres_port}/{postgres_db}"
-engine = create_engine(postgres_url)
+postgres_url = os.getenv(
+    "DATABASE_URL",
+    f"postgresql://{postgres_user}:{postgres_password}@{postgres_host}:{postgres_port}/{postgres_db}"
+)
+async_postgres_url = os.getenv(
+    "ASYNC_DATABASE_URL",
+    f"postgresql+asyncpg://{postgres_user}:{postgres_password}@{postgres_host}:{postgres_port}/{postgres_db}"
+)
+pool_options = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+    "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+engine = create_engine(postgres_url, poolclass=InstrumentedQueuePool, **pool_options)
+async_engine = create_async_engine(
+    async_postgres_url, poolclass=InstrumentedAsyncAdaptedQueuePool, **pool_options
+) if DB_ASYNC else None
 admin_email = os.getenv("ADMIN_EMAIL")
 admin_password = hash_password(os.getenv("ADMIN_PASSWORD"))
\ No newline at end of file
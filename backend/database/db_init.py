@@ -1,12 +1,14 @@
 from sqlmodel import SQLModel, select, Session
 
 from backend.database.db_config import engine, admin_email, admin_password
+from backend.database.migrations import run_migrations
+from backend.database.migrations.runner import schema_version
 from backend.models.role import Role, RolesEnum
 from backend.models.user import User
 
 
 def create_tables():
-    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
 
 def initialize_roles_and_permissions():
     with Session(engine) as db:
@@ -32,6 +34,7 @@ def delete_database():
         confirmation = input("WARNING: This will delete all tables in the database. Are you sure? (yes/no): ").strip().lower()
         if confirmation == "yes":
             SQLModel.metadata.drop_all(engine)
+            schema_version.drop(engine, checkfirst=True)
             print("All tables have been deleted successfully.")
         else:
             print("Operation canceled. No tables were deleted.")
@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from backend.config import DB_POOL_SLOW_CHECKOUT_MS
+
+logger = logging.getLogger(__name__)
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait_ms: float, overflowed: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if overflowed:
+                self.overflow_checkouts += 1
+            if wait_ms > DB_POOL_SLOW_CHECKOUT_MS:
+                self.slow_checkouts += 1
+            for index, bucket in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bucket:
+                    self.wait_buckets[index] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={bucket}ms" for bucket in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "average_wait_ms": self.total_wait_ms / self.checkouts if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait_ms,
+                "wait_histogram": dict(zip(labels, self.wait_buckets)),
+            }
+
+
+class InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            logger.warning("Timed out waiting for a database connection: %s", self.status())
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        # _overflow counts up from -pool_size, so it only goes positive past the pool size
+        overflowed = self._overflow > overflow_before and self._overflow > 0
+        self.stats.record_checkout(wait_ms=wait_ms, overflowed=overflowed)
+        if wait_ms > DB_POOL_SLOW_CHECKOUT_MS:
+            logger.warning("Waited %.1f ms for a database connection: %s", wait_ms, self.status())
+        return connection
+
+    def pool_stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            **self.stats.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
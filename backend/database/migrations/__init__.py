@@ -0,0 +1 @@
+from backend.database.migrations.runner import MIGRATIONS, run_migrations, get_current_version, get_pending_migrations
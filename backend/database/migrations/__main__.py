@@ -0,0 +1,31 @@
+# python -m backend.database.migrations [upgrade|status]
+import argparse
+import logging
+
+from backend.database.db_config import engine
+from backend.database.migrations.runner import MIGRATIONS, get_current_version, get_pending_migrations, \
+    run_migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or inspect database schema migrations")
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "status":
+        with engine.connect() as connection:
+            current = get_current_version(connection)
+            pending = get_pending_migrations(connection)
+            connection.commit()
+        print(f"Current version: {current} (latest {MIGRATIONS[-1].VERSION})")
+        for migration in pending:
+            print(f"  pending {migration.VERSION:04d}: {migration.DESCRIPTION}")
+        return
+
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s)" if applied else "Database is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+# Every helper checks the live schema first, so a migration can run against a database created by
+# create_all from newer models as well as one that predates the change.
+
+
+def _quote(connection: Connection, name: str) -> str:
+    return connection.dialect.identifier_preparer.quote(name)
+
+def has_table(connection: Connection, table: str) -> bool:
+    return inspect(connection).has_table(table)
+
+def has_column(connection: Connection, table: str, column: str) -> bool:
+    return any(existing["name"] == column for existing in inspect(connection).get_columns(table))
+
+def has_index(connection: Connection, table: str, index: str) -> bool:
+    return any(existing["name"] == index for existing in inspect(connection).get_indexes(table))
+
+def add_column(connection: Connection, table: str, column: str, column_type: str) -> bool:
+    if has_column(connection, table, column):
+        return False
+    connection.exec_driver_sql(
+        f"ALTER TABLE {_quote(connection, table)} ADD COLUMN {_quote(connection, column)} {column_type}"
+    )
+    return True
+
+def drop_column(connection: Connection, table: str, column: str) -> None:
+    if has_column(connection, table, column):
+        connection.exec_driver_sql(f"ALTER TABLE {_quote(connection, table)} DROP COLUMN {_quote(connection, column)}")
+
+def set_not_null(connection: Connection, table: str, column: str) -> None:
+    # SQLite cannot alter a column constraint in place; the models still never write NULL there
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(
+            f"ALTER TABLE {_quote(connection, table)} ALTER COLUMN {_quote(connection, column)} SET NOT NULL"
+        )
+
+def drop_not_null(connection: Connection, table: str, column: str) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(
+            f"ALTER TABLE {_quote(connection, table)} ALTER COLUMN {_quote(connection, column)} DROP NOT NULL"
+        )
+
+def drop_foreign_key(connection: Connection, table: str, column: str) -> None:
+    # SQLite does not enforce foreign keys unless asked to, and cannot drop one without rebuilding the table
+    if connection.dialect.name != "postgresql":
+        return
+    for foreign_key in inspect(connection).get_foreign_keys(table):
+        if foreign_key["constrained_columns"] == [column]:
+            connection.exec_driver_sql(
+                f"ALTER TABLE {_quote(connection, table)} DROP CONSTRAINT {_quote(connection, foreign_key['name'])}"
+            )
+
+def create_index(connection: Connection, table: str, index: str, columns: list[str], unique: bool = False) -> None:
+    column_list = ", ".join(_quote(connection, column) for column in columns)
+    connection.exec_driver_sql(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {_quote(connection, index)} "
+        f"ON {_quote(connection, table)} ({column_list})"
+    )
+
+def drop_index(connection: Connection, index: str) -> None:
+    connection.exec_driver_sql(f"DROP INDEX IF EXISTS {_quote(connection, index)}")
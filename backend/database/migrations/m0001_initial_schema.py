@@ -0,0 +1,15 @@
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+import backend.models  # registers every table on SQLModel.metadata
+from backend.utils.search_utils import create_search_indexes
+
+VERSION = 1
+DESCRIPTION = "Create the tables and search indexes"
+
+
+# create_all only adds missing tables, so on a fresh database this builds the current schema and on a
+# database from before migrations it leaves the existing tables to the migrations that follow
+def upgrade(connection: Connection) -> None:
+    SQLModel.metadata.create_all(connection)
+    create_search_indexes(connection)
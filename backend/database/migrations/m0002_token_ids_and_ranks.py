@@ -0,0 +1,44 @@
+import hashlib
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import add_column, drop_column, drop_index, create_index, has_column, \
+    set_not_null
+from backend.utils.rank_utils import ranks_between
+
+VERSION = 2
+DESCRIPTION = "Key revoked tokens by id and add task and list ranks"
+
+
+def _backfill_ranks(connection: Connection, table: str, scope_column: str) -> None:
+    rows = connection.execute(text(f"SELECT id, {scope_column} FROM {table} ORDER BY {scope_column}, id")).all()
+    ids_by_scope: dict[int, list[int]] = {}
+    for row_id, scope_id in rows:
+        ids_by_scope.setdefault(scope_id, []).append(row_id)
+    for ids in ids_by_scope.values():
+        ranks = ranks_between(None, None, count=len(ids))
+        connection.execute(text(f"UPDATE {table} SET rank = :rank WHERE id = :id"),
+                           [{"id": row_id, "rank": rank} for row_id, rank in zip(ids, ranks)])
+
+def upgrade(connection: Connection) -> None:
+    # Revocations used to store the whole token. Its sha256 is the id get_token_id gives tokens
+    # without a jti, which all tokens issued before jti existed are, so existing revocations still apply.
+    if has_column(connection, "blacklistedtoken", "token"):
+        add_column(connection, "blacklistedtoken", "jti", "VARCHAR")
+        rows = connection.execute(text("SELECT id, token FROM blacklistedtoken")).all()
+        if rows:
+            connection.execute(text("UPDATE blacklistedtoken SET jti = :jti WHERE id = :id"),
+                               [{"id": row_id, "jti": hashlib.sha256(token.encode()).hexdigest()}
+                                for row_id, token in rows])
+        drop_index(connection, "ix_blacklistedtoken_token")
+        drop_column(connection, "blacklistedtoken", "token")
+        set_not_null(connection, "blacklistedtoken", "jti")
+    create_index(connection, "blacklistedtoken", "ix_blacklistedtoken_jti", ["jti"], unique=True)
+    create_index(connection, "blacklistedtoken", "ix_blacklistedtoken_expires_at", ["expires_at"])
+
+    for table, scope_column in (("task", "list_id"), ("tasklist", "board_id")):
+        if add_column(connection, table, "rank", "VARCHAR"):
+            _backfill_ranks(connection, table, scope_column)
+            set_not_null(connection, table, "rank")
+        create_index(connection, table, f"ix_{table}_{scope_column}_rank", [scope_column, "rank"])
@@ -0,0 +1,22 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import create_index
+
+VERSION = 3
+DESCRIPTION = "Index user email, invitation lookups, board members and tag names"
+
+
+def upgrade(connection: Connection) -> None:
+    duplicates = connection.execute(
+        text('SELECT email FROM "user" GROUP BY email HAVING count(*) > 1 LIMIT 5')
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"Cannot make user email unique, duplicated emails: {', '.join(duplicates)}")
+    create_index(connection, "user", "ix_user_email", ["email"], unique=True)
+    create_index(connection, "invitation", "ix_invitation_invited_user_id_status", ["invited_user_id", "status"])
+    create_index(connection, "invitation", "ix_invitation_board_id_invited_user_id_status",
+                 ["board_id", "invited_user_id", "status"])
+    create_index(connection, "tasktag", "ix_tasktag_name", ["name"])
+    # the primary key leads with user_id, so listing the members of a board scanned the whole table
+    create_index(connection, "userboardlink", "ix_userboardlink_board_id", ["board_id"])
@@ -0,0 +1,12 @@
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import create_index
+
+VERSION = 4
+DESCRIPTION = "Index task filters and sorts within a board"
+
+
+def upgrade(connection: Connection) -> None:
+    create_index(connection, "task", "ix_task_board_id_status_due_date", ["board_id", "status", "due_date"])
+    create_index(connection, "task", "ix_task_board_id_priority", ["board_id", "priority"])
+    create_index(connection, "task", "ix_task_board_id_due_date", ["board_id", "due_date"])
@@ -0,0 +1,14 @@
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from backend.models.task_count import TaskCount
+from backend.utils.stats_utils import rebuild_task_counts
+
+VERSION = 5
+DESCRIPTION = "Add the board stats counters"
+
+
+def upgrade(connection: Connection) -> None:
+    TaskCount.__table__.create(connection, checkfirst=True)
+    with Session(bind=connection, join_transaction_mode="create_savepoint") as db:
+        rebuild_task_counts(db)
@@ -0,0 +1,10 @@
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import add_column
+
+VERSION = 6
+DESCRIPTION = "Add the board version used for ETags"
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "board", "version", "INTEGER NOT NULL DEFAULT 0")
@@ -0,0 +1,10 @@
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import add_column
+
+VERSION = 7
+DESCRIPTION = "Add the user boards version used to key cached board lists"
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "user", "boards_version", "INTEGER NOT NULL DEFAULT 0")
@@ -0,0 +1,50 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import add_column, create_index, drop_foreign_key, drop_index, \
+    drop_not_null, set_not_null
+from backend.models.activity import TaskActivity
+
+VERSION = 8
+DESCRIPTION = "Record the board and list of task activities and index the activity feeds"
+
+
+def _task_id_is_nullable(connection: Connection) -> bool:
+    return next(column["nullable"] for column in inspect(connection).get_columns("taskactivity")
+                if column["name"] == "task_id")
+
+# SQLite cannot drop NOT NULL in place, so the table is rebuilt from the model and its rows copied over
+def _rebuild_sqlite_table(connection: Connection) -> None:
+    drop_index(connection, "ix_taskactivity_task_id")
+    drop_index(connection, "ix_taskactivity_user_id")
+    connection.exec_driver_sql("ALTER TABLE taskactivity RENAME TO taskactivity_old")
+    TaskActivity.__table__.create(connection)
+    connection.execute(text(
+        "INSERT INTO taskactivity (id, action, description, timestamp, user_id, board_id, list_id, task_id) "
+        "SELECT activity.id, 'task.updated', activity.description, activity.timestamp, activity.user_id, "
+        "task.board_id, task.list_id, activity.task_id "
+        "FROM taskactivity_old AS activity JOIN task ON task.id = activity.task_id"
+    ))
+    connection.exec_driver_sql("DROP TABLE taskactivity_old")
+
+def upgrade(connection: Connection) -> None:
+    if connection.dialect.name == "sqlite":
+        if not _task_id_is_nullable(connection):
+            _rebuild_sqlite_table(connection)
+    else:
+        if add_column(connection, "taskactivity", "action", "VARCHAR"):
+            connection.execute(text("UPDATE taskactivity SET action = 'task.updated'"))
+            set_not_null(connection, "taskactivity", "action")
+        add_column(connection, "taskactivity", "list_id", "INTEGER")
+        if add_column(connection, "taskactivity", "board_id", "INTEGER"):
+            connection.execute(text(
+                "UPDATE taskactivity SET board_id = task.board_id, list_id = task.list_id "
+                "FROM task WHERE task.id = taskactivity.task_id"
+            ))
+            set_not_null(connection, "taskactivity", "board_id")
+        # activities are written after the change is committed, including the deletion of their task
+        drop_foreign_key(connection, "taskactivity", "task_id")
+        drop_not_null(connection, "taskactivity", "task_id")
+        drop_index(connection, "ix_taskactivity_task_id")
+    create_index(connection, "taskactivity", "ix_taskactivity_task_id_timestamp", ["task_id", "timestamp"])
+    create_index(connection, "taskactivity", "ix_taskactivity_board_id_timestamp", ["board_id", "timestamp"])
@@ -0,0 +1,18 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import add_column, create_index, drop_index
+
+VERSION = 9
+DESCRIPTION = "Add task comment counts and index comments by task and creation time"
+
+
+def upgrade(connection: Connection) -> None:
+    if add_column(connection, "task", "comment_count", "INTEGER NOT NULL DEFAULT 0"):
+        connection.execute(text(
+            "UPDATE task SET comment_count = (SELECT count(*) FROM taskcomment WHERE taskcomment.task_id = task.id) "
+            "WHERE EXISTS (SELECT 1 FROM taskcomment WHERE taskcomment.task_id = task.id)"
+        ))
+    create_index(connection, "taskcomment", "ix_taskcomment_task_id_created_at", ["task_id", "created_at"])
+    # the composite index leads with task_id, so it serves every lookup the single column one did
+    drop_index(connection, "ix_taskcomment_task_id")
@@ -0,0 +1,62 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import add_column, create_index, drop_index, set_not_null
+
+VERSION = 10
+DESCRIPTION = "Scope tags to a board, count their usage and index the tasks of a tag"
+
+
+# A global tag is kept for the first board whose tasks carry it and copied for every other one, then
+# tags that end up with the same name on a board are merged. Tags no task carries belong to no board
+# and are dropped.
+def _assign_tags_to_boards(connection: Connection) -> None:
+    pairs = connection.execute(text(
+        "SELECT DISTINCT link.tag_id, task.board_id FROM tasktaglink AS link JOIN task ON task.id = link.task_id "
+        "ORDER BY link.tag_id, task.board_id"
+    )).all()
+    assigned = set()
+    for tag_id, board_id in pairs:
+        if tag_id not in assigned:
+            assigned.add(tag_id)
+            connection.execute(text("UPDATE tasktag SET board_id = :board_id WHERE id = :tag_id"),
+                               {"board_id": board_id, "tag_id": tag_id})
+            continue
+        copy_id = connection.execute(text(
+            "INSERT INTO tasktag (name, board_id, usage_count) SELECT name, :board_id, 0 FROM tasktag "
+            "WHERE id = :tag_id RETURNING id"
+        ), {"board_id": board_id, "tag_id": tag_id}).scalar_one()
+        connection.execute(text(
+            "UPDATE tasktaglink SET tag_id = :copy_id WHERE tag_id = :tag_id "
+            "AND task_id IN (SELECT id FROM task WHERE board_id = :board_id)"
+        ), {"copy_id": copy_id, "tag_id": tag_id, "board_id": board_id})
+    connection.execute(text("DELETE FROM tasktag WHERE board_id IS NULL"))
+
+    duplicates = connection.execute(text(
+        "SELECT tag.id, keep.id FROM tasktag AS tag JOIN tasktag AS keep "
+        "ON keep.board_id = tag.board_id AND keep.name = tag.name AND keep.id < tag.id "
+        "WHERE NOT EXISTS (SELECT 1 FROM tasktag AS older WHERE older.board_id = tag.board_id "
+        "AND older.name = tag.name AND older.id < keep.id)"
+    )).all()
+    for tag_id, keep_id in duplicates:
+        connection.execute(text(
+            "DELETE FROM tasktaglink WHERE tag_id = :tag_id "
+            "AND task_id IN (SELECT task_id FROM tasktaglink WHERE tag_id = :keep_id)"
+        ), {"tag_id": tag_id, "keep_id": keep_id})
+        connection.execute(text("UPDATE tasktaglink SET tag_id = :keep_id WHERE tag_id = :tag_id"),
+                           {"tag_id": tag_id, "keep_id": keep_id})
+        connection.execute(text("DELETE FROM tasktag WHERE id = :tag_id"), {"tag_id": tag_id})
+
+def upgrade(connection: Connection) -> None:
+    added_usage_count = add_column(connection, "tasktag", "usage_count", "INTEGER NOT NULL DEFAULT 0")
+    if add_column(connection, "tasktag", "board_id", "INTEGER REFERENCES board (id)"):
+        _assign_tags_to_boards(connection)
+    set_not_null(connection, "tasktag", "board_id")
+    if added_usage_count:
+        connection.execute(text(
+            "UPDATE tasktag SET usage_count = (SELECT count(*) FROM tasktaglink WHERE tasktaglink.tag_id = tasktag.id)"
+        ))
+    # names are now unique per board rather than looked up globally
+    create_index(connection, "tasktag", "ix_tasktag_board_id_name", ["board_id", "name"], unique=True)
+    drop_index(connection, "ix_tasktag_name")
+    create_index(connection, "tasktaglink", "ix_tasktaglink_tag_id_task_id", ["tag_id", "task_id"])
@@ -0,0 +1,10 @@
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import create_index
+
+VERSION = 11
+DESCRIPTION = "Index the tasks assigned to a user"
+
+
+def upgrade(connection: Connection) -> None:
+    create_index(connection, "taskuserlink", "ix_taskuserlink_user_id_task_id", ["user_id", "task_id"])
@@ -0,0 +1,11 @@
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import add_column, create_index
+
+VERSION = 12
+DESCRIPTION = "Mark deleted boards until their rows are purged"
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "board", "deleted_at", "TIMESTAMP")
+    create_index(connection, "board", "ix_board_deleted_at", ["deleted_at"])
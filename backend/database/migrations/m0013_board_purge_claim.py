@@ -0,0 +1,10 @@
+from sqlalchemy.engine import Connection
+
+from backend.database.migrations.helpers import add_column
+
+VERSION = 13
+DESCRIPTION = "Claim deleted boards so that only one worker purges each"
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "board", "purge_started_at", "TIMESTAMP")
@@ -0,0 +1,82 @@
+import logging
+from types import ModuleType
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from backend.database.migrations import m0001_initial_schema, m0002_token_ids_and_ranks, m0003_hot_path_indexes, \
+    m0004_task_filter_indexes, m0005_task_counts, m0006_board_version, \
+    m0007_user_boards_version, m0008_task_activity_trail, m0009_task_comment_counts, \
+    m0010_board_scoped_tags, m0011_task_assignee_index, m0012_board_deletion, \
+    m0013_board_purge_claim
+from backend.utils.time_utils import utc_now
+
+logger = logging.getLogger(__name__)
+
+# Applied in order, each exactly once. A new migration gets the next VERSION and is appended here.
+MIGRATIONS: list[ModuleType] = [
+    m0001_initial_schema,
+    m0002_token_ids_and_ranks,
+    m0003_hot_path_indexes,
+    m0004_task_filter_indexes,
+    m0005_task_counts,
+    m0006_board_version,
+    m0007_user_boards_version,
+    m0008_task_activity_trail,
+    m0009_task_comment_counts,
+    m0010_board_scoped_tags,
+    m0011_task_assignee_index,
+    m0012_board_deletion,
+    m0013_board_purge_claim,
+]
+
+# Kept off SQLModel.metadata so create_all in the initial migration never touches it
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Arbitrary key for the Postgres advisory lock that serializes workers starting at the same time
+MIGRATION_LOCK_ID = 7_301_001
+
+
+def get_applied_versions(connection: Connection) -> set[int]:
+    schema_version.create(connection, checkfirst=True)
+    return set(connection.execute(select(schema_version.c.version)).scalars())
+
+def get_pending_migrations(connection: Connection) -> list[ModuleType]:
+    applied = get_applied_versions(connection)
+    return [migration for migration in MIGRATIONS if migration.VERSION not in applied]
+
+def get_current_version(connection: Connection) -> int:
+    schema_version.create(connection, checkfirst=True)
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def run_migrations(engine: Engine) -> list[int]:
+    applied = []
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+            connection.commit()
+        try:
+            pending = get_pending_migrations(connection)
+            connection.commit()
+            for migration in pending:
+                logger.info("Applying migration %04d: %s", migration.VERSION, migration.DESCRIPTION)
+                try:
+                    migration.upgrade(connection)
+                    connection.execute(insert(schema_version).values(
+                        version=migration.VERSION, description=migration.DESCRIPTION, applied_at=utc_now()
+                    ))
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+                applied.append(migration.VERSION)
+        finally:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+                connection.commit()
+    return applied
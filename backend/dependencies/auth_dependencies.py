@@ -5,7 +5,7 @@ from backend.schemas.authentication import TokenData
 
 
 def require_role(required_roles: list[str]):
-    def role_checker(active_user: TokenData = Depends(get_current_user)):
+    async def role_checker(active_user: TokenData = Depends(get_current_user)):
         if not set(required_roles).issubset(set(active_user.roles)):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
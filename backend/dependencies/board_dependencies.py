@@ -1,40 +1,110 @@
-from typing import List
-from fastapi import Depends, HTTPException, status
-from sqlmodel import Session, select
+from typing import List, Optional
+from fastapi import Depends, Header, HTTPException, Query, Response, WebSocket, WebSocketException, status
+from sqlmodel import Session
 
 from backend.authentication.jwt_handler import get_current_user
-from backend.dependencies.db_dependencies import get_db
-from backend.models.relationships import UserBoardLink
+from backend.dependencies.db_dependencies import get_db, run_db, open_db
 from backend.schemas.authentication import TokenData
-from backend.utils.board_utils import get_board_by_id
-from backend.utils.role_utils import get_role_by_name
+from backend.utils.board_utils import get_board_by_id, get_user_board_role_id, get_board_version, \
+    get_user_board_link
+from backend.utils.role_utils import get_role_id_by_name
 
 
-def require_board_role(required_roles: list[str]):
-    def role_checker(board_id: int, active_user: TokenData = Depends(get_current_user), db: Session = Depends(get_db)):
-        db_board = get_board_by_id(board_id=board_id, db=db)
-        if not db_board:
+def check_board_role(board_id: int, required_roles: list[str], active_user: TokenData, db: Session) -> TokenData:
+    role_ids = []
+    for role in required_roles:
+        role_id = get_role_id_by_name(role_name=role, db=db)
+        if not role_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Role {role} does not exist")
+        role_ids.append(role_id)
+
+    user_role_id = get_user_board_role_id(board_id=board_id, user_id=active_user.id, db=db)
+    if user_role_id is None:
+        if not get_board_by_id(board_id=board_id, db=db):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board does not exist")
-        role_ids = []
-        for role in required_roles:
-            db_role = get_role_by_name(role_name=role, db=db)
-            if not db_role:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Role {role} does not exist")
-            role_ids.append(db_role.id)
-        statement = select(UserBoardLink).where(
-            (UserBoardLink.user_id == active_user.id) & (UserBoardLink.board_id == board_id)
-        )
-        user_board_link = db.exec(statement).first()
-        if not user_board_link:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not assigned to this board")
-        if user_board_link.role_id not in role_ids:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User does not have the required role")
-
-        return active_user
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not assigned to this board")
+    if user_role_id not in role_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User does not have the required role")
+
+    return active_user
+
+
+# Every response of a board read is derived from the board's version, so a client that already holds the
+# current one gets a 304 after a single primary key lookup, before any row is loaded or serialized
+def check_board_etag(board_id: int, if_none_match: Optional[str], db: Session) -> str:
+    etag = f'"{board_id}-{get_board_version(board_id=board_id, db=db)}"'
+    if if_none_match:
+        client_etags = {client_etag.strip().removeprefix("W/") for client_etag in if_none_match.split(",")}
+        if etag in client_etags or "*" in client_etags:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return etag
+
+def check_board_role_and_etag(board_id: int, required_roles: list[str], active_user: TokenData,
+                              if_none_match: Optional[str], db: Session) -> str:
+    check_board_role(board_id=board_id, required_roles=required_roles, active_user=active_user, db=db)
+    return check_board_etag(board_id=board_id, if_none_match=if_none_match, db=db)
+
+
+def require_board_role(required_roles: list[str], etag: bool = False):
+    async def role_checker(board_id: int, active_user: TokenData = Depends(get_current_user), db: Session = Depends(get_db)):
+        return await run_db(check_board_role, board_id=board_id, required_roles=required_roles,
+                            active_user=active_user, db=db)
+
+    async def role_and_etag_checker(board_id: int, response: Response,
+                                    if_none_match: Optional[str] = Header(default=None),
+                                    active_user: TokenData = Depends(get_current_user),
+                                    db: Session = Depends(get_db)):
+        etag = await run_db(check_board_role_and_etag, board_id=board_id, required_roles=required_roles,
+                            active_user=active_user, if_none_match=if_none_match, db=db)
+        response.headers["ETag"] = etag
+        return etag
+
+    return role_and_etag_checker if etag else role_checker
+
+
+# Browsers cannot set headers on a WebSocket handshake, so the token may also come as ?token=.
+# The session is released once the check is done, a socket can stay open for hours.
+def require_board_role_websocket(required_roles: list[str]):
+    async def role_checker(board_id: int, websocket: WebSocket, token: Optional[str] = Query(default=None)):
+        scheme, _, credentials = websocket.headers.get("Authorization", "").partition(" ")
+        token = token or (credentials if scheme.lower() == "bearer" else None)
+        try:
+            if not token:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+            active_user = await get_current_user(token)
+            async with open_db() as db:
+                return await run_db(check_board_role, board_id=board_id, required_roles=required_roles,
+                                    active_user=active_user, db=db)
+        except HTTPException as error:
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=error.detail)
 
     return role_checker
 
 
+# For long-lived streams: reads the membership itself rather than the membership cache, since the
+# change may have been made by another worker
+def has_board_role(board_id: int, required_roles: list[str], user_id: int, db: Session) -> bool:
+    board_user_link = get_user_board_link(board_id=board_id, user_id=user_id, db=db)
+    return board_user_link is not None and board_user_link.role_id in {
+        get_role_id_by_name(role_name=role, db=db) for role in required_roles
+    }
+
+def watch_board_role(board_id: int, required_roles: list[str], user_id: int):
+    async def has_access() -> bool:
+        async with open_db() as db:
+            return await run_db(has_board_role, board_id=board_id, required_roles=required_roles, user_id=user_id,
+                                db=db)
+
+    return has_access
+
+
+def check_board_role_name(role_name: Optional[str], required_roles: list[str]):
+    if role_name is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not assigned to this board")
+    if role_name not in required_roles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User does not have the required role")
+
+
 def owner_roles() -> List[str]:
     return ["owner"]
 
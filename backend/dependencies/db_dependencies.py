@@ -1,8 +1,45 @@
+from contextlib import asynccontextmanager
+
+from sqlalchemy.util import greenlet_spawn
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from backend.config import DB_ASYNC
+from backend.database.db_config import engine, async_engine
+
+
+# In async mode the request gets the sync facade of an AsyncSession, so the sync controllers and
+# *_utils helpers are shared by both modes. They must be called through run_db, which runs them
+# in a greenlet on the event loop (async mode) or in the threadpool (sync mode).
+if DB_ASYNC:
+    async def get_db():
+        async with AsyncSession(async_engine) as session:
+            yield session.sync_session
+else:
+    def get_db():
+        with Session(engine) as session:
+            yield session
 
-from backend.database.db_config import engine
+async def run_db(function, *args, **kwargs):
+    if DB_ASYNC:
+        return await greenlet_spawn(function, *args, **kwargs)
+    return await run_in_threadpool(function, *args, **kwargs)
 
+# Sessions from get_db are closed before a StreamingResponse body runs, so streams open their own
+@asynccontextmanager
+async def open_db():
+    if DB_ASYNC:
+        async with AsyncSession(async_engine) as session:
+            yield session.sync_session
+    else:
+        session = Session(engine)
+        try:
+            yield session
+        finally:
+            await run_in_threadpool(session.close)
 
-def get_db():
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+# for work that outlives the request, such as background tasks and periodic jobs
+async def run_in_session(function, *args, **kwargs):
+    async with open_db() as db:
+        return await run_db(function, *args, db=db, **kwargs)
@@ -1,18 +1,41 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Response, status
 from sqlmodel import Session
 
 from backend.authentication.jwt_handler import get_current_user
-from backend.dependencies.db_dependencies import get_db
-from backend.utils.list_utils import get_task_list_by_id
-from backend.dependencies.board_dependencies import require_board_role
+from backend.dependencies.db_dependencies import get_db, run_db
+from backend.models.task_list import TaskList
+from backend.schemas.authentication import TokenData
+from backend.utils.list_utils import get_task_list_with_user_role
+from backend.dependencies.board_dependencies import check_board_role_name, check_board_etag
+
+def resolve_list_with_role(list_id: int, required_roles: list[str], active_user: TokenData, db: Session) -> TaskList:
+    db_list, role_name = get_task_list_with_user_role(task_list_id=list_id, user_id=active_user.id, db=db)
+    if not db_list:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List not found")
+
+    check_board_role_name(role_name=role_name, required_roles=required_roles)
+    return db_list
+
+def resolve_list_with_role_and_etag(list_id: int, required_roles: list[str], active_user: TokenData,
+                                    if_none_match: Optional[str], db: Session) -> tuple[TaskList, str]:
+    db_list = resolve_list_with_role(list_id=list_id, required_roles=required_roles, active_user=active_user, db=db)
+    return db_list, check_board_etag(board_id=db_list.board_id, if_none_match=if_none_match, db=db)
 
-def require_board_role_from_list(required_roles: list[str]):
-    def extract_board_id_and_check_role(list_id: int, db: Session = Depends(get_db), active_user = Depends(get_current_user)):
-        db_list = get_task_list_by_id(task_list_id=list_id, db=db)
-        if not db_list:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List not found")
+def require_board_role_from_list(required_roles: list[str], etag: bool = False):
+    async def resolve_list_and_check_role(list_id: int, db: Session = Depends(get_db),
+                                          active_user: TokenData = Depends(get_current_user)) -> TaskList:
+        return await run_db(resolve_list_with_role, list_id=list_id, required_roles=required_roles,
+                            active_user=active_user, db=db)
 
-        board_id = db_list.board_id
-        return require_board_role(required_roles)(board_id, active_user, db)
+    async def resolve_list_and_check_role_and_etag(list_id: int, response: Response,
+                                                   if_none_match: Optional[str] = Header(default=None),
+                                                   db: Session = Depends(get_db),
+                                                   active_user: TokenData = Depends(get_current_user)) -> TaskList:
+        db_list, response.headers["ETag"] = await run_db(resolve_list_with_role_and_etag, list_id=list_id,
+                                                         required_roles=required_roles, active_user=active_user,
+                                                         if_none_match=if_none_match, db=db)
+        return db_list
 
-    return extract_board_id_and_check_role
\ No newline at end of file
+    return resolve_list_and_check_role_and_etag if etag else resolve_list_and_check_role
@@ -0,0 +1,26 @@
+from fastapi import Depends, HTTPException, status
+from sqlmodel import Session
+
+from backend.authentication.jwt_handler import get_current_user
+from backend.dependencies.db_dependencies import get_db, run_db
+from backend.dependencies.board_dependencies import check_board_role_name
+from backend.models.tag import TaskTag
+from backend.schemas.authentication import TokenData
+from backend.utils.tag_utils import get_tag_with_user_role
+
+
+def resolve_tag_with_role(tag_id: int, required_roles: list[str], active_user: TokenData, db: Session) -> TaskTag:
+    db_tag, role_name = get_tag_with_user_role(tag_id=tag_id, user_id=active_user.id, db=db)
+    if not db_tag:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
+
+    check_board_role_name(role_name=role_name, required_roles=required_roles)
+    return db_tag
+
+def require_board_role_from_tag(required_roles: list[str]):
+    async def resolve_tag_and_check_role(tag_id: int, db: Session = Depends(get_db),
+                                         active_user: TokenData = Depends(get_current_user)) -> TaskTag:
+        return await run_db(resolve_tag_with_role, tag_id=tag_id, required_roles=required_roles,
+                            active_user=active_user, db=db)
+
+    return resolve_tag_and_check_role
@@ -1,19 +1,42 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Response, status
 from sqlmodel import Session
 
 from backend.authentication.jwt_handler import get_current_user
-from backend.dependencies.db_dependencies import get_db
-from backend.dependencies.board_dependencies import require_board_role
-from backend.utils.task_utils import get_task_by_id
+from backend.dependencies.db_dependencies import get_db, run_db
+from backend.dependencies.board_dependencies import check_board_role_name, check_board_etag
+from backend.models.task import Task
+from backend.schemas.authentication import TokenData
+from backend.utils.task_utils import get_task_with_user_role
+
+
+def resolve_task_with_role(task_id: int, required_roles: list[str], active_user: TokenData, db: Session) -> Task:
+    db_task, role_name = get_task_with_user_role(task_id=task_id, user_id=active_user.id, db=db)
+    if not db_task:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    check_board_role_name(role_name=role_name, required_roles=required_roles)
+    return db_task
 
+def resolve_task_with_role_and_etag(task_id: int, required_roles: list[str], active_user: TokenData,
+                                    if_none_match: Optional[str], db: Session) -> tuple[Task, str]:
+    db_task = resolve_task_with_role(task_id=task_id, required_roles=required_roles, active_user=active_user, db=db)
+    return db_task, check_board_etag(board_id=db_task.board_id, if_none_match=if_none_match, db=db)
 
-def require_board_role_from_task(required_roles: list[str]):
-    def extract_board_id_and_check_role(task_id: int, db: Session = Depends(get_db), active_user = Depends(get_current_user)):
-        db_task = get_task_by_id(task_id=task_id, db=db)
-        if not db_task:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List not found")
+def require_board_role_from_task(required_roles: list[str], etag: bool = False):
+    async def resolve_task_and_check_role(task_id: int, db: Session = Depends(get_db),
+                                          active_user: TokenData = Depends(get_current_user)) -> Task:
+        return await run_db(resolve_task_with_role, task_id=task_id, required_roles=required_roles,
+                            active_user=active_user, db=db)
 
-        board_id = db_task.board_id
-        return require_board_role(required_roles)(board_id, active_user, db)
+    async def resolve_task_and_check_role_and_etag(task_id: int, response: Response,
+                                                   if_none_match: Optional[str] = Header(default=None),
+                                                   db: Session = Depends(get_db),
+                                                   active_user: TokenData = Depends(get_current_user)) -> Task:
+        db_task, response.headers["ETag"] = await run_db(resolve_task_with_role_and_etag, task_id=task_id,
+                                                         required_roles=required_roles, active_user=active_user,
+                                                         if_none_match=if_none_match, db=db)
+        return db_task
 
-    return extract_board_id_and_check_role
\ No newline at end of file
+    return resolve_task_and_check_role_and_etag if etag else resolve_task_and_check_role
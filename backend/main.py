@@ -1,23 +1,80 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
+from sqlmodel import Session
 
-from backend.config import BACK_DOMAIN, BACK_PORT
+from backend.config import BACK_DOMAIN, BACK_PORT, REVOKED_TOKEN_PURGE_INTERVAL_SECONDS, MIGRATE_ON_STARTUP, \
+    TASK_COUNT_REBUILD_INTERVAL_SECONDS, BOARD_PURGE_INTERVAL_SECONDS
+from backend.routes.activity import activity_router
 from backend.routes.authentication import auth_router
 from backend.routes.board import board_router
+from backend.routes.comment import comment_router
 from backend.routes.invitation import invitation_router
 from backend.routes.me import me_router
 from backend.routes.user import user_router
 from backend.routes.list import list_router
 from backend.routes.task import task_router
+from backend.routes.stats import stats_router
+from backend.routes.tag import tag_router
+from backend.authentication.encryption import shutdown_password_pool
+from backend.database.db_config import engine
 from backend.database.db_init import  delete_database, create_tables, initialize_roles_and_permissions
+from backend.database.migrations import run_migrations
+from backend.dependencies.db_dependencies import open_db, run_db
+from backend.utils.activity_utils import activity_writer
+from backend.utils.board_utils import purge_deleted_boards
+from backend.utils.event_utils import event_broker
+from backend.utils.response_cache_utils import response_cache
+from backend.utils.role_utils import load_role_ids
+from backend.utils.stats_utils import rebuild_task_counts
+from backend.utils.token_utils import purge_expired_revocations
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(function, interval_seconds: float):
+    while True:
+        try:
+            async with open_db() as db:
+                await run_db(function, db=db)
+        except Exception:
+            logger.exception("Periodic job %s failed", function.__name__)
+        await asyncio.sleep(interval_seconds)
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if MIGRATE_ON_STARTUP:
+        run_migrations(engine)
+    # a shared cache file can outlive the database it was filled from, whose versions restart at 0
+    response_cache.clear()
+    with Session(engine) as db:
+        load_role_ids(db)
+    await event_broker.start()
+    await activity_writer.start()
+    jobs = [
+        asyncio.create_task(run_periodically(purge_expired_revocations, REVOKED_TOKEN_PURGE_INTERVAL_SECONDS)),
+        asyncio.create_task(run_periodically(rebuild_task_counts, TASK_COUNT_REBUILD_INTERVAL_SECONDS)),
+        asyncio.create_task(run_periodically(purge_deleted_boards, BOARD_PURGE_INTERVAL_SECONDS)),
+    ]
+    yield
+    for job in jobs:
+        job.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
+    await activity_writer.stop()
+    await event_broker.stop()
+    shutdown_password_pool()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # delete_database()
 # create_tables()
 # initialize_roles_and_permissions()
 
-routers = [ task_router, list_router, invitation_router, me_router, board_router, auth_router, user_router]
+routers = [ task_router, list_router, invitation_router, me_router, board_router, auth_router, user_router, stats_router,
+            activity_router, comment_router, tag_router]
 
 for router in routers:
     app.include_router(router)
@@ -1 +1,2 @@
-from . import user, role, board, comment, activity, task, tag, task_list
\ No newline at end of file
+from . import user, role, board, comment, activity, task, tag, task_list, invitation, blacklistedtoken, relationships, \
+    task_count
\ No newline at end of file
@@ -1,16 +1,28 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 from backend.utils.time_utils import utc_now
 
 
 class TaskActivity(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_taskactivity_task_id_timestamp", "task_id", "timestamp"),
+        Index("ix_taskactivity_board_id_timestamp", "board_id", "timestamp"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
+    # same names as the board events, e.g. "task.updated"
+    action: str
     description: str
     timestamp: datetime = Field(default_factory=utc_now)
 
     # Foreign key
     user_id: int = Field(default=None, foreign_key="user.id", index=True)
-    task_id: int = Field(default=None, foreign_key="task.id", index=True)
+    # Not foreign keys: rows are written after the change they record is committed, a deletion included,
+    # and the trail outlives the tasks and lists it describes. A list activity has no task.
+    board_id: int = Field(default=None)
+    list_id: Optional[int] = Field(default=None)
+    task_id: Optional[int] = Field(default=None)
@@ -3,5 +3,5 @@ from datetime import datetime
 
 class BlacklistedToken(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
-    token: str = Field(index=True, unique=True)
-    expires_at: datetime
\ No newline at end of file
+    jti: str = Field(index=True, unique=True)
+    expires_at: datetime = Field(index=True)
@@ -1,14 +1,24 @@
+from datetime import datetime
 from typing import Optional, List
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from backend.models.task_list import TaskList
 
 
 class Board(SQLModel, table=True):
+    __table_args__ = (Index("ix_board_deleted_at", "deleted_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     description: Optional[str] = None
     owner_id: int
+    # bumped by every write to the board, its lists, tasks or members; read responses use it as their ETag
+    version: int = Field(default=0)
+    # set when the board is deleted; its rows are then purged in the background and the board row last
+    deleted_at: Optional[datetime] = Field(default=None)
+    # claimed by the purge working on a deleted board, renewed with every batch it commits
+    purge_started_at: Optional[datetime] = Field(default=None)
 
     # Relationships
     task_lists: List["TaskList"] = Relationship()
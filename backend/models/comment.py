@@ -1,12 +1,17 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 from backend.utils.time_utils import utc_now
 
 
 class TaskComment(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_taskcomment_task_id_created_at", "task_id", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     content: str
     created_at: datetime = Field(default_factory=utc_now)
@@ -14,4 +19,4 @@ class TaskComment(SQLModel, table=True):
 
     # Foreign key
     user_id: int = Field(default=None, foreign_key="user.id", index=True)
-    task_id: int = Field(default=None, foreign_key="task.id", index=True)
+    task_id: int = Field(default=None, foreign_key="task.id")
@@ -2,6 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 from backend.utils.time_utils import utc_now
@@ -23,3 +24,8 @@ class Invitation(SQLModel, table=True):
 
     invited_user: Optional[User] = Relationship(sa_relationship_kwargs={"foreign_keys": "Invitation.invited_user_id"})
     inviter_user: Optional[User] = Relationship(sa_relationship_kwargs={"foreign_keys": "Invitation.inviter_user_id"})
+
+    __table_args__ = (
+        Index("ix_invitation_invited_user_id_status", "invited_user_id", "status"),
+        Index("ix_invitation_board_id_invited_user_id_status", "board_id", "invited_user_id", "status"),
+    )
@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 class UserRoleLink(SQLModel, table=True):
@@ -6,14 +7,24 @@ class UserRoleLink(SQLModel, table=True):
 
 class UserBoardLink(SQLModel, table=True):
     user_id: int = Field(default=None, foreign_key="user.id", ondelete="CASCADE", primary_key=True)
-    board_id: int = Field(default=None, foreign_key="board.id",ondelete="CASCADE", primary_key=True)
+    board_id: int = Field(default=None, foreign_key="board.id",ondelete="CASCADE", primary_key=True, index=True)
     role_id: int = Field(default=None, foreign_key="role.id")
 
 class TaskTagLink(SQLModel, table=True):
+    # the primary key finds the tags of a task, this index the tasks of a tag
+    __table_args__ = (
+        Index("ix_tasktaglink_tag_id_task_id", "tag_id", "task_id"),
+    )
+
     task_id: int = Field(default=None, foreign_key="task.id", primary_key=True)
     tag_id: int = Field(default=None, foreign_key="tasktag.id", primary_key=True)
 
 class TaskUserLink(SQLModel, table=True):
+    # the primary key finds the assignees of a task, this index the tasks assigned to a user
+    __table_args__ = (
+        Index("ix_taskuserlink_user_id_task_id", "user_id", "task_id"),
+    )
+
     task_id: int = Field(default=None, foreign_key="task.id", primary_key=True)
     user_id: int = Field(default=None, foreign_key="user.id", primary_key=True)
 
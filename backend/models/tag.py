@@ -1,8 +1,18 @@
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
 class TaskTag(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_tasktag_board_id_name", "board_id", "name", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
+    # number of tasks carrying the tag, adjusted in the same transaction as the links
+    usage_count: int = Field(default=0)
+
+    # Foreign key
+    board_id: int = Field(default=None, foreign_key="board.id")
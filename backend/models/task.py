@@ -2,6 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 from backend.models.activity import TaskActivity
@@ -26,6 +27,13 @@ class TaskStatus(str, Enum):
     COMPLETED = "completed"
 
 class Task(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_task_list_id_rank", "list_id", "rank"),
+        Index("ix_task_board_id_status_due_date", "board_id", "status", "due_date"),
+        Index("ix_task_board_id_priority", "board_id", "priority"),
+        Index("ix_task_board_id_due_date", "board_id", "due_date"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     description: Optional[str] = Field(default=None)
@@ -33,6 +41,10 @@ class Task(SQLModel, table=True):
     status: TaskStatus= Field(default=TaskStatus.TODO)
     created_at: datetime = Field(default_factory=utc_now)
     due_date: Optional[datetime]
+    # position in the list, see rank_utils
+    rank: str
+    # kept up to date by the comment controller in the same transaction as the comment
+    comment_count: int = Field(default=0)
 
     # Foreign key
     list_id: int = Field(default=None, foreign_key="tasklist.id", index=True)
@@ -41,7 +53,9 @@ class Task(SQLModel, table=True):
 
     # Relationships
     task_tags: List["TaskTag"] = Relationship(link_model=TaskTagLink)
-    task_activities: List["TaskActivity"] = Relationship()
+    task_activities: List["TaskActivity"] = Relationship(sa_relationship_kwargs={
+        "primaryjoin": "Task.id == foreign(TaskActivity.task_id)", "viewonly": True
+    })
     task_comments: List["TaskComment"] = Relationship()
 
 
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+
+from backend.models.task import TaskPriority, TaskStatus
+
+
+# Number of tasks of a list per status and priority, kept up to date by the task controller and rebuilt
+# by rebuild_task_counts. A task without a priority is counted under TaskPriority.NONE.
+class TaskCount(SQLModel, table=True):
+    list_id: int = Field(foreign_key="tasklist.id", primary_key=True)
+    status: TaskStatus = Field(primary_key=True)
+    priority: TaskPriority = Field(primary_key=True)
+    board_id: int = Field(foreign_key="board.id", index=True)
+    count: int = Field(default=0)
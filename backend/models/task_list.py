@@ -1,4 +1,5 @@
 from typing import Optional, List
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
 
@@ -7,10 +8,14 @@ from backend.models.task import Task
 
 
 class TaskList(SQLModel, table=True):
+    __table_args__ = (Index("ix_tasklist_board_id_rank", "board_id", "rank"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     description: Optional[str] = Field(default=None)
     created_at: datetime = Field(default_factory=utc_now)
+    # position in the board, see rank_utils
+    rank: str
 
     # foreign key
     board_id: int = Field(default=None, foreign_key="board.id", index=True)
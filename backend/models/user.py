@@ -13,8 +13,10 @@ class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     hashed_password: str
-    email: str
+    email: str = Field(index=True, unique=True)
     created_at: datetime = Field(default_factory=utc_now)
+    # bumped whenever the user's list of boards changes, see get_cached_json
+    boards_version: int = Field(default=0)
 
     #Relationships
     roles: List[Role] = Relationship(link_model=UserRoleLink)
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlmodel import Session
+
+from backend.authentication.jwt_handler import get_current_user
+from backend.dependencies.board_dependencies import require_board_role, any_roles
+from backend.dependencies.db_dependencies import get_db, run_db
+from backend.dependencies.task_dependency import require_board_role_from_task
+from backend.models.task import Task
+from backend.schemas.activity import ActivityResponse
+from backend.schemas.authentication import TokenData
+from backend.schemas.pagination import PageParams, PageResponse
+from backend.utils.activity_utils import get_activities_of_task, get_activities_of_board
+
+activity_router = APIRouter(tags=['Activity'])
+
+class ActivityController:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_task_activity(self, db_task: Task, page: PageParams) -> PageResponse[ActivityResponse]:
+        activities, next_cursor = get_activities_of_task(task_id=db_task.id, page=page, db=self.db)
+        return PageResponse[ActivityResponse](
+            items=[ActivityResponse.model_validate(activity.model_dump()) for activity in activities],
+            next_cursor=next_cursor
+        )
+
+    def get_board_activity(self, board_id: int, page: PageParams) -> PageResponse[ActivityResponse]:
+        activities, next_cursor = get_activities_of_board(board_id=board_id, page=page, db=self.db)
+        return PageResponse[ActivityResponse](
+            items=[ActivityResponse.model_validate(activity.model_dump()) for activity in activities],
+            next_cursor=next_cursor
+        )
+
+
+async def get_activity_controller(db: Session = Depends(get_db)) -> ActivityController:
+    return ActivityController(db)
+
+@activity_router.get("/task/{task_id}/activity", response_model=PageResponse[ActivityResponse],
+                     status_code=status.HTTP_200_OK)
+async def get_task_activity(task_id: int,
+                            page: PageParams = Query(),
+                            controller: ActivityController = Depends(get_activity_controller),
+                            _: TokenData = Depends(get_current_user),
+                            db_task: Task = Depends(require_board_role_from_task(any_roles()))):
+    return await run_db(controller.get_task_activity, db_task=db_task, page=page)
+
+@activity_router.get("/board/{board_id}/activity", response_model=PageResponse[ActivityResponse],
+                     status_code=status.HTTP_200_OK)
+async def get_board_activity(board_id: int,
+                             page: PageParams = Query(),
+                             controller: ActivityController = Depends(get_activity_controller),
+                             _: TokenData = Depends(get_current_user),
+                             __: None = Depends(require_board_role(any_roles()))):
+    return await run_db(controller.get_board_activity, board_id=board_id, page=page)
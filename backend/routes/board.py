@@ -1,20 +1,38 @@
-from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+import asyncio
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
 
 from backend.authentication.jwt_handler import get_current_user
+from backend.config import EVENT_HEARTBEAT_SECONDS
 from backend.dependencies.auth_dependencies import require_role
-from backend.dependencies.board_dependencies import require_board_role, owner_roles, any_roles
-from backend.dependencies.db_dependencies import get_db
+from backend.dependencies.board_dependencies import require_board_role, owner_roles, any_roles, \
+    require_board_role_websocket, watch_board_role
+from backend.dependencies.db_dependencies import get_db, open_db, run_db, run_in_session
 from backend.models.board import Board
 from backend.models.invitation import Invitation, InvitationStatus
 from backend.models.relationships import UserBoardLink
 from backend.models.role import RolesEnum
+from backend.schemas.archive import BoardImportResponse
 from backend.schemas.authentication import TokenData
-from backend.schemas.board import BoardResponse, BoardUserResponse, BoardCreateRequest, BoardUpdateRequest
-from backend.utils.board_utils import get_board_by_id, check_if_user_in_board, get_users_in_boards, get_user_board_link
-from backend.utils.role_utils import get_role_by_name
+from backend.schemas.board import BoardResponse, BoardUserResponse, BoardCreateRequest, BoardUpdateRequest, \
+    BoardSnapshotResponse, BoardStatsResponse, ListStatsResponse
+from backend.schemas.list import ListSnapshotResponse
+from backend.schemas.task import TaskSnapshotResponse, TaskTagResponse
+from backend.schemas.pagination import PageParams, PageResponse
+from backend.utils.archive_utils import BoardArchiveImporter, iter_board_archive_chunks, \
+    iter_archive_line_batches
+from backend.utils.board_utils import get_board_by_id, check_if_user_in_board, get_users_in_boards, get_user_board_link, \
+    invalidate_board_membership, get_all_boards, get_board_with_tasks, get_all_users_in_board, bump_board_version, \
+    bump_user_boards_version, bump_boards_version_of_members, mark_board_deleted, purge_board
+from backend.utils.event_utils import publish_board_event, iter_board_events, BOARD_DELETED_EVENT, \
+    ACCESS_REVOKED_EVENT, encode_event
+from backend.utils.response_cache_utils import get_cached_json
+from backend.utils.role_utils import get_role_by_name, get_role_id_by_name
+from backend.utils.stats_utils import get_task_counts_of_board, get_overdue_counts_of_board
+from backend.utils.time_utils import utc_now
 from backend.utils.user_utils import get_user_by_id
 from backend.utils.invitation_utils import get_pending_board_invitation_of_user
 
@@ -35,22 +53,24 @@ class BoardController:
 
         self.db.flush()
 
-        role = get_role_by_name(role_name="owner",db=self.db)
-        user_board_link =UserBoardLink(user_id=active_user.id,board_id=new_board.id,role_id=role.id)
+        role_id = get_role_id_by_name(role_name="owner",db=self.db)
+        user_board_link =UserBoardLink(user_id=active_user.id,board_id=new_board.id,role_id=role_id)
         self.db.add(user_board_link)
+        bump_user_boards_version(user_id=active_user.id, db=self.db)
 
         self.db.commit()
         self.db.refresh(new_board)
+        invalidate_board_membership(board_id=new_board.id, user_id=active_user.id)
 
         return BoardResponse.model_validate(new_board.model_dump())
 
-    def get_board_users(self, board_id: int) -> List[BoardUserResponse]:
+    def get_board_users(self, board_id: int, page: PageParams) -> PageResponse[BoardUserResponse]:
 
         board = get_board_by_id(board_id=board_id,db=self.db)
         if not board:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Board does not exist")
 
-        users_in_board = get_users_in_boards(board_id=board_id, db=self.db)
+        users_in_board, next_cursor = get_users_in_boards(board_id=board_id, page=page, db=self.db)
         user_responses = [
             BoardUserResponse(
                 name = user.name,
@@ -59,11 +79,113 @@ class BoardController:
             )
             for user, role in users_in_board
         ]
-        return user_responses
+        return PageResponse[BoardUserResponse](items=user_responses, next_cursor=next_cursor)
+
+    def get_board_snapshot(self, board_id: int) -> BoardSnapshotResponse:
+        board = get_board_with_tasks(board_id=board_id, db=self.db)
+        if not board:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board does not exist")
+
+        members = get_all_users_in_board(board_id=board_id, db=self.db)
+        lists = [
+            ListSnapshotResponse(
+                **task_list.model_dump(),
+                tasks=[
+                    TaskSnapshotResponse(
+                        **task.model_dump(),
+                        tags=[TaskTagResponse(id=tag.id, name=tag.name) for tag in task.task_tags]
+                    )
+                    for task in sorted(task_list.task_lists, key=lambda task: (task.rank, task.id))
+                ]
+            )
+            for task_list in sorted(board.task_lists, key=lambda task_list: (task_list.rank, task_list.id))
+        ]
+        return BoardSnapshotResponse(
+            **board.model_dump(),
+            lists=lists,
+            members=[BoardUserResponse(name=user.name, email=user.email, role_name=role.name) for user, role in members]
+        )
 
-    def get_boards(self) -> List[BoardResponse]:
-        boards = self.db.exec(select(Board)).all()
-        return [BoardResponse.model_validate(board.model_dump()) for board in boards]
+    # Served from the counters table: one row per list, status and priority, however many tasks there are
+    def get_board_stats(self, board_id: int) -> BoardStatsResponse:
+        board = get_board_by_id(board_id=board_id, db=self.db)
+        if not board:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board does not exist")
+
+        board_stats = BoardStatsResponse(board_id=board_id, lists=[])
+        list_stats: dict[int, ListStatsResponse] = {}
+        for task_count in get_task_counts_of_board(board_id=board_id, db=self.db):
+            stats = list_stats.setdefault(task_count.list_id, ListStatsResponse(list_id=task_count.list_id))
+            for counts in (stats, board_stats):
+                counts.total += task_count.count
+                counts.by_status[task_count.status] = counts.by_status.get(task_count.status, 0) + task_count.count
+                counts.by_priority[task_count.priority] = \
+                    counts.by_priority.get(task_count.priority, 0) + task_count.count
+        overdue = get_overdue_counts_of_board(board_id=board_id, now=utc_now(), db=self.db)
+        for list_id, count in overdue.items():
+            list_stats.setdefault(list_id, ListStatsResponse(list_id=list_id)).overdue = count
+            board_stats.overdue += count
+        board_stats.lists = [list_stats[list_id] for list_id in sorted(list_stats)]
+        return board_stats
+
+    async def stream_board_events(self, board_id: int, active_user: TokenData):
+        async for message in iter_board_events(board_id=board_id, heartbeat_seconds=EVENT_HEARTBEAT_SECONDS,
+                                               has_access=watch_board_role(board_id, any_roles(), active_user.id)):
+            yield f"data: {message}\n\n" if message is not None else ": keepalive\n\n"
+
+    # Events are sent from a task while the handler reads the socket, client messages are ignored
+    # and only read to notice the disconnect. Heartbeats only re-check access, nothing is sent for them.
+    # The socket is closed once the board is deleted, with a policy violation once access is revoked.
+    async def send_board_events(self, board_id: int, active_user: TokenData, websocket: WebSocket):
+        async def forward_events():
+            access_revoked = encode_event(ACCESS_REVOKED_EVENT, board_id, None)
+            async for message in iter_board_events(board_id=board_id, heartbeat_seconds=EVENT_HEARTBEAT_SECONDS,
+                                                   has_access=watch_board_role(board_id, any_roles(), active_user.id)):
+                if message is not None:
+                    await websocket.send_text(message)
+                if message == access_revoked:
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    return
+            await websocket.close()
+
+        sender = asyncio.create_task(forward_events())
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
+
+    async def stream_board_archive(self, board_id: int):
+        async with open_db() as db:
+            chunks = iter_board_archive_chunks(board_id=board_id, db=db)
+            while chunk := await run_db(next, chunks, None):
+                yield chunk
+
+    # The body is read and loaded a batch of lines at a time, all in one transaction,
+    # so an archive rejected halfway through leaves nothing behind
+    async def import_board(self, chunks, active_user: TokenData) -> BoardImportResponse:
+        importer = BoardArchiveImporter(owner_id=active_user.id, db=self.db)
+        async for lines, first_line_number in iter_archive_line_batches(chunks):
+            await run_db(importer.add_lines, lines=lines, first_line_number=first_line_number)
+        return await run_db(self._finish_board_import, importer=importer)
+
+    def _finish_board_import(self, importer: BoardArchiveImporter) -> BoardImportResponse:
+        board = importer.finish()
+        import_response = BoardImportResponse(
+            **BoardResponse.model_validate(board.model_dump()).model_dump(), lists=len(importer.list_ids),
+            tags=len(importer.tag_ids), tasks=importer.tasks, comments=importer.comments,
+            invitations=len(importer.invited_ids), unknown_users=importer.unknown_users
+        )
+        self.db.commit()
+        invalidate_board_membership(board_id=import_response.id)
+        return import_response
+
+    def get_boards(self, page: PageParams) -> PageResponse[BoardResponse]:
+        boards, next_cursor = get_all_boards(page=page, db=self.db)
+        return PageResponse[BoardResponse](
+            items=[BoardResponse.model_validate(board.model_dump()) for board in boards],
+            next_cursor=next_cursor
+        )
 
     def update_board(self,board_id: int,  board_update: BoardUpdateRequest) -> BoardResponse:
         board = get_board_by_id(board_id=board_id,db=self.db)
@@ -73,20 +195,28 @@ class BoardController:
         update_data = board_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(board, key, value)
+        bump_board_version(board_id=board_id, db=self.db)
+        bump_boards_version_of_members(board_id=board_id, db=self.db)
 
         self.db.commit()
         self.db.refresh(board)
 
-        return BoardResponse.model_validate(board.model_dump())
+        board_response = BoardResponse.model_validate(board.model_dump())
+        publish_board_event(board_id, "board.updated", board_response)
+        return board_response
 
-    def delete_board(self,board_id: int):
-        #todo handle cascade deleting, board and tasks in the board should get deleted
+    # Returns once the board is hidden from its members, its rows are purged after the response
+    def delete_board(self, board_id: int, background_tasks: BackgroundTasks):
         board = get_board_by_id(board_id=board_id,db=self.db)
         if not board:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board does not exist")
 
-        self.db.delete(board)
+        bump_boards_version_of_members(board_id=board_id, db=self.db)
+        mark_board_deleted(board_id=board_id, db=self.db)
         self.db.commit()
+        invalidate_board_membership(board_id=board_id)
+        publish_board_event(board_id, BOARD_DELETED_EVENT, {"id": board_id})
+        background_tasks.add_task(run_in_session, purge_board, board_id=board_id)
         return None
 
     def invite_user_to_board(self, board_id: int, user_id: int,
@@ -145,63 +275,120 @@ class BoardController:
                 detail="Cannot change user role to owner"
             )
         user_board_link.role_id =  role.id
+        bump_board_version(board_id=board_id, db=self.db)
         self.db.commit()
+        invalidate_board_membership(board_id=board_id, user_id=user_id)
+        publish_board_event(board_id, "member.role_updated", {"user_id": user_id, "role_name": role_name})
 
         return {"message": f"User role updated to {role_name} successfully"}
 
 
-def get_board_controller(db: Session = Depends(get_db)) ->BoardController:
+async def get_board_controller(db: Session = Depends(get_db)) ->BoardController:
     return BoardController(db)
 
 @board_router.post("/create", response_model=BoardResponse, status_code=status.HTTP_201_CREATED)
-def create_board(board_info: BoardCreateRequest,
-                 controller: BoardController = Depends(get_board_controller),
-                active_user: TokenData = Depends(get_current_user)):
-    return controller.create_board(board_info=board_info,active_user=active_user)
-
-@board_router.get("/{board_id}/users", response_model=List[BoardUserResponse], status_code=status.HTTP_200_OK)
-def get_board_users(board_id: int,
-                    controller: BoardController = Depends(get_board_controller),
-                    _: TokenData = Depends(get_current_user),
-                    __: None = Depends(require_board_role(any_roles()))):
-    return controller.get_board_users(board_id=board_id)
-
-@board_router.get("/", response_model=List[BoardResponse], status_code=status.HTTP_200_OK)
-def get_boards(controller: BoardController = Depends(get_board_controller),
-               _: TokenData = Depends(get_current_user),
-               __: TokenData = Depends(require_role(["admin"]))):
-    return controller.get_boards()
+async def create_board(board_info: BoardCreateRequest,
+                       controller: BoardController = Depends(get_board_controller),
+                      active_user: TokenData = Depends(get_current_user)):
+    return await run_db(controller.create_board, board_info=board_info,active_user=active_user)
+
+@board_router.get("/{board_id}/users", response_model=PageResponse[BoardUserResponse], status_code=status.HTTP_200_OK)
+async def get_board_users(board_id: int,
+                          page: PageParams = Query(),
+                          controller: BoardController = Depends(get_board_controller),
+                          _: TokenData = Depends(get_current_user),
+                          etag: str = Depends(require_board_role(any_roles(), etag=True))):
+    content = await run_db(get_cached_json, f"board-users:{etag}:{page.model_dump_json()}",
+                           controller.get_board_users, board_id=board_id, page=page)
+    return Response(content, media_type="application/json", headers={"ETag": etag})
+
+@board_router.get("/{board_id}/snapshot", response_model=BoardSnapshotResponse, status_code=status.HTTP_200_OK)
+async def get_board_snapshot(board_id: int,
+                             controller: BoardController = Depends(get_board_controller),
+                             _: TokenData = Depends(get_current_user),
+                             etag: str = Depends(require_board_role(any_roles(), etag=True))):
+    content = await run_db(get_cached_json, f"board-snapshot:{etag}", controller.get_board_snapshot,
+                           board_id=board_id)
+    return Response(content, media_type="application/json", headers={"ETag": etag})
+
+@board_router.get("/{board_id}/stats", response_model=BoardStatsResponse, status_code=status.HTTP_200_OK)
+async def get_board_stats(board_id: int,
+                          controller: BoardController = Depends(get_board_controller),
+                          _: TokenData = Depends(get_current_user),
+                          __: None = Depends(require_board_role(any_roles()))):
+    return await run_db(controller.get_board_stats, board_id=board_id)
+
+# One stream per board replaces polling its reads: every committed write is pushed as a JSON event.
+# Sessions from get_db are closed before the stream starts, the stream itself never touches the database.
+@board_router.get("/{board_id}/events", status_code=status.HTTP_200_OK)
+async def stream_board_events(board_id: int,
+                              controller: BoardController = Depends(get_board_controller),
+                              active_user: TokenData = Depends(get_current_user),
+                              __: None = Depends(require_board_role(any_roles()))):
+    return StreamingResponse(controller.stream_board_events(board_id=board_id, active_user=active_user),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@board_router.get("/{board_id}/export", status_code=status.HTTP_200_OK)
+async def export_board(board_id: int,
+                       controller: BoardController = Depends(get_board_controller),
+                       _: TokenData = Depends(get_current_user),
+                       __: None = Depends(require_board_role(any_roles()))):
+    return StreamingResponse(controller.stream_board_archive(board_id=board_id), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": f'attachment; filename="board-{board_id}.ndjson"'})
+
+@board_router.post("/import", response_model=BoardImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_board(request: Request,
+                       controller: BoardController = Depends(get_board_controller),
+                       active_user: TokenData = Depends(get_current_user)):
+    return await controller.import_board(chunks=request.stream(), active_user=active_user)
+
+@board_router.websocket("/{board_id}/events")
+async def board_events_websocket(board_id: int,
+                                 websocket: WebSocket,
+                                 controller: BoardController = Depends(get_board_controller),
+                                 active_user: TokenData = Depends(require_board_role_websocket(any_roles()))):
+    await websocket.accept()
+    await controller.send_board_events(board_id=board_id, active_user=active_user, websocket=websocket)
+
+@board_router.get("/", response_model=PageResponse[BoardResponse], status_code=status.HTTP_200_OK)
+async def get_boards(page: PageParams = Query(),
+                     controller: BoardController = Depends(get_board_controller),
+                     _: TokenData = Depends(get_current_user),
+                     __: TokenData = Depends(require_role(["admin"]))):
+    return await run_db(controller.get_boards, page=page)
 
 @board_router.patch("/update/{board_id}", response_model=BoardResponse, status_code=status.HTTP_200_OK)
-def update_board(board_id : int,
-                 board_update: BoardUpdateRequest,
-                 controller: BoardController = Depends(get_board_controller),
-                 _: TokenData = Depends(get_current_user),
-                 __: None = Depends(require_board_role(owner_roles()))):
-    return controller.update_board(board_id=board_id, board_update=board_update)
+async def update_board(board_id : int,
+                       board_update: BoardUpdateRequest,
+                       controller: BoardController = Depends(get_board_controller),
+                       _: TokenData = Depends(get_current_user),
+                       __: None = Depends(require_board_role(owner_roles()))):
+    return await run_db(controller.update_board, board_id=board_id, board_update=board_update)
 
 @board_router.delete("/delete/{board_id}", status_code = status.HTTP_204_NO_CONTENT)
-def delete_board(board_id: int,
-                 controller: BoardController = Depends(get_board_controller),
-                 _: TokenData = Depends(get_current_user),
-                 __: None = Depends(require_board_role(owner_roles()))):
-    return controller.delete_board(board_id=board_id)
+async def delete_board(board_id: int,
+                       background_tasks: BackgroundTasks,
+                       controller: BoardController = Depends(get_board_controller),
+                       _: TokenData = Depends(get_current_user),
+                       __: None = Depends(require_board_role(owner_roles()))):
+    return await run_db(controller.delete_board, board_id=board_id, background_tasks=background_tasks)
 
 @board_router.post("/{board_id}/invite/{user_id}", status_code=status.HTTP_200_OK)
-def invite_user_to_board(board_id: int, user_id: int,
-                         controller: BoardController = Depends(get_board_controller),
-                         active_user : TokenData = Depends(get_current_user),
-                         _: None = Depends(require_board_role(owner_roles()))):
-    return controller.invite_user_to_board(board_id=board_id,user_id=user_id, active_user=active_user)
+async def invite_user_to_board(board_id: int, user_id: int,
+                               controller: BoardController = Depends(get_board_controller),
+                               active_user : TokenData = Depends(get_current_user),
+                               _: None = Depends(require_board_role(owner_roles()))):
+    return await run_db(controller.invite_user_to_board, board_id=board_id,user_id=user_id, active_user=active_user)
 
 @board_router.patch("/{board_id}/role/{user_id}",status_code = status.HTTP_200_OK)
-def update_user_board_role(board_id:int,
-                           user_id:int,
-                           role_name:str,
-                           controller: BoardController = Depends(get_board_controller),
-                           _: TokenData = Depends(get_current_user),
-                           __: None = Depends(require_board_role(owner_roles()))):
-    return controller.update_user_board_role(board_id=board_id,user_id=user_id,role_name=role_name)
+async def update_user_board_role(board_id:int,
+                                 user_id:int,
+                                 role_name:str,
+                                 controller: BoardController = Depends(get_board_controller),
+                                 _: TokenData = Depends(get_current_user),
+                                 __: None = Depends(require_board_role(owner_roles()))):
+    return await run_db(controller.update_user_board_role, board_id=board_id,user_id=user_id,role_name=role_name)
 
 
 
@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session
+
+from backend.authentication.jwt_handler import get_current_user
+from backend.dependencies.board_dependencies import any_roles, edit_roles, owner_roles, check_board_role
+from backend.dependencies.db_dependencies import get_db, run_db
+from backend.dependencies.task_dependency import require_board_role_from_task
+from backend.models.comment import TaskComment
+from backend.models.task import Task
+from backend.schemas.authentication import TokenData
+from backend.schemas.comment import CommentCreateRequest, CommentUpdateRequest, CommentResponse
+from backend.schemas.pagination import PageParams, PageResponse
+from backend.utils.activity_utils import record_task_activities
+from backend.utils.board_utils import bump_board_version
+from backend.utils.comment_utils import get_comment_of_task, get_comments_of_task, adjust_comment_count
+from backend.utils.event_utils import publish_board_event
+from backend.utils.time_utils import utc_now
+
+comment_router = APIRouter(tags=['Comment'])
+
+class CommentController:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _get_comment(self, db_task: Task, comment_id: int) -> TaskComment:
+        db_comment = get_comment_of_task(comment_id=comment_id, task_id=db_task.id, db=self.db)
+        if not db_comment:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
+        return db_comment
+
+    def create_comment(self, db_task: Task, comment_info: CommentCreateRequest,
+                       active_user: TokenData) -> CommentResponse:
+        new_comment = TaskComment(content=comment_info.content, user_id=active_user.id, task_id=db_task.id)
+        self.db.add(new_comment)
+        adjust_comment_count(task_id=db_task.id, delta=1, db=self.db)
+        bump_board_version(board_id=db_task.board_id, db=self.db)
+        self.db.commit()
+        self.db.refresh(new_comment)
+        self.db.refresh(db_task)
+
+        comment = CommentResponse.model_validate(new_comment.model_dump())
+        publish_board_event(db_task.board_id, "comment.created",
+                            {"comment": comment, "comment_count": db_task.comment_count})
+        record_task_activities("comment.created", [db_task], user_id=active_user.id,
+                               description='Commented on task "{task.title}"')
+        return comment
+
+    def get_comments(self, db_task: Task, page: PageParams) -> PageResponse[CommentResponse]:
+        comments, next_cursor = get_comments_of_task(task_id=db_task.id, page=page, db=self.db)
+        return PageResponse[CommentResponse](
+            items=[CommentResponse.model_validate(comment.model_dump()) for comment in comments],
+            next_cursor=next_cursor
+        )
+
+    def update_comment(self, db_task: Task, comment_id: int, comment_update: CommentUpdateRequest,
+                       active_user: TokenData) -> CommentResponse:
+        db_comment = self._get_comment(db_task=db_task, comment_id=comment_id)
+        if db_comment.user_id != active_user.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the author can edit a comment")
+
+        db_comment.content = comment_update.content
+        db_comment.edited_at = utc_now()
+        # comments are part of the board's search index, so an edit changes what its reads return
+        bump_board_version(board_id=db_task.board_id, db=self.db)
+        self.db.commit()
+        self.db.refresh(db_comment)
+
+        comment = CommentResponse.model_validate(db_comment.model_dump())
+        publish_board_event(db_task.board_id, "comment.updated", {"comment": comment})
+        record_task_activities("comment.updated", [db_task], user_id=active_user.id,
+                               description='Edited a comment on task "{task.title}"')
+        return comment
+
+    # The author may delete their comment, and the board owner any comment
+    def delete_comment(self, db_task: Task, comment_id: int, active_user: TokenData) -> None:
+        db_comment = self._get_comment(db_task=db_task, comment_id=comment_id)
+        if db_comment.user_id != active_user.id:
+            check_board_role(board_id=db_task.board_id, required_roles=owner_roles(), active_user=active_user,
+                             db=self.db)
+
+        self.db.delete(db_comment)
+        adjust_comment_count(task_id=db_task.id, delta=-1, db=self.db)
+        bump_board_version(board_id=db_task.board_id, db=self.db)
+        self.db.commit()
+        self.db.refresh(db_task)
+
+        publish_board_event(db_task.board_id, "comment.deleted",
+                            {"id": comment_id, "task_id": db_task.id, "comment_count": db_task.comment_count})
+        record_task_activities("comment.deleted", [db_task], user_id=active_user.id,
+                               description='Deleted a comment on task "{task.title}"')
+
+        return None
+
+
+async def get_comment_controller(db: Session = Depends(get_db)) -> CommentController:
+    return CommentController(db)
+
+@comment_router.post("/task/{task_id}/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
+async def create_comment(task_id: int,
+                         comment_info: CommentCreateRequest,
+                         controller: CommentController = Depends(get_comment_controller),
+                         active_user: TokenData = Depends(get_current_user),
+                         db_task: Task = Depends(require_board_role_from_task(edit_roles()))):
+    return await run_db(controller.create_comment, db_task=db_task, comment_info=comment_info, active_user=active_user)
+
+@comment_router.get("/task/{task_id}/comments", response_model=PageResponse[CommentResponse],
+                    status_code=status.HTTP_200_OK)
+async def get_comments(task_id: int,
+                       page: PageParams = Query(),
+                       controller: CommentController = Depends(get_comment_controller),
+                       _: TokenData = Depends(get_current_user),
+                       db_task: Task = Depends(require_board_role_from_task(any_roles(), etag=True))):
+    return await run_db(controller.get_comments, db_task=db_task, page=page)
+
+@comment_router.patch("/task/{task_id}/comments/{comment_id}", response_model=CommentResponse,
+                      status_code=status.HTTP_200_OK)
+async def update_comment(task_id: int,
+                         comment_id: int,
+                         comment_update: CommentUpdateRequest,
+                         controller: CommentController = Depends(get_comment_controller),
+                         active_user: TokenData = Depends(get_current_user),
+                         db_task: Task = Depends(require_board_role_from_task(edit_roles()))):
+    return await run_db(controller.update_comment, db_task=db_task, comment_id=comment_id,
+                        comment_update=comment_update, active_user=active_user)
+
+@comment_router.delete("/task/{task_id}/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_comment(task_id: int,
+                         comment_id: int,
+                         controller: CommentController = Depends(get_comment_controller),
+                         active_user: TokenData = Depends(get_current_user),
+                         db_task: Task = Depends(require_board_role_from_task(edit_roles()))):
+    return await run_db(controller.delete_comment, db_task=db_task, comment_id=comment_id, active_user=active_user)
@@ -5,10 +5,12 @@ from backend.authentication.jwt_handler import get_current_user
 from backend.models.relationships import UserBoardLink
 from backend.schemas.authentication import TokenData
 from backend.models.invitation import InvitationStatus
-from backend.dependencies.db_dependencies import get_db
+from backend.dependencies.db_dependencies import get_db, run_db
 from backend.utils.invitation_utils import get_invitation_of_user
 from backend.utils.role_utils import get_role_by_name
-from backend.utils.board_utils import get_user_board_link
+from backend.utils.board_utils import get_user_board_link, invalidate_board_membership, bump_board_version, \
+    bump_user_boards_version
+from backend.utils.event_utils import publish_board_event
 
 invitation_router = APIRouter(prefix="/invitation", tags=['Invitation'])
 
@@ -40,7 +42,11 @@ class InvitationController:
         self.db.add(invitation)
         board_user_link = UserBoardLink(board_id=invitation.board_id, user_id=active_user.id, role_id=role.id)
         self.db.add(board_user_link)
+        bump_board_version(board_id=invitation.board_id, db=self.db)
+        bump_user_boards_version(user_id=active_user.id, db=self.db)
         self.db.commit()
+        invalidate_board_membership(board_id=invitation.board_id, user_id=active_user.id)
+        publish_board_event(invitation.board_id, "member.joined", {"user_id": active_user.id, "role_name": "viewer"})
 
         return {"message": "Invitation accepted"}
 
@@ -60,17 +66,17 @@ class InvitationController:
 
         return {"message": "Invitation declined"}
 
-def get_invitation_controller(db: Session = Depends(get_db)) -> InvitationController:
+async def get_invitation_controller(db: Session = Depends(get_db)) -> InvitationController:
     return InvitationController(db)
 
 @invitation_router.post("/{invitation_id}/accept", status_code=status.HTTP_200_OK)
-def accept_invitation(invitation_id: int,
-                      active_user: TokenData = Depends(get_current_user),
-                      controller: InvitationController = Depends(get_invitation_controller)):
-    return controller.accept_invitation(invitation_id=invitation_id,active_user=active_user)
+async def accept_invitation(invitation_id: int,
+                            active_user: TokenData = Depends(get_current_user),
+                            controller: InvitationController = Depends(get_invitation_controller)):
+    return await run_db(controller.accept_invitation, invitation_id=invitation_id,active_user=active_user)
 
 @invitation_router.post("/{invitation_id}/decline", status_code = status.HTTP_200_OK)
-def decline_invitation(invitation_id: int,
-                       active_user: TokenData = Depends(get_current_user),
-                       controller: InvitationController = Depends(get_invitation_controller)):
-    return controller.decline_invitation(invitation_id=invitation_id, active_user= active_user)
\ No newline at end of file
+async def decline_invitation(invitation_id: int,
+                             active_user: TokenData = Depends(get_current_user),
+                             controller: InvitationController = Depends(get_invitation_controller)):
+    return await run_db(controller.decline_invitation, invitation_id=invitation_id, active_user= active_user)
\ No newline at end of file
@@ -1,17 +1,24 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlmodel import Session
 
 from backend.authentication.jwt_handler import get_current_user
+from backend.config import RANK_REBALANCE_LENGTH
 from backend.dependencies.list_dependencies import require_board_role_from_list
 from backend.dependencies.board_dependencies import require_board_role, owner_roles, edit_roles, any_roles
-from backend.dependencies.db_dependencies import get_db
+from backend.dependencies.db_dependencies import get_db, run_db, run_in_session
 from backend.models.task_list import TaskList
 
 from backend.schemas.authentication import TokenData
-from backend.schemas.list import ListCreateRequest, ListUpdateRequest, ListResponse
-from backend.utils.board_utils import get_board_by_id
-from backend.utils.list_utils import get_task_list_by_id, get_lists_of_board
+from backend.schemas.list import ListCreateRequest, ListUpdateRequest, ListResponse, ListMoveRequest
+from backend.schemas.pagination import PageParams, PageResponse
+from backend.utils.activity_utils import record_list_activity
+from backend.utils.board_utils import get_board_by_id, bump_board_version
+from backend.utils.event_utils import publish_board_event
+from backend.utils.list_utils import get_lists_of_board, delete_task_list
+from backend.utils.rank_utils import get_rank_for_position, rebalance_ranks
+from backend.utils.response_cache_utils import get_cached_json
+from backend.utils.stats_utils import delete_task_counts_of_list
+from backend.utils.task_utils import delete_tasks_of_list
 
 
 list_router = APIRouter(tags=['List'])
@@ -20,97 +27,136 @@ class ListController:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_list(self, board_id: int, list_info: ListCreateRequest) ->ListResponse:
+    def create_list(self, board_id: int, list_info: ListCreateRequest, active_user: TokenData) ->ListResponse:
 
         db_board = get_board_by_id(board_id=board_id,db=self.db)
         if not db_board:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board does not exist")
-        new_list = TaskList(name=list_info.name, description=list_info.description, board_id=board_id)
+        rank, _ = get_rank_for_position(TaskList, TaskList.board_id, board_id, db=self.db)
+        new_list = TaskList(name=list_info.name, description=list_info.description, board_id=board_id, rank=rank)
 
         self.db.add(new_list)
+        bump_board_version(board_id=board_id, db=self.db)
         self.db.commit()
         self.db.refresh(new_list)
 
-        return ListResponse.model_validate(new_list.model_dump())
+        list_response = ListResponse.model_validate(new_list.model_dump())
+        publish_board_event(board_id, "list.created", list_response)
+        record_list_activity("list.created", list_response, user_id=active_user.id,
+                             description='Created list "{task_list.name}"')
+        return list_response
 
-    def update_list(self, list_id: int, list_update: ListUpdateRequest) -> ListResponse:
-
-        db_list = get_task_list_by_id(task_list_id=list_id, db=self.db )
-        if not db_list:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List does not exist")
+    def update_list(self, db_list: TaskList, list_update: ListUpdateRequest, active_user: TokenData) -> ListResponse:
 
         update_data = list_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_list, key, value)
+        bump_board_version(board_id=db_list.board_id, db=self.db)
 
         self.db.commit()
         self.db.refresh(db_list)
 
-        return ListResponse.model_validate(db_list.model_dump())
-
-    def delete_list(self, list_id: int) -> None:
-        #todo handle cascade deleting, board and tasks in the board should get deleted
-
-        db_list = get_task_list_by_id(task_list_id=list_id, db=self.db )
-        if not db_list:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List does not exist")
+        list_response = ListResponse.model_validate(db_list.model_dump())
+        publish_board_event(list_response.board_id, "list.updated", list_response)
+        record_list_activity("list.updated", list_response, user_id=active_user.id,
+                             description=f"Updated {', '.join(sorted(update_data)) or 'nothing'}")
+        return list_response
+
+    def move_list(self, db_list: TaskList, list_move: ListMoveRequest, background_tasks: BackgroundTasks,
+                  active_user: TokenData) -> ListResponse:
+        rank, crowded = get_rank_for_position(TaskList, TaskList.board_id, db_list.board_id, db=self.db,
+                                              previous_id=list_move.previous_list_id,
+                                              next_id=list_move.next_list_id, exclude_id=db_list.id)
+        db_list.rank = rank
+        bump_board_version(board_id=db_list.board_id, db=self.db)
+        self.db.commit()
+        self.db.refresh(db_list)
 
-        self.db.delete(db_list)
+        if crowded or len(rank) > RANK_REBALANCE_LENGTH:
+            background_tasks.add_task(run_in_session, rebalance_ranks, TaskList, TaskList.board_id, db_list.board_id,
+                                      board_id=db_list.board_id)
+        list_response = ListResponse.model_validate(db_list.model_dump())
+        publish_board_event(list_response.board_id, "list.moved", list_response)
+        record_list_activity("list.moved", list_response, user_id=active_user.id, description="Moved list")
+        return list_response
+
+    # One transaction of set-based statements, the list's tasks are never loaded
+    def delete_list(self, db_list: TaskList, active_user: TokenData) -> None:
+        list_response = ListResponse.model_validate(db_list.model_dump())
+        delete_tasks_of_list(list_id=list_response.id, db=self.db)
+        delete_task_counts_of_list(list_id=list_response.id, db=self.db)
+        delete_task_list(task_list_id=list_response.id, db=self.db)
+        bump_board_version(board_id=list_response.board_id, db=self.db)
         self.db.commit()
+        publish_board_event(list_response.board_id, "list.deleted", {"id": list_response.id})
+        record_list_activity("list.deleted", list_response, user_id=active_user.id,
+                             description='Deleted list "{task_list.name}"')
 
         return None
 
-    def get_list(self, list_id: int) -> ListResponse:
-        db_list = get_task_list_by_id(task_list_id=list_id, db=self.db )
-        if not db_list:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List does not exist")
-
+    def get_list(self, db_list: TaskList) -> ListResponse:
         return ListResponse.model_validate(db_list.model_dump())
 
-    def get_board_lists(self, board_id: int) -> List[ListResponse]:
+    def get_board_lists(self, board_id: int, page: PageParams) -> PageResponse[ListResponse]:
         db_board = get_board_by_id(board_id=board_id, db=self.db)
         if not db_board:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board does not exist")
-        lists = get_lists_of_board(board_id, self.db)
-        return [ListResponse.model_validate(db_list.model_dump()) for db_list in lists]
+        lists, next_cursor = get_lists_of_board(board_id=board_id, page=page, db=self.db)
+        return PageResponse[ListResponse](
+            items=[ListResponse.model_validate(db_list.model_dump()) for db_list in lists],
+            next_cursor=next_cursor
+        )
 
 
-def get_list_controller(db: Session = Depends(get_db)) -> ListController:
+async def get_list_controller(db: Session = Depends(get_db)) -> ListController:
     return ListController(db)
 
 @list_router.post("/board/{board_id}/list", response_model=ListResponse, status_code=status.HTTP_201_CREATED)
-def create_list(board_id: int,
-                list_info: ListCreateRequest,
-                controller: ListController = Depends(get_list_controller),
-                _: TokenData = Depends(get_current_user),
-                __: None = Depends(require_board_role(edit_roles()))):
-    return controller.create_list(board_id=board_id, list_info=list_info)
+async def create_list(board_id: int,
+                      list_info: ListCreateRequest,
+                      controller: ListController = Depends(get_list_controller),
+                      active_user: TokenData = Depends(get_current_user),
+                      _: None = Depends(require_board_role(edit_roles()))):
+    return await run_db(controller.create_list, board_id=board_id, list_info=list_info, active_user=active_user)
 
 @list_router.patch("/list/{list_id}", response_model=ListResponse, status_code=status.HTTP_200_OK)
-def update_list(list_id: int,
-                list_update: ListUpdateRequest,
-                controller: ListController = Depends(get_list_controller),
-                _: TokenData = Depends(get_current_user),
-                __: None = Depends(require_board_role_from_list(edit_roles()))):
-    return controller.update_list(list_id=list_id, list_update=list_update)
+async def update_list(list_id: int,
+                      list_update: ListUpdateRequest,
+                      controller: ListController = Depends(get_list_controller),
+                      active_user: TokenData = Depends(get_current_user),
+                      db_list: TaskList = Depends(require_board_role_from_list(edit_roles()))):
+    return await run_db(controller.update_list, db_list=db_list, list_update=list_update, active_user=active_user)
+
+@list_router.post("/list/{list_id}/move", response_model=ListResponse, status_code=status.HTTP_200_OK)
+async def move_list(list_id: int,
+                    list_move: ListMoveRequest,
+                    background_tasks: BackgroundTasks,
+                    controller: ListController = Depends(get_list_controller),
+                    active_user: TokenData = Depends(get_current_user),
+                    db_list: TaskList = Depends(require_board_role_from_list(edit_roles()))):
+    return await run_db(controller.move_list, db_list=db_list, list_move=list_move, background_tasks=background_tasks,
+                        active_user=active_user)
 
 @list_router.delete("/list/{list_id}",  status_code=status.HTTP_204_NO_CONTENT)
-def delete_list(list_id: int,
-                controller: ListController = Depends(get_list_controller),
-                _: TokenData = Depends(get_current_user),
-                __: None = Depends(require_board_role_from_list(edit_roles()))):
-    return controller.delete_list(list_id=list_id)
+async def delete_list(list_id: int,
+                      controller: ListController = Depends(get_list_controller),
+                      active_user: TokenData = Depends(get_current_user),
+                      db_list: TaskList = Depends(require_board_role_from_list(edit_roles()))):
+    return await run_db(controller.delete_list, db_list=db_list, active_user=active_user)
 
 @list_router.get("/list/{list_id}", response_model=ListResponse, status_code=status.HTTP_200_OK)
-def get_list(list_id: int,
-            controller: ListController = Depends(get_list_controller),
-            _: TokenData = Depends(get_current_user),
-            __: None = Depends(require_board_role_from_list(any_roles()))):
-    return controller.get_list(list_id=list_id)
-
-@list_router.get("/board/{board_id}/list", response_model=List[ListResponse], status_code=status.HTTP_200_OK)
-def get_board_lists(board_id: int,
-                controller: ListController = Depends(get_list_controller),
-                _: TokenData = Depends(get_current_user),
-                __: None = Depends(require_board_role(any_roles()))):
-    return controller.get_board_lists(board_id=board_id)
+async def get_list(list_id: int,
+                  controller: ListController = Depends(get_list_controller),
+                  _: TokenData = Depends(get_current_user),
+                  db_list: TaskList = Depends(require_board_role_from_list(any_roles(), etag=True))):
+    return await run_db(controller.get_list, db_list=db_list)
+
+@list_router.get("/board/{board_id}/list", response_model=PageResponse[ListResponse], status_code=status.HTTP_200_OK)
+async def get_board_lists(board_id: int,
+                          page: PageParams = Query(),
+                      controller: ListController = Depends(get_list_controller),
+                      _: TokenData = Depends(get_current_user),
+                      etag: str = Depends(require_board_role(any_roles(), etag=True))):
+    content = await run_db(get_cached_json, f"board-lists:{etag}:{page.model_dump_json()}",
+                           controller.get_board_lists, board_id=board_id, page=page)
+    return Response(content, media_type="application/json", headers={"ETag": etag})
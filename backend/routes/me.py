@@ -1,19 +1,22 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Response, status, HTTPException
 from sqlmodel import Session, select
 
-from backend.authentication.encryption import hash_password
+from backend.authentication.encryption import hash_password_in_pool
 from backend.dependencies.auth_dependencies import get_current_user
-from backend.dependencies.db_dependencies import get_db
-from backend.models.board import Board
-from backend.models.relationships import UserBoardLink
+from backend.dependencies.db_dependencies import get_db, run_db
 from backend.models.user import User
 from backend.schemas.authentication import TokenData
 from backend.schemas.board import BoardResponse
+from backend.schemas.pagination import PageParams, PageResponse
+from backend.schemas.task import AssignedTaskQueryParams, TaskFilterParams, TaskResponse
 from backend.schemas.user import UserResponse
 from backend.schemas.invitation import InvitationResponse
+from backend.utils.assignment_utils import get_assigned_tasks_of_user
 from backend.utils.invitation_utils import get_pending_invitations_for_user, get_past_invitations_for_user
 from backend.schemas.user import UserUpdateRequest
 from backend.utils.user_utils import get_user_by_id, email_exists
+from backend.utils.board_utils import get_boards_of_user, bump_board_versions_of_user, get_user_boards_version
+from backend.utils.response_cache_utils import get_cached_json
 
 me_router = APIRouter(prefix="/me", tags=['Me'])
 
@@ -21,26 +24,49 @@ class MeController:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_my_boards(self, active_user: TokenData = Depends(get_current_user)) -> list[BoardResponse]:
-        board_statement = select(Board).join(UserBoardLink).where(UserBoardLink.user_id == active_user.id)
-        boards = self.db.exec(board_statement).all()
-        return [BoardResponse.model_validate(board.model_dump()) for board in boards]
+    def get_my_boards(self, page: PageParams,
+                      active_user: TokenData = Depends(get_current_user)) -> PageResponse[BoardResponse]:
+        boards, next_cursor = get_boards_of_user(user_id=active_user.id, page=page, db=self.db)
+        return PageResponse[BoardResponse](
+            items=[BoardResponse.model_validate(board.model_dump()) for board in boards],
+            next_cursor=next_cursor
+        )
+
+    def get_my_tasks(self, query: AssignedTaskQueryParams, active_user: TokenData) -> PageResponse[TaskResponse]:
+        filters = TaskFilterParams(status=query.status, due_after=query.due_after, due_before=query.due_before)
+        tasks, next_cursor = get_assigned_tasks_of_user(user_id=active_user.id, page=query, filters=filters,
+                                                        db=self.db)
+        return PageResponse[TaskResponse](
+            items=[TaskResponse.model_validate(task.model_dump()) for task in tasks],
+            next_cursor=next_cursor
+        )
 
     def get_my_profile(self, active_user: TokenData = Depends(get_current_user)) -> UserResponse:
         user_statement = select(User).where(User.id == active_user.id)
         user = self.db.exec(user_statement).first()
         return UserResponse.model_validate(user.model_dump())
 
-    def get_my_pending_invitations(self, active_user: TokenData = Depends(get_current_user)) -> list[InvitationResponse]:
-        pending_invitations = get_pending_invitations_for_user(user_id=active_user.id,db=self.db)
-        return [InvitationResponse.model_validate(invitation.model_dump()) for invitation in pending_invitations]
+    def get_my_pending_invitations(self, page: PageParams,
+                                   active_user: TokenData = Depends(get_current_user)) -> PageResponse[InvitationResponse]:
+        pending_invitations, next_cursor = get_pending_invitations_for_user(user_id=active_user.id, page=page,
+                                                                             db=self.db)
+        return PageResponse[InvitationResponse](
+            items=[InvitationResponse.model_validate(invitation.model_dump()) for invitation in pending_invitations],
+            next_cursor=next_cursor
+        )
 
-    def get_my_past_invitations(self, active_user: TokenData = Depends(get_current_user)) -> list[InvitationResponse]:
+    def get_my_past_invitations(self, page: PageParams,
+                                active_user: TokenData = Depends(get_current_user)) -> PageResponse[InvitationResponse]:
 
-        past_invitations = get_past_invitations_for_user(user_id=active_user.id,db=self.db)
-        return [InvitationResponse.model_validate(invitation.model_dump()) for invitation in past_invitations]
+        past_invitations, next_cursor = get_past_invitations_for_user(user_id=active_user.id, page=page, db=self.db)
+        return PageResponse[InvitationResponse](
+            items=[InvitationResponse.model_validate(invitation.model_dump()) for invitation in past_invitations],
+            next_cursor=next_cursor
+        )
 
     def update_my_info(self, user_update: UserUpdateRequest, active_user: TokenData = Depends(get_current_user)) -> UserResponse:
+        # hashed before any query so no pooled connection is held while bcrypt runs
+        hashed_password = hash_password_in_pool(password=user_update.password) if user_update.password else None
         user = get_user_by_id(user_id=active_user.id, db=self.db)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User does not exist")
@@ -51,43 +77,57 @@ class MeController:
         update_data = user_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             if key == "password":
-                setattr(user, "hashed_password", hash_password(password=key))
+                if hashed_password:
+                    setattr(user, "hashed_password", hashed_password)
             elif hasattr(user, key):
                 setattr(user, key, value)
+        bump_board_versions_of_user(user_id=user.id, db=self.db)
 
         self.db.commit()
         self.db.refresh(user)
         return UserResponse.model_validate(user.model_dump())
 
 
-def get_me_controller(db: Session = Depends(get_db)) -> MeController:
+async def get_me_controller(db: Session = Depends(get_db)) -> MeController:
     return MeController(db)
 
-@me_router.get("/boards", response_model=list[BoardResponse], status_code=status.HTTP_200_OK)
-def get_user_boards(controller: MeController = Depends(get_me_controller),
-                    active_user: TokenData = Depends(get_current_user)):
-    return controller.get_my_boards(active_user=active_user)
+@me_router.get("/boards", response_model=PageResponse[BoardResponse], status_code=status.HTTP_200_OK)
+async def get_user_boards(page: PageParams = Query(),
+                          controller: MeController = Depends(get_me_controller),
+                          active_user: TokenData = Depends(get_current_user)):
+    boards_version = await run_db(get_user_boards_version, user_id=active_user.id, db=controller.db)
+    content = await run_db(get_cached_json, f"user-boards:{active_user.id}-{boards_version}:{page.model_dump_json()}",
+                           controller.get_my_boards, page=page, active_user=active_user)
+    return Response(content, media_type="application/json")
+
+@me_router.get("/tasks", response_model=PageResponse[TaskResponse], status_code=status.HTTP_200_OK)
+async def get_my_tasks(query: AssignedTaskQueryParams = Query(),
+                       controller: MeController = Depends(get_me_controller),
+                       active_user: TokenData = Depends(get_current_user)):
+    return await run_db(controller.get_my_tasks, query=query, active_user=active_user)
 
 @me_router.patch("/user", response_model=UserResponse, status_code=status.HTTP_200_OK)
-def update_my_info(user_update: UserUpdateRequest,
-                   controller: MeController = Depends(get_me_controller),
-                   active_user: TokenData = Depends(get_current_user)):
-    return controller.update_my_info( user_update=user_update, active_user=active_user)
+async def update_my_info(user_update: UserUpdateRequest,
+                         controller: MeController = Depends(get_me_controller),
+                         active_user: TokenData = Depends(get_current_user)):
+    return await run_db(controller.update_my_info, user_update=user_update, active_user=active_user)
 
 @me_router.get("/user", response_model=UserResponse, status_code=status.HTTP_200_OK)
-def get_my_profile(controller: MeController = Depends(get_me_controller),
-                   active_user: TokenData = Depends(get_current_user)):
-    return controller.get_my_profile(active_user=active_user)
-
-@me_router.get("/pending-invitations", response_model=list[InvitationResponse], status_code=status.HTTP_200_OK)
-def get_my_pending_invitations(controller: MeController = Depends(get_me_controller),
-                   active_user: TokenData = Depends(get_current_user)):
-    return controller.get_my_pending_invitations(active_user=active_user)
-
-@me_router.get("/past-invitations", response_model=list[InvitationResponse], status_code=status.HTTP_200_OK)
-def get_my_past_invitations(controller: MeController = Depends(get_me_controller),
-                   active_user: TokenData = Depends(get_current_user)):
-    return controller.get_my_past_invitations(active_user=active_user)
+async def get_my_profile(controller: MeController = Depends(get_me_controller),
+                         active_user: TokenData = Depends(get_current_user)):
+    return await run_db(controller.get_my_profile, active_user=active_user)
+
+@me_router.get("/pending-invitations", response_model=PageResponse[InvitationResponse], status_code=status.HTTP_200_OK)
+async def get_my_pending_invitations(page: PageParams = Query(),
+                                     controller: MeController = Depends(get_me_controller),
+                         active_user: TokenData = Depends(get_current_user)):
+    return await run_db(controller.get_my_pending_invitations, page=page, active_user=active_user)
+
+@me_router.get("/past-invitations", response_model=PageResponse[InvitationResponse], status_code=status.HTTP_200_OK)
+async def get_my_past_invitations(page: PageParams = Query(),
+                                  controller: MeController = Depends(get_me_controller),
+                         active_user: TokenData = Depends(get_current_user)):
+    return await run_db(controller.get_my_past_invitations, page=page, active_user=active_user)
 
 
 
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, status
+
+from backend.authentication.jwt_handler import get_current_user, token_cache
+from backend.database.db_config import engine, async_engine
+from backend.dependencies.auth_dependencies import require_role
+from backend.schemas.authentication import TokenData
+from backend.utils.activity_utils import activity_writer
+from backend.utils.board_utils import membership_cache
+from backend.utils.event_utils import event_broker
+from backend.utils.response_cache_utils import response_cache
+
+stats_router = APIRouter(prefix="/stats", tags=['Stats'])
+
+class StatsController:
+
+    def get_cache_stats(self) -> dict:
+        return {
+            "membership": membership_cache.stats(),
+            "token": token_cache.stats(),
+            "response": response_cache.stats(),
+        }
+
+    def get_pool_stats(self) -> dict:
+        pools = {"sync": engine.pool.pool_stats()}
+        if async_engine is not None:
+            pools["async"] = async_engine.sync_engine.pool.pool_stats()
+        return pools
+
+    def get_event_stats(self) -> dict:
+        return event_broker.stats()
+
+    def get_activity_stats(self) -> dict:
+        return activity_writer.stats()
+
+
+async def get_stats_controller() -> StatsController:
+    return StatsController()
+
+@stats_router.get("/cache", status_code=status.HTTP_200_OK)
+async def get_cache_stats(controller: StatsController = Depends(get_stats_controller),
+                          _: TokenData = Depends(get_current_user),
+                          __: TokenData = Depends(require_role(["admin"]))):
+    return controller.get_cache_stats()
+
+@stats_router.get("/pool", status_code=status.HTTP_200_OK)
+async def get_pool_stats(controller: StatsController = Depends(get_stats_controller),
+                         _: TokenData = Depends(get_current_user),
+                         __: TokenData = Depends(require_role(["admin"]))):
+    return controller.get_pool_stats()
+
+@stats_router.get("/events", status_code=status.HTTP_200_OK)
+async def get_event_stats(controller: StatsController = Depends(get_stats_controller),
+                          _: TokenData = Depends(get_current_user),
+                          __: TokenData = Depends(require_role(["admin"]))):
+    return controller.get_event_stats()
+
+@stats_router.get("/activity", status_code=status.HTTP_200_OK)
+async def get_activity_stats(controller: StatsController = Depends(get_stats_controller),
+                             _: TokenData = Depends(get_current_user),
+                             __: TokenData = Depends(require_role(["admin"]))):
+    return controller.get_activity_stats()
@@ -0,0 +1,178 @@
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from backend.authentication.jwt_handler import get_current_user
+from backend.dependencies.board_dependencies import any_roles, edit_roles, require_board_role
+from backend.dependencies.db_dependencies import get_db, run_db
+from backend.dependencies.tag_dependencies import require_board_role_from_tag
+from backend.models.tag import TaskTag
+from backend.schemas.authentication import TokenData
+from backend.schemas.pagination import PageParams, PageResponse
+from backend.schemas.tag import TagCreateRequest, TagUpdateRequest, TagResponse, TagTasksRequest, TagTasksResponse
+from backend.schemas.task import TaskResponse
+from backend.utils.activity_utils import record_task_activities
+from backend.utils.board_utils import get_board_by_id, bump_board_version
+from backend.utils.event_utils import publish_board_event
+from backend.utils.tag_utils import get_tag_of_board_by_name, get_tags_of_board, get_tasks_of_tag, \
+    get_tagged_task_ids, insert_tag_links, delete_tag_links, delete_tag_with_links
+from backend.utils.task_utils import get_tasks_of_board_by_ids
+
+tag_router = APIRouter(tags=['Tag'])
+
+class TagController:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _check_name_is_free(self, board_id: int, name: str) -> None:
+        if get_tag_of_board_by_name(board_id=board_id, name=name, db=self.db):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tag already exists on this board")
+
+    # a concurrent request may take the name between the check and the write, the unique
+    # (board_id, name) index then rejects this one
+    def _save_tag(self, board_id: int) -> None:
+        try:
+            self.db.flush()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tag already exists on this board")
+        bump_board_version(board_id=board_id, db=self.db)
+        self.db.commit()
+
+    def create_tag(self, board_id: int, tag_info: TagCreateRequest) -> TagResponse:
+        if not get_board_by_id(board_id=board_id, db=self.db):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board does not exist")
+        self._check_name_is_free(board_id=board_id, name=tag_info.name)
+
+        new_tag = TaskTag(name=tag_info.name, board_id=board_id)
+        self.db.add(new_tag)
+        self._save_tag(board_id=board_id)
+        self.db.refresh(new_tag)
+
+        tag = TagResponse.model_validate(new_tag.model_dump())
+        publish_board_event(board_id, "tag.created", tag)
+        return tag
+
+    def get_board_tags(self, board_id: int, page: PageParams) -> PageResponse[TagResponse]:
+        tags, next_cursor = get_tags_of_board(board_id=board_id, page=page, db=self.db)
+        return PageResponse[TagResponse](
+            items=[TagResponse.model_validate(tag.model_dump()) for tag in tags],
+            next_cursor=next_cursor
+        )
+
+    def update_tag(self, db_tag: TaskTag, tag_update: TagUpdateRequest) -> TagResponse:
+        if tag_update.name != db_tag.name:
+            self._check_name_is_free(board_id=db_tag.board_id, name=tag_update.name)
+            db_tag.name = tag_update.name
+            self._save_tag(board_id=db_tag.board_id)
+            self.db.refresh(db_tag)
+            publish_board_event(db_tag.board_id, "tag.updated", TagResponse.model_validate(db_tag.model_dump()))
+
+        return TagResponse.model_validate(db_tag.model_dump())
+
+    def delete_tag(self, db_tag: TaskTag) -> None:
+        tag = TagResponse.model_validate(db_tag.model_dump())
+        delete_tag_with_links(tag_id=tag.id, db=self.db)
+        bump_board_version(board_id=tag.board_id, db=self.db)
+        self.db.commit()
+        publish_board_event(tag.board_id, "tag.deleted", {"id": tag.id})
+
+        return None
+
+    def get_tag_tasks(self, db_tag: TaskTag, page: PageParams) -> PageResponse[TaskResponse]:
+        tasks, next_cursor = get_tasks_of_tag(tag_id=db_tag.id, page=page, db=self.db)
+        return PageResponse[TaskResponse](
+            items=[TaskResponse.model_validate(task.model_dump()) for task in tasks],
+            next_cursor=next_cursor
+        )
+
+    # Tags or untags every task of the batch in one transaction: one read of the tasks, one of their
+    # existing links, then a single insert or delete of the links that change. Links a concurrent
+    # request changed in the meantime are skipped by the write and left out of the response.
+    def change_tag_tasks(self, db_tag: TaskTag, batch: TagTasksRequest, add: bool,
+                         active_user: TokenData) -> TagTasksResponse:
+        task_ids = list(dict.fromkeys(batch.task_ids))
+        tasks = {task.id: task for task in
+                 get_tasks_of_board_by_ids(board_id=db_tag.board_id, task_ids=task_ids, db=self.db)}
+        tagged_ids = get_tagged_task_ids(tag_id=db_tag.id, task_ids=list(tasks), db=self.db)
+        changed_ids = [task_id for task_id in task_ids if task_id in tasks and (task_id in tagged_ids) != add]
+        task_responses = {task_id: TaskResponse.model_validate(tasks[task_id].model_dump()) for task_id in changed_ids}
+
+        if changed_ids:
+            change_tag_links = insert_tag_links if add else delete_tag_links
+            written_ids = change_tag_links(tag_id=db_tag.id, task_ids=changed_ids, db=self.db)
+            changed_ids = [task_id for task_id in changed_ids if task_id in written_ids]
+        if changed_ids:
+            bump_board_version(board_id=db_tag.board_id, db=self.db)
+            self.db.commit()
+            self.db.refresh(db_tag)
+
+        tag = TagResponse.model_validate(db_tag.model_dump())
+        changed_tasks = [task_responses[task_id] for task_id in changed_ids]
+        if changed_ids:
+            action = "tagged" if add else "untagged"
+            publish_board_event(tag.board_id, f"tasks.{action}", {"tag": tag, "task_ids": changed_ids})
+            tag_name = tag.name.replace("{", "{{").replace("}", "}}")
+            record_task_activities(f"task.{action}", changed_tasks, user_id=active_user.id,
+                                   description=f'{action.capitalize()} "{tag_name}"')
+        return TagTasksResponse(tag=tag, changed_task_ids=changed_ids,
+                                not_found_task_ids=[task_id for task_id in task_ids if task_id not in tasks])
+
+
+async def get_tag_controller(db: Session = Depends(get_db)) -> TagController:
+    return TagController(db)
+
+@tag_router.post("/board/{board_id}/tags", response_model=TagResponse, status_code=status.HTTP_201_CREATED)
+async def create_tag(board_id: int,
+                     tag_info: TagCreateRequest,
+                     controller: TagController = Depends(get_tag_controller),
+                     _: TokenData = Depends(get_current_user),
+                     __: None = Depends(require_board_role(edit_roles()))):
+    return await run_db(controller.create_tag, board_id=board_id, tag_info=tag_info)
+
+@tag_router.get("/board/{board_id}/tags", response_model=PageResponse[TagResponse], status_code=status.HTTP_200_OK)
+async def get_board_tags(board_id: int,
+                         page: PageParams = Query(),
+                         controller: TagController = Depends(get_tag_controller),
+                         _: TokenData = Depends(get_current_user),
+                         __: str = Depends(require_board_role(any_roles(), etag=True))):
+    return await run_db(controller.get_board_tags, board_id=board_id, page=page)
+
+@tag_router.patch("/tag/{tag_id}", response_model=TagResponse, status_code=status.HTTP_200_OK)
+async def update_tag(tag_id: int,
+                     tag_update: TagUpdateRequest,
+                     controller: TagController = Depends(get_tag_controller),
+                     _: TokenData = Depends(get_current_user),
+                     db_tag: TaskTag = Depends(require_board_role_from_tag(edit_roles()))):
+    return await run_db(controller.update_tag, db_tag=db_tag, tag_update=tag_update)
+
+@tag_router.delete("/tag/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_tag(tag_id: int,
+                     controller: TagController = Depends(get_tag_controller),
+                     _: TokenData = Depends(get_current_user),
+                     db_tag: TaskTag = Depends(require_board_role_from_tag(edit_roles()))):
+    return await run_db(controller.delete_tag, db_tag=db_tag)
+
+@tag_router.get("/tag/{tag_id}/tasks", response_model=PageResponse[TaskResponse], status_code=status.HTTP_200_OK)
+async def get_tag_tasks(tag_id: int,
+                        page: PageParams = Query(),
+                        controller: TagController = Depends(get_tag_controller),
+                        _: TokenData = Depends(get_current_user),
+                        db_tag: TaskTag = Depends(require_board_role_from_tag(any_roles()))):
+    return await run_db(controller.get_tag_tasks, db_tag=db_tag, page=page)
+
+@tag_router.post("/tag/{tag_id}/tasks:batch", response_model=TagTasksResponse, status_code=status.HTTP_200_OK)
+async def tag_tasks(tag_id: int,
+                    batch: TagTasksRequest,
+                    controller: TagController = Depends(get_tag_controller),
+                    active_user: TokenData = Depends(get_current_user),
+                    db_tag: TaskTag = Depends(require_board_role_from_tag(edit_roles()))):
+    return await run_db(controller.change_tag_tasks, db_tag=db_tag, batch=batch, add=True, active_user=active_user)
+
+@tag_router.delete("/tag/{tag_id}/tasks:batch", response_model=TagTasksResponse, status_code=status.HTTP_200_OK)
+async def untag_tasks(tag_id: int,
+                      batch: TagTasksRequest = Body(),
+                      controller: TagController = Depends(get_tag_controller),
+                      active_user: TokenData = Depends(get_current_user),
+                      db_tag: TaskTag = Depends(require_board_role_from_tag(edit_roles()))):
+    return await run_db(controller.change_tag_tasks, db_tag=db_tag, batch=batch, add=False, active_user=active_user)
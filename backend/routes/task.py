@@ -1,16 +1,31 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
 from backend.authentication.jwt_handler import get_current_user
-from backend.dependencies.db_dependencies import get_db
+from backend.config import RANK_REBALANCE_LENGTH
+from backend.dependencies.db_dependencies import get_db, run_db, open_db, run_in_session
+from backend.models.relationships import TaskUserLink
 from backend.models.task import Task
+from backend.models.task_list import TaskList
 
 from backend.schemas.authentication import TokenData
-from backend.schemas.task import TaskCreateRequest, TaskResponse, TaskUpdateRequest
-from backend.utils.board_utils import get_board_by_id
-from backend.utils.task_utils import get_task_by_id, get_tasks_of_list, get_tasks_of_board
+from backend.schemas.pagination import PageParams, PageResponse
+from backend.schemas.task import TaskCreateRequest, TaskResponse, TaskUpdateRequest, TaskBatchCreateRequest, \
+    TaskBatchUpdateRequest, TaskBatchDeleteRequest, TaskBatchResult, TaskBatchResponse, TaskMoveRequest, \
+    TaskSearchResult, TaskSearchParams, TaskQueryParams
+from backend.schemas.user import UserResponse
+from backend.utils.activity_utils import record_task_activities
+from backend.utils.assignment_utils import is_user_assigned_to_task, delete_task_assignment, get_assignees_of_task
+from backend.utils.board_utils import get_board_by_id, bump_board_version, check_if_user_in_board
+from backend.utils.event_utils import publish_board_event
 from backend.utils.list_utils import get_task_list_by_id
+from backend.utils.response_cache_utils import get_cached_json
+from backend.utils.search_utils import search_tasks_of_board
+from backend.utils.rank_utils import get_rank_for_position, get_neighbour_ranks, ranks_between, rebalance_ranks
+from backend.utils.task_utils import get_tasks_of_list, get_tasks_of_board, iter_task_batches_of_board, \
+    bulk_insert_tasks, bulk_update_tasks, bulk_delete_tasks, get_tasks_of_board_by_ids
+from backend.utils.stats_utils import adjust_task_counts, count_tasks
 from backend.dependencies.list_dependencies import require_board_role_from_list
 from backend.dependencies.task_dependency import require_board_role_from_task
 from backend.dependencies.board_dependencies import any_roles, edit_roles, require_board_role
@@ -21,126 +36,374 @@ class TaskController:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_task(self, task_list_id: int, task_info: TaskCreateRequest,
+    def create_task(self, task_list: TaskList, task_info: TaskCreateRequest,
                     active_user: TokenData = Depends(get_current_user)) -> TaskResponse:
-        task_list = get_task_list_by_id(task_list_id=task_list_id, db=self.db)
-        if not task_list:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List does not exist")
+        rank, _ = get_rank_for_position(Task, Task.list_id, task_list.id, db=self.db)
         new_task = Task(
             title=task_info.title,
             description=task_info.description,
             priority=task_info.priority,
             status=task_info.status,
             due_date=task_info.due_date,
-            list_id=task_list_id,
+            list_id=task_list.id,
             creator_id=active_user.id,
-            board_id = task_list.board_id
+            board_id = task_list.board_id,
+            rank=rank
         )
 
         self.db.add(new_task)
+        adjust_task_counts(count_tasks([new_task]), db=self.db)
+        bump_board_version(board_id=task_list.board_id, db=self.db)
         self.db.commit()
         self.db.refresh(new_task)
 
-        return TaskResponse.model_validate(new_task.model_dump())
+        task = TaskResponse.model_validate(new_task.model_dump())
+        publish_board_event(task.board_id, "task.created", task)
+        record_task_activities("task.created", [task], user_id=active_user.id, description='Created task "{task.title}"')
+        return task
 
-    def delete_task(self, task_id: int) -> None:
-        db_task = get_task_by_id(task_id=task_id, db=self.db)
-        if not db_task:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist")
-
-        self.db.delete(db_task)
+    def delete_task(self, db_task: Task, active_user: TokenData) -> None:
+        task = TaskResponse.model_validate(db_task.model_dump())
+        bulk_delete_tasks(task_ids=[task.id], db=self.db)
+        adjust_task_counts(count_tasks([db_task], sign=-1), db=self.db)
+        bump_board_version(board_id=task.board_id, db=self.db)
         self.db.commit()
+        publish_board_event(task.board_id, "task.deleted", {"id": task.id, "list_id": task.list_id})
+        record_task_activities("task.deleted", [task], user_id=active_user.id, description='Deleted task "{task.title}"')
 
         return None
 
-    def get_task(self, task_id: int) -> TaskResponse:
-        db_task = get_task_by_id(task_id=task_id, db=self.db)
-        if not db_task:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist")
-
+    def get_task(self, db_task: Task) -> TaskResponse:
         return TaskResponse.model_validate(db_task.model_dump())
 
-    def update_task(self,task_id: int, task_update: TaskUpdateRequest) -> TaskResponse:
-        db_task = get_task_by_id(task_id=task_id, db=self.db)
-        if not db_task:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist")
+    # Only the moved task is written: its new rank is chosen between the neighbours' ranks
+    def move_task(self, db_task: Task, task_move: TaskMoveRequest, background_tasks: BackgroundTasks,
+                  active_user: TokenData) -> TaskResponse:
+        list_id = task_move.list_id if task_move.list_id is not None else db_task.list_id
+        if list_id != db_task.list_id:
+            target_list = get_task_list_by_id(task_list_id=list_id, db=self.db)
+            if not target_list or target_list.board_id != db_task.board_id:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List not found")
+
+        rank, crowded = get_rank_for_position(Task, Task.list_id, list_id, db=self.db,
+                                              previous_id=task_move.previous_task_id,
+                                              next_id=task_move.next_task_id, exclude_id=db_task.id)
+        deltas = count_tasks([db_task], sign=-1)
+        db_task.list_id = list_id
+        db_task.rank = rank
+        deltas.update(count_tasks([db_task]))
+        adjust_task_counts(deltas, db=self.db)
+        bump_board_version(board_id=db_task.board_id, db=self.db)
+        self.db.commit()
+        self.db.refresh(db_task)
+
+        if crowded or len(rank) > RANK_REBALANCE_LENGTH:
+            background_tasks.add_task(run_in_session, rebalance_ranks, Task, Task.list_id, list_id,
+                                      board_id=db_task.board_id)
+        task = TaskResponse.model_validate(db_task.model_dump())
+        publish_board_event(task.board_id, "task.moved", task)
+        record_task_activities("task.moved", [task], user_id=active_user.id,
+                               description="Moved task to list {task.list_id}")
+        return task
 
+    def update_task(self, db_task: Task, task_update: TaskUpdateRequest, active_user: TokenData) -> TaskResponse:
         update_data = task_update.model_dump(exclude_unset=True)
+        deltas = count_tasks([db_task], sign=-1)
         for key, value in update_data.items():
             setattr(db_task, key, value)
+        deltas.update(count_tasks([db_task]))
+        adjust_task_counts(deltas, db=self.db)
+        bump_board_version(board_id=db_task.board_id, db=self.db)
 
         self.db.commit()
         self.db.refresh(db_task)
 
-        return TaskResponse.model_validate(db_task.model_dump())
-
-    def get_list_tasks(self, list_id: int) ->  List[TaskResponse]:
-        task_list = get_task_list_by_id(task_list_id=list_id, db=self.db)
-        if not task_list:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task list does not found")
-
-        tasks = get_tasks_of_list(list_id=list_id, db=self.db)
-        return [TaskResponse.model_validate(task.model_dump()) for task in tasks]
+        task = TaskResponse.model_validate(db_task.model_dump())
+        publish_board_event(task.board_id, "task.updated", task)
+        record_task_activities("task.updated", [task], user_id=active_user.id,
+                               description=f"Updated {', '.join(sorted(update_data)) or 'nothing'}")
+        return task
+
+    def create_tasks(self, task_list: TaskList, batch: TaskBatchCreateRequest,
+                     active_user: TokenData) -> TaskBatchResponse:
+        last_rank, _ = get_neighbour_ranks(Task, Task.list_id, task_list.id, previous_rank=None, next_rank=None,
+                                           db=self.db)
+        ranks = ranks_between(last_rank, None, count=len(batch.tasks))
+        rows = [
+            Task(
+                title=task_info.title,
+                description=task_info.description,
+                priority=task_info.priority,
+                status=task_info.status,
+                due_date=task_info.due_date,
+                list_id=task_list.id,
+                creator_id=active_user.id,
+                board_id=task_list.board_id,
+                rank=rank
+            ).model_dump(exclude={"id"})
+            for task_info, rank in zip(batch.tasks, ranks)
+        ]
+        new_tasks = bulk_insert_tasks(rows=rows, db=self.db)
+        results = [
+            TaskBatchResult(id=task.id, status_code=status.HTTP_201_CREATED,
+                            task=TaskResponse.model_validate(task.model_dump()))
+            for task in new_tasks
+        ]
+        adjust_task_counts(count_tasks(new_tasks), db=self.db)
+        bump_board_version(board_id=task_list.board_id, db=self.db)
+        self.db.commit()
+        publish_board_event(task_list.board_id, "tasks.created", {"tasks": [result.task for result in results]})
+        record_task_activities("task.created", [result.task for result in results], user_id=active_user.id,
+                               description='Created task "{task.title}"')
+
+        return TaskBatchResponse(results=results)
+
+    def update_tasks(self, board_id: int, batch: TaskBatchUpdateRequest, active_user: TokenData) -> TaskBatchResponse:
+        db_tasks = {task.id: task for task in
+                    get_tasks_of_board_by_ids(board_id=board_id, task_ids=[item.id for item in batch.tasks], db=self.db)}
+        rows, results, updated_ids, updated_tasks = [], [], set(), []
+        for item in batch.tasks:
+            if item.id not in db_tasks:
+                results.append(TaskBatchResult(id=item.id, status_code=status.HTTP_404_NOT_FOUND,
+                                               detail="Task not found"))
+                continue
+            if item.id in updated_ids:
+                results.append(TaskBatchResult(id=item.id, status_code=status.HTTP_409_CONFLICT,
+                                               detail="Task appears more than once in the batch"))
+                continue
+            updated_ids.add(item.id)
+            update_data = item.model_dump(exclude_unset=True, exclude={"id"})
+            if update_data:
+                rows.append({"id": item.id, **update_data})
+            task = TaskResponse.model_validate({**db_tasks[item.id].model_dump(), **update_data})
+            updated_tasks.append(task)
+            results.append(TaskBatchResult(id=item.id, status_code=status.HTTP_200_OK, task=task))
+
+        if rows:
+            deltas = count_tasks((db_tasks[task.id] for task in updated_tasks), sign=-1)
+            deltas.update(count_tasks(updated_tasks))
+            bulk_update_tasks(rows=rows, db=self.db)
+            adjust_task_counts(deltas, db=self.db)
+            bump_board_version(board_id=board_id, db=self.db)
+            self.db.commit()
+            publish_board_event(board_id, "tasks.updated", {"tasks": updated_tasks})
+            record_task_activities("task.updated", updated_tasks, user_id=active_user.id, description="Updated in a batch")
+
+        return TaskBatchResponse(results=results)
+
+    def delete_tasks(self, board_id: int, batch: TaskBatchDeleteRequest, active_user: TokenData) -> TaskBatchResponse:
+        task_ids = list(dict.fromkeys(batch.task_ids))
+        existing_tasks = get_tasks_of_board_by_ids(board_id=board_id, task_ids=task_ids, db=self.db)
+        existing_ids = {task.id for task in existing_tasks}
+        if existing_ids:
+            deleted_tasks = [TaskResponse.model_validate(task.model_dump()) for task in existing_tasks]
+            bulk_delete_tasks(task_ids=list(existing_ids), db=self.db)
+            adjust_task_counts(count_tasks(existing_tasks, sign=-1), db=self.db)
+            bump_board_version(board_id=board_id, db=self.db)
+            self.db.commit()
+            publish_board_event(board_id, "tasks.deleted", {"ids": sorted(existing_ids)})
+            record_task_activities("task.deleted", deleted_tasks, user_id=active_user.id,
+                                   description='Deleted task "{task.title}"')
+
+        return TaskBatchResponse(results=[
+            TaskBatchResult(id=task_id, status_code=status.HTTP_204_NO_CONTENT) if task_id in existing_ids
+            else TaskBatchResult(id=task_id, status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+            for task_id in task_ids
+        ])
+
+    def get_list_tasks(self, task_list: TaskList, query: TaskQueryParams) -> PageResponse[TaskResponse]:
+        tasks, next_cursor = get_tasks_of_list(list_id=task_list.id, page=query, filters=query, db=self.db)
+        return PageResponse[TaskResponse](
+            items=[TaskResponse.model_validate(task.model_dump()) for task in tasks],
+            next_cursor=next_cursor
+        )
 
-    def get_board_tasks(self, board_id: int) -> List[TaskResponse]:
+    def get_board_tasks(self, board_id: int, query: TaskQueryParams) -> PageResponse[TaskResponse]:
         board = get_board_by_id(board_id=board_id, db=self.db)
         if not board:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board does not exist")
-        tasks = get_tasks_of_board(board_id=board_id, db=self.db)
-        return [TaskResponse.model_validate(task.model_dump()) for task in tasks]
+        tasks, next_cursor = get_tasks_of_board(board_id=board_id, page=query, filters=query, db=self.db)
+        return PageResponse[TaskResponse](
+            items=[TaskResponse.model_validate(task.model_dump()) for task in tasks],
+            next_cursor=next_cursor
+        )
 
+    def search_board_tasks(self, board_id: int, search: TaskSearchParams) -> PageResponse[TaskSearchResult]:
+        results, next_cursor = search_tasks_of_board(board_id=board_id, query=search.q, page=search, db=self.db)
+        return PageResponse[TaskSearchResult](
+            items=[TaskSearchResult(**task.model_dump(), score=score) for task, score in results],
+            next_cursor=next_cursor
+        )
 
+    def assign_user_to_task(self, db_task: Task, user_id: int, active_user: TokenData):
+        if not check_if_user_in_board(board_id=db_task.board_id, user_id=user_id, db=self.db):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User is not a member of this board")
+        if is_user_assigned_to_task(task_id=db_task.id, user_id=user_id, db=self.db):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User is already assigned to this task")
 
-def get_task_controller(db: Session = Depends(get_db)) -> TaskController:
-    return TaskController(db)
+        task = TaskResponse.model_validate(db_task.model_dump())
+        self.db.add(TaskUserLink(task_id=task.id, user_id=user_id))
+        bump_board_version(board_id=task.board_id, db=self.db)
+        self.db.commit()
+        publish_board_event(task.board_id, "task.assigned", {"task_id": task.id, "user_id": user_id})
+        record_task_activities("task.assigned", [task], user_id=active_user.id, description=f"Assigned user {user_id}")
 
-@task_router.get("/task/{task_id}", response_model=TaskResponse, status_code=status.HTTP_200_OK)
-def get_task(task_id: int,
-             controller: TaskController = Depends(get_task_controller),
-             _: TokenData = Depends(get_current_user),
-             __: None = Depends(require_board_role_from_task(any_roles()))):
-    return controller.get_task(task_id=task_id)
+        return {"message": "User assigned to task successfully"}
 
-@task_router.delete("/task/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(task_id: int,
-                controller: TaskController = Depends(get_task_controller),
-                _: TokenData = Depends(get_current_user),
-                __: None = Depends(require_board_role_from_task(edit_roles()))):
-    return controller.delete_task(task_id=task_id)
+    def unassign_user_from_task(self, db_task: Task, user_id: int, active_user: TokenData) -> None:
+        if not is_user_assigned_to_task(task_id=db_task.id, user_id=user_id, db=self.db):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User is not assigned to this task")
 
-@task_router.patch("/task/{task_id}", response_model=TaskResponse, status_code=status.HTTP_200_OK)
-def update_task(task_id: int,
-                task_update: TaskUpdateRequest,
-                controller: TaskController = Depends(get_task_controller),
-                 _: TokenData = Depends(get_current_user),
-                __: None = Depends(require_board_role_from_task(edit_roles()))):
-    return controller.update_task(task_id=task_id, task_update=task_update)
+        task = TaskResponse.model_validate(db_task.model_dump())
+        delete_task_assignment(task_id=task.id, user_id=user_id, db=self.db)
+        bump_board_version(board_id=task.board_id, db=self.db)
+        self.db.commit()
+        publish_board_event(task.board_id, "task.unassigned", {"task_id": task.id, "user_id": user_id})
+        record_task_activities("task.unassigned", [task], user_id=active_user.id,
+                               description=f"Unassigned user {user_id}")
 
-@task_router.post("/list/{list_id}/task", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(list_id: int,
-                task_info: TaskCreateRequest,
-                controller: TaskController = Depends(get_task_controller),
-                active_user: TokenData = Depends(get_current_user),
-                __: None = Depends(require_board_role_from_list(edit_roles()))):
-    return controller.create_task(task_list_id=list_id, task_info=task_info, active_user=active_user)
-
-@task_router.get("/list/{list_id}/task", response_model=List[TaskResponse], status_code=status.HTTP_200_OK)
-def get_list_tasks(list_id: int,
-                   controller: TaskController = Depends(get_task_controller),
-                   _: TokenData = Depends(get_current_user),
-                   __: None = Depends(require_board_role_from_list(any_roles()))):
-    return controller.get_list_tasks(list_id=list_id)
+        return None
 
-@task_router.get("/board/{board_id}/task", response_model=List[TaskResponse], status_code=status.HTTP_200_OK)
-def get_board_tasks(board_id: int,
-                    controller: TaskController = Depends(get_task_controller),
-                    _: TokenData = Depends(get_current_user),
-                    __: None = Depends(require_board_role(any_roles()))):
-    return controller.get_board_tasks(board_id=board_id)
+    def get_task_assignees(self, db_task: Task, page: PageParams) -> PageResponse[UserResponse]:
+        users, next_cursor = get_assignees_of_task(task_id=db_task.id, page=page, db=self.db)
+        return PageResponse[UserResponse](
+            items=[UserResponse.model_validate(user.model_dump()) for user in users],
+            next_cursor=next_cursor
+        )
 
+    async def stream_board_tasks(self, board_id: int):
+        async with open_db() as db:
+            chunks = self._iter_board_task_lines(board_id=board_id, db=db)
+            while chunk := await run_db(next, chunks, None):
+                yield chunk
 
+    def _iter_board_task_lines(self, board_id: int, db: Session):
+        for tasks in iter_task_batches_of_board(board_id=board_id, db=db):
+            yield "".join(TaskResponse.model_validate(task.model_dump()).model_dump_json() + "\n" for task in tasks)
 
 
 
+async def get_task_controller(db: Session = Depends(get_db)) -> TaskController:
+    return TaskController(db)
 
+@task_router.get("/task/{task_id}", response_model=TaskResponse, status_code=status.HTTP_200_OK)
+async def get_task(task_id: int,
+                   controller: TaskController = Depends(get_task_controller),
+                   _: TokenData = Depends(get_current_user),
+                   db_task: Task = Depends(require_board_role_from_task(any_roles(), etag=True))):
+    return await run_db(controller.get_task, db_task=db_task)
+
+@task_router.delete("/task/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task(task_id: int,
+                      controller: TaskController = Depends(get_task_controller),
+                      active_user: TokenData = Depends(get_current_user),
+                      db_task: Task = Depends(require_board_role_from_task(edit_roles()))):
+    return await run_db(controller.delete_task, db_task=db_task, active_user=active_user)
 
+@task_router.patch("/task/{task_id}", response_model=TaskResponse, status_code=status.HTTP_200_OK)
+async def update_task(task_id: int,
+                      task_update: TaskUpdateRequest,
+                      controller: TaskController = Depends(get_task_controller),
+                      active_user: TokenData = Depends(get_current_user),
+                      db_task: Task = Depends(require_board_role_from_task(edit_roles()))):
+    return await run_db(controller.update_task, db_task=db_task, task_update=task_update, active_user=active_user)
+
+@task_router.post("/task/{task_id}/move", response_model=TaskResponse, status_code=status.HTTP_200_OK)
+async def move_task(task_id: int,
+                    task_move: TaskMoveRequest,
+                    background_tasks: BackgroundTasks,
+                    controller: TaskController = Depends(get_task_controller),
+                    active_user: TokenData = Depends(get_current_user),
+                    db_task: Task = Depends(require_board_role_from_task(edit_roles()))):
+    return await run_db(controller.move_task, db_task=db_task, task_move=task_move, background_tasks=background_tasks,
+                        active_user=active_user)
+
+@task_router.post("/task/{task_id}/assignees/{user_id}", status_code=status.HTTP_200_OK)
+async def assign_user_to_task(task_id: int,
+                              user_id: int,
+                              controller: TaskController = Depends(get_task_controller),
+                              active_user: TokenData = Depends(get_current_user),
+                              db_task: Task = Depends(require_board_role_from_task(edit_roles()))):
+    return await run_db(controller.assign_user_to_task, db_task=db_task, user_id=user_id, active_user=active_user)
+
+@task_router.delete("/task/{task_id}/assignees/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def unassign_user_from_task(task_id: int,
+                                  user_id: int,
+                                  controller: TaskController = Depends(get_task_controller),
+                                  active_user: TokenData = Depends(get_current_user),
+                                  db_task: Task = Depends(require_board_role_from_task(edit_roles()))):
+    return await run_db(controller.unassign_user_from_task, db_task=db_task, user_id=user_id, active_user=active_user)
+
+@task_router.get("/task/{task_id}/assignees", response_model=PageResponse[UserResponse], status_code=status.HTTP_200_OK)
+async def get_task_assignees(task_id: int,
+                             page: PageParams = Query(),
+                             controller: TaskController = Depends(get_task_controller),
+                             _: TokenData = Depends(get_current_user),
+                             db_task: Task = Depends(require_board_role_from_task(any_roles(), etag=True))):
+    return await run_db(controller.get_task_assignees, db_task=db_task, page=page)
+
+@task_router.post("/list/{list_id}/task", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+async def create_task(list_id: int,
+                      task_info: TaskCreateRequest,
+                      controller: TaskController = Depends(get_task_controller),
+                      active_user: TokenData = Depends(get_current_user),
+                      task_list: TaskList = Depends(require_board_role_from_list(edit_roles()))):
+    return await run_db(controller.create_task, task_list=task_list, task_info=task_info, active_user=active_user)
+
+@task_router.post("/list/{list_id}/tasks:batch", response_model=TaskBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_tasks(list_id: int,
+                       batch: TaskBatchCreateRequest,
+                       controller: TaskController = Depends(get_task_controller),
+                       active_user: TokenData = Depends(get_current_user),
+                       task_list: TaskList = Depends(require_board_role_from_list(edit_roles()))):
+    return await run_db(controller.create_tasks, task_list=task_list, batch=batch, active_user=active_user)
+
+@task_router.patch("/board/{board_id}/tasks:batch", response_model=TaskBatchResponse, status_code=status.HTTP_200_OK)
+async def update_tasks(board_id: int,
+                       batch: TaskBatchUpdateRequest,
+                       controller: TaskController = Depends(get_task_controller),
+                       active_user: TokenData = Depends(get_current_user),
+                       _: None = Depends(require_board_role(edit_roles()))):
+    return await run_db(controller.update_tasks, board_id=board_id, batch=batch, active_user=active_user)
+
+@task_router.delete("/board/{board_id}/tasks:batch", response_model=TaskBatchResponse, status_code=status.HTTP_200_OK)
+async def delete_tasks(board_id: int,
+                       batch: TaskBatchDeleteRequest = Body(),
+                       controller: TaskController = Depends(get_task_controller),
+                       active_user: TokenData = Depends(get_current_user),
+                       _: None = Depends(require_board_role(edit_roles()))):
+    return await run_db(controller.delete_tasks, board_id=board_id, batch=batch, active_user=active_user)
+
+@task_router.get("/list/{list_id}/task", response_model=PageResponse[TaskResponse], status_code=status.HTTP_200_OK)
+async def get_list_tasks(list_id: int,
+                         query: TaskQueryParams = Query(),
+                         controller: TaskController = Depends(get_task_controller),
+                         _: TokenData = Depends(get_current_user),
+                         task_list: TaskList = Depends(require_board_role_from_list(any_roles(), etag=True))):
+    return await run_db(controller.get_list_tasks, task_list=task_list, query=query)
+
+@task_router.get("/board/{board_id}/task", response_model=PageResponse[TaskResponse], status_code=status.HTTP_200_OK)
+async def get_board_tasks(board_id: int,
+                          query: TaskQueryParams = Query(),
+                          controller: TaskController = Depends(get_task_controller),
+                          _: TokenData = Depends(get_current_user),
+                          etag: str = Depends(require_board_role(any_roles(), etag=True))):
+    content = await run_db(get_cached_json, f"board-tasks:{etag}:{query.model_dump_json()}",
+                           controller.get_board_tasks, board_id=board_id, query=query)
+    return Response(content, media_type="application/json", headers={"ETag": etag})
+
+@task_router.get("/board/{board_id}/search", response_model=PageResponse[TaskSearchResult],
+                 status_code=status.HTTP_200_OK)
+async def search_board_tasks(board_id: int,
+                             search: TaskSearchParams = Query(),
+                             controller: TaskController = Depends(get_task_controller),
+                             _: TokenData = Depends(get_current_user),
+                             __: None = Depends(require_board_role(any_roles(), etag=True))):
+    return await run_db(controller.search_board_tasks, board_id=board_id, search=search)
+
+@task_router.get("/board/{board_id}/task/stream", status_code=status.HTTP_200_OK)
+async def stream_board_tasks(board_id: int,
+                             controller: TaskController = Depends(get_task_controller),
+                             _: TokenData = Depends(get_current_user),
+                             __: None = Depends(require_board_role(any_roles()))):
+    return StreamingResponse(controller.stream_board_tasks(board_id=board_id), media_type="application/x-ndjson")
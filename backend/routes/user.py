@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session
 
-from backend.authentication.encryption import hash_password
+from backend.authentication.encryption import hash_password_in_pool
 from backend.authentication.jwt_handler import get_current_user
 from backend.dependencies.auth_dependencies import require_role
-from backend.dependencies.db_dependencies import get_db
+from backend.dependencies.db_dependencies import get_db, run_db
 from backend.models.user import User
 from backend.schemas.authentication import TokenData
+from backend.schemas.pagination import PageParams, PageResponse
 from backend.schemas.user import UserResponse, UserUpdateRequest
-from backend.utils.user_utils import email_exists, get_user_by_id
+from backend.utils.board_utils import invalidate_user_memberships, bump_board_versions_of_user
+from backend.utils.user_utils import email_exists, get_user_by_id, get_all_users
 
 user_router = APIRouter(prefix="/user", tags=['User'])
 
@@ -22,11 +24,16 @@ class UserController:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User does not exist")
         return UserResponse.model_validate(user.model_dump())
 
-    def get_users(self) -> list[UserResponse]:
-        users = self.db.exec(select(User)).all()
-        return [UserResponse.model_validate(user.model_dump()) for user in users]
+    def get_users(self, page: PageParams) -> PageResponse[UserResponse]:
+        users, next_cursor = get_all_users(page=page, db=self.db)
+        return PageResponse[UserResponse](
+            items=[UserResponse.model_validate(user.model_dump()) for user in users],
+            next_cursor=next_cursor
+        )
 
     def update_user(self, user_id: int, user_update: UserUpdateRequest ) -> UserResponse:
+        # hashed before any query so no pooled connection is held while bcrypt runs
+        hashed_password = hash_password_in_pool(password=user_update.password) if user_update.password else None
         user = get_user_by_id(user_id=user_id, db=self.db)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User does not exist")
@@ -38,9 +45,11 @@ class UserController:
         update_data = user_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             if key == "password":
-                setattr(user, "hashed_password", hash_password(password=key))
+                if hashed_password:
+                    setattr(user, "hashed_password", hashed_password)
             elif hasattr(user, key):
                 setattr(user, key, value)
+        bump_board_versions_of_user(user_id=user.id, db=self.db)
 
         self.db.commit()
         self.db.refresh(user)
@@ -52,41 +61,44 @@ class UserController:
         user = get_user_by_id(user_id=user_id, db=self.db)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User does not exist")
+        bump_board_versions_of_user(user_id=user_id, db=self.db)
         self.db.delete(user)
         self.db.commit()
+        invalidate_user_memberships(user_id=user_id)
         return None
 
-def get_user_controller(db: Session = Depends(get_db)) -> UserController:
+async def get_user_controller(db: Session = Depends(get_db)) -> UserController:
     return UserController(db)
 
 @user_router.get("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
-def get_user(user_id: int,
-             controller: UserController = Depends(get_user_controller),
-             _: TokenData = Depends(get_current_user),
-             __: TokenData = Depends(require_role(["admin"]))
-             ):
-    return controller.get_user(user_id=user_id)
+async def get_user(user_id: int,
+                   controller: UserController = Depends(get_user_controller),
+                   _: TokenData = Depends(get_current_user),
+                   __: TokenData = Depends(require_role(["admin"]))
+                   ):
+    return await run_db(controller.get_user, user_id=user_id)
 
-@user_router.get("/", response_model=list[UserResponse], status_code=status.HTTP_200_OK)
-def get_users( controller: UserController = Depends(get_user_controller),
-              _: TokenData = Depends(get_current_user),
-              __: TokenData = Depends(require_role(["admin"]))
-              ):
-    return controller.get_users()
+@user_router.get("/", response_model=PageResponse[UserResponse], status_code=status.HTTP_200_OK)
+async def get_users( page: PageParams = Query(),
+                    controller: UserController = Depends(get_user_controller),
+                    _: TokenData = Depends(get_current_user),
+                    __: TokenData = Depends(require_role(["admin"]))
+                    ):
+    return await run_db(controller.get_users, page=page)
 
 @user_router.patch("/update/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
-def update_user(user_id: int,
-                user_update: UserUpdateRequest,
-                controller: UserController = Depends(get_user_controller),
-                _: TokenData = Depends(get_current_user),
-                __: TokenData = Depends(require_role(["admin"]))
-                ):
-    return controller.update_user(user_id=user_id, user_update=user_update)
+async def update_user(user_id: int,
+                      user_update: UserUpdateRequest,
+                      controller: UserController = Depends(get_user_controller),
+                      _: TokenData = Depends(get_current_user),
+                      __: TokenData = Depends(require_role(["admin"]))
+                      ):
+    return await run_db(controller.update_user, user_id=user_id, user_update=user_update)
 
 @user_router.delete("/delete/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int,
-                controller: UserController = Depends(get_user_controller),
-                _: TokenData = Depends(get_current_user),
-                __: TokenData = Depends(require_role(["admin"]))
-                ):
-    return controller.delete_user(user_id=user_id)
+async def delete_user(user_id: int,
+                      controller: UserController = Depends(get_user_controller),
+                      _: TokenData = Depends(get_current_user),
+                      __: TokenData = Depends(require_role(["admin"]))
+                      ):
+    return await run_db(controller.delete_user, user_id=user_id)
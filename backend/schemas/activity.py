@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ActivityResponse(BaseModel):
+    id: int
+    action: str
+    description: str
+    timestamp: datetime
+    user_id: int
+    board_id: int
+    list_id: Optional[int]
+    task_id: Optional[int]
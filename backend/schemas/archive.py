@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from backend.models.task import TaskPriority, TaskStatus
+from backend.schemas.board import BoardResponse
+
+ARCHIVE_FORMAT_VERSION = 1
+
+
+# A board archive is NDJSON, one record per line, in this order: the board, the users it refers to,
+# its members, lists and tags, then its tasks. Each task carries its tags, assignees and comments, so
+# the importer only has to remember the ids of the lists, tags and users. Ids are those of the exporting
+# database; users are matched by email on import.
+
+class ArchiveBoard(BaseModel):
+    type: Literal["board"] = "board"
+    format_version: int = ARCHIVE_FORMAT_VERSION
+    name: str
+    description: Optional[str]
+
+class ArchiveUser(BaseModel):
+    type: Literal["user"] = "user"
+    id: int
+    email: str
+
+class ArchiveMember(BaseModel):
+    type: Literal["member"] = "member"
+    user_id: int
+    role_name: str
+
+class ArchiveList(BaseModel):
+    type: Literal["list"] = "list"
+    id: int
+    name: str
+    description: Optional[str]
+    created_at: datetime
+    rank: str
+
+class ArchiveTag(BaseModel):
+    type: Literal["tag"] = "tag"
+    id: int
+    name: str
+
+class ArchiveComment(BaseModel):
+    content: str
+    created_at: datetime
+    edited_at: Optional[datetime]
+    user_id: int
+
+class ArchiveTask(BaseModel):
+    type: Literal["task"] = "task"
+    title: str
+    description: Optional[str]
+    priority: Optional[TaskPriority]
+    status: TaskStatus
+    created_at: datetime
+    due_date: Optional[datetime]
+    rank: str
+    list_id: int
+    creator_id: int
+    tag_ids: List[int] = []
+    assignee_ids: List[int] = []
+    comments: List[ArchiveComment] = []
+
+ArchiveRecord = Annotated[
+    Union[ArchiveBoard, ArchiveUser, ArchiveMember, ArchiveList, ArchiveTag, ArchiveTask],
+    Field(discriminator="type")
+]
+archive_record_adapter = TypeAdapter(ArchiveRecord)
+
+class BoardImportResponse(BoardResponse):
+    lists: int
+    tags: int
+    tasks: int
+    comments: int
+    # the importing user is the board's only member; the archive's other members with an account here are
+    # invited to it, and all tasks and comments are credited to the importing user
+    invitations: int
+    # archive users without an account here: they are neither invited nor assigned
+    unknown_users: int
@@ -1,7 +1,10 @@
-from typing import Optional
+from typing import Optional, List, Dict
 
 from pydantic import BaseModel
 
+from backend.models.task import TaskPriority, TaskStatus
+from backend.schemas.list import ListSnapshotResponse
+
 
 class BoardUserResponse(BaseModel):
     name: str
@@ -14,6 +17,23 @@ class BoardResponse(BaseModel):
     description: Optional[str]
     owner_id: int
 
+class BoardSnapshotResponse(BoardResponse):
+    lists: List[ListSnapshotResponse]
+    members: List[BoardUserResponse]
+
+class TaskCountsResponse(BaseModel):
+    total: int = 0
+    overdue: int = 0
+    by_status: Dict[TaskStatus, int] = {}
+    by_priority: Dict[TaskPriority, int] = {}
+
+class ListStatsResponse(TaskCountsResponse):
+    list_id: int
+
+class BoardStatsResponse(TaskCountsResponse):
+    board_id: int
+    lists: List[ListStatsResponse]
+
 class BoardCreateRequest(BaseModel):
     name: str
     description: Optional[str]
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+MAX_COMMENT_LENGTH = 10000
+
+
+class CommentCreateRequest(BaseModel):
+    content: str = Field(min_length=1, max_length=MAX_COMMENT_LENGTH)
+
+class CommentUpdateRequest(BaseModel):
+    content: str = Field(min_length=1, max_length=MAX_COMMENT_LENGTH)
+
+class CommentResponse(BaseModel):
+    id: int
+    content: str
+    created_at: datetime
+    edited_at: Optional[datetime]
+    user_id: int
+    task_id: int
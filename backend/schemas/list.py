@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import Optional, List
 
 from pydantic import BaseModel
 
+from backend.schemas.task import TaskSnapshotResponse
+
 
 class ListCreateRequest(BaseModel):
     name: str
@@ -12,6 +14,14 @@ class ListResponse(BaseModel):
     name: str
     description: Optional[str]
     board_id: int
+    rank: str
+
+class ListMoveRequest(BaseModel):
+    previous_list_id: Optional[int] = None
+    next_list_id: Optional[int] = None
+
+class ListSnapshotResponse(ListResponse):
+    tasks: List[TaskSnapshotResponse]
 
 class ListUpdateRequest(BaseModel):
     name: Optional[str] = None
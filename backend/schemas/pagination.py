@@ -0,0 +1,17 @@
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PageParams(BaseModel):
+    cursor: Optional[str] = None
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+class PageResponse(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str]
@@ -0,0 +1,30 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from backend.schemas.task import MAX_BATCH_SIZE
+
+MAX_TAG_NAME_LENGTH = 50
+
+
+class TagCreateRequest(BaseModel):
+    name: str = Field(min_length=1, max_length=MAX_TAG_NAME_LENGTH)
+
+class TagUpdateRequest(BaseModel):
+    name: str = Field(min_length=1, max_length=MAX_TAG_NAME_LENGTH)
+
+class TagResponse(BaseModel):
+    id: int
+    name: str
+    board_id: int
+    usage_count: int
+
+class TagTasksRequest(BaseModel):
+    task_ids: List[int] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+# changed_task_ids were tagged or untagged by the call; the other tasks of the board already were,
+# and not_found_task_ids are not tasks of the tag's board
+class TagTasksResponse(BaseModel):
+    tag: TagResponse
+    changed_task_ids: List[int]
+    not_found_task_ids: List[int]
@@ -1,7 +1,11 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from backend.models.task import TaskPriority, TaskStatus
+from backend.schemas.pagination import PageParams
+
+MAX_BATCH_SIZE = 2000
 
 
 class TaskCreateRequest(BaseModel):
@@ -21,6 +25,52 @@ class TaskResponse(BaseModel):
     list_id: int
     creator_id: int
     board_id: int
+    rank: str
+    comment_count: int
+
+class TaskSortField(str, Enum):
+    ID = "id"
+    RANK = "rank"
+    CREATED_AT = "created_at"
+    DUE_DATE = "due_date"
+
+class TaskFilterParams(BaseModel):
+    status: Optional[List[TaskStatus]] = None
+    priority: Optional[List[TaskPriority]] = None
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+    creator_id: Optional[int] = None
+    assignee_id: Optional[int] = None
+    tag_id: Optional[int] = None
+    # defaults to rank within a list and to id across a board
+    sort: Optional[TaskSortField] = None
+    descending: bool = False
+
+class TaskQueryParams(TaskFilterParams, PageParams):
+    pass
+
+class AssignedTaskQueryParams(PageParams):
+    status: Optional[List[TaskStatus]] = None
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+
+class TaskSearchParams(PageParams):
+    q: str = Field(min_length=1, max_length=200)
+
+class TaskSearchResult(TaskResponse):
+    score: float
+
+class TaskMoveRequest(BaseModel):
+    list_id: Optional[int] = None
+    previous_task_id: Optional[int] = None
+    next_task_id: Optional[int] = None
+
+class TaskTagResponse(BaseModel):
+    id: int
+    name: str
+
+class TaskSnapshotResponse(TaskResponse):
+    tags: List[TaskTagResponse]
 
 class TaskUpdateRequest(BaseModel):
     title: Optional[str] = None
@@ -29,5 +79,31 @@ class TaskUpdateRequest(BaseModel):
     status: Optional[TaskStatus] = None
     due_date: Optional[datetime] = None
 
+    # Optional only so that they can be left out: a task always has a title and a status
+    @field_validator("title", "status")
+    @classmethod
+    def reject_null(cls, value):
+        if value is None:
+            raise ValueError("may be left out but not set to null")
+        return value
+
+class TaskBatchCreateRequest(BaseModel):
+    tasks: List[TaskCreateRequest] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+class TaskBatchUpdateItem(TaskUpdateRequest):
+    id: int
+
+class TaskBatchUpdateRequest(BaseModel):
+    tasks: List[TaskBatchUpdateItem] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
 
+class TaskBatchDeleteRequest(BaseModel):
+    task_ids: List[int] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+class TaskBatchResult(BaseModel):
+    id: int
+    status_code: int
+    detail: Optional[str] = None
+    task: Optional[TaskResponse] = None
 
+class TaskBatchResponse(BaseModel):
+    results: List[TaskBatchResult]
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from backend.config import ACTIVITY_BATCH_SIZE, ACTIVITY_FLUSH_INTERVAL_SECONDS, ACTIVITY_QUEUE_LIMIT
+from backend.dependencies.db_dependencies import run_in_session
+from backend.models.activity import TaskActivity
+from backend.schemas.pagination import PageParams
+from backend.utils.pagination_utils import paginate
+from backend.utils.time_utils import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+def insert_activities(rows: list[dict], db: Session) -> None:
+    db.execute(insert(TaskActivity), rows)
+    db.commit()
+
+# newest first, served by the (task_id, timestamp) and (board_id, timestamp) indexes
+def get_activities_of_task(task_id: int, page: PageParams, db: Session) -> tuple[list[TaskActivity], Optional[str]]:
+    statement = select(TaskActivity).where(TaskActivity.task_id == task_id)
+    return paginate(statement, TaskActivity.id, page, db, sort_column=TaskActivity.timestamp, descending=True)
+
+def get_activities_of_board(board_id: int, page: PageParams, db: Session) -> tuple[list[TaskActivity], Optional[str]]:
+    statement = select(TaskActivity).where(TaskActivity.board_id == board_id)
+    return paginate(statement, TaskActivity.id, page, db, sort_column=TaskActivity.timestamp, descending=True)
+
+
+# Controllers hand their activity rows to the writer after their commit and return without waiting;
+# a background task inserts them in batches of batch_size, once a batch is full or every
+# flush_interval_seconds. Rows beyond max_pending are dropped rather than slowing requests down.
+class ActivityWriter:
+    def __init__(self, batch_size: int, flush_interval_seconds: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._pending: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._batch_full = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        self._loop = None
+
+    # called from the threadpool in sync mode, so the flush is signalled through the loop
+    def record(self, rows: list[dict]) -> None:
+        with self._lock:
+            accepted = rows[:max(self.max_pending - len(self._pending), 0)]
+            self.dropped += len(rows) - len(accepted)
+            self._pending.extend(accepted)
+            batch_full = len(self._pending) >= self.batch_size
+        loop = self._loop
+        if batch_full and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._batch_full.set)
+
+    async def flush(self) -> None:
+        while True:
+            with self._lock:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            if not batch:
+                return
+            try:
+                await run_in_session(insert_activities, rows=batch)
+                self.written += len(batch)
+            except Exception:
+                logger.exception("Writing %s activities failed", len(batch))
+                self.failed += len(batch)
+            self.flushes += 1
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            await self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+activity_writer = ActivityWriter(batch_size=ACTIVITY_BATCH_SIZE, flush_interval_seconds=ACTIVITY_FLUSH_INTERVAL_SECONDS,
+                                 max_pending=ACTIVITY_QUEUE_LIMIT)
+
+
+# tasks may be Task rows or TaskResponse models; they are read immediately, not when the batch is written
+def record_task_activities(action: str, tasks, user_id: int, description: str) -> None:
+    timestamp = utc_now()
+    activity_writer.record([
+        {"action": action, "description": description.format(task=task), "timestamp": timestamp, "user_id": user_id,
+         "board_id": task.board_id, "list_id": task.list_id, "task_id": task.id}
+        for task in tasks
+    ])
+
+def record_list_activity(action: str, task_list, user_id: int, description: str) -> None:
+    activity_writer.record([
+        {"action": action, "description": description.format(task_list=task_list), "timestamp": utc_now(),
+         "user_id": user_id, "board_id": task_list.board_id, "list_id": task_list.id, "task_id": None}
+    ])
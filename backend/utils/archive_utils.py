@@ -0,0 +1,296 @@
+import io
+from collections import Counter, defaultdict
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert, union, update
+from sqlalchemy.util import await_only
+from sqlmodel import Session, SQLModel, select
+
+from backend.models.board import Board
+from backend.models.comment import TaskComment
+from backend.models.invitation import Invitation, InvitationStatus
+from backend.models.relationships import UserBoardLink, TaskTagLink, TaskUserLink
+from backend.models.role import Role
+from backend.models.tag import TaskTag
+from backend.models.task import Task, TaskPriority
+from backend.models.task_list import TaskList
+from backend.models.user import User
+from backend.schemas.archive import ARCHIVE_FORMAT_VERSION, ArchiveBoard, ArchiveUser, ArchiveMember, ArchiveList, \
+    ArchiveTag, ArchiveTask, ArchiveComment, archive_record_adapter
+from backend.utils.assignment_utils import get_assignee_links_of_tasks
+from backend.utils.board_utils import get_board_by_id, bump_boards_version_of_members
+from backend.utils.comment_utils import get_comments_of_tasks
+from backend.utils.list_utils import get_all_lists_of_board
+from backend.utils.role_utils import get_role_id_by_name
+from backend.utils.stats_utils import TaskCountDeltas, adjust_task_counts
+from backend.utils.tag_utils import get_all_tags_of_board, get_tag_links_of_tasks
+from backend.utils.task_utils import iter_task_batches_of_board, STREAM_BATCH_SIZE
+from backend.utils.time_utils import utc_now
+
+IMPORT_BATCH_SIZE = 1000
+# longer lines are rejected, so a malformed archive cannot make the import buffer it whole
+MAX_ARCHIVE_LINE_BYTES = 16 * 1024 * 1024
+
+# records must come in this order, see backend/schemas/archive.py
+ARCHIVE_RECORD_ORDER = ["board", "user", "member", "list", "tag", "task"]
+
+
+# every user the board refers to: its members, and the creators, commenters and assignees of its tasks
+def get_users_of_board_archive(board_id: int, db: Session) -> list[User]:
+    user_ids = union(
+        select(UserBoardLink.user_id).where(UserBoardLink.board_id == board_id),
+        select(Task.creator_id).where(Task.board_id == board_id),
+        select(TaskComment.user_id).join(Task, Task.id == TaskComment.task_id).where(Task.board_id == board_id),
+        select(TaskUserLink.user_id).join(Task, Task.id == TaskUserLink.task_id).where(Task.board_id == board_id),
+    )
+    return list(db.exec(select(User).where(User.id.in_(user_ids))).all())
+
+def get_member_roles_of_board(board_id: int, db: Session) -> list[tuple[int, str]]:
+    statement = (
+        select(UserBoardLink.user_id, Role.name)
+        .join(Role, Role.id == UserBoardLink.role_id)
+        .where(UserBoardLink.board_id == board_id)
+    )
+    return list(db.exec(statement).all())
+
+def _archive_line(record: BaseModel) -> str:
+    return record.model_dump_json() + "\n"
+
+# Yields the archive in chunks of text: the board with its users, members, lists and tags, then one chunk
+# per batch_size tasks. The tasks come from a server-side cursor and their tags, assignees and comments
+# are read with one query per table and batch, so memory does not grow with the size of the board.
+def iter_board_archive_chunks(board_id: int, db: Session, batch_size: int = STREAM_BATCH_SIZE):
+    board = get_board_by_id(board_id=board_id, db=db)
+    if not board:
+        return
+    records = [ArchiveBoard(name=board.name, description=board.description)]
+    records += [ArchiveUser(id=user.id, email=user.email) for user in get_users_of_board_archive(board_id, db)]
+    records += [ArchiveMember(user_id=user_id, role_name=role_name)
+                for user_id, role_name in get_member_roles_of_board(board_id, db)]
+    records += [ArchiveList.model_validate(task_list.model_dump()) for task_list in get_all_lists_of_board(board_id, db)]
+    records += [ArchiveTag.model_validate(tag.model_dump()) for tag in get_all_tags_of_board(board_id, db)]
+    yield "".join(_archive_line(record) for record in records)
+
+    for tasks in iter_task_batches_of_board(board_id=board_id, db=db, batch_size=batch_size):
+        task_ids = [task.id for task in tasks]
+        tag_ids, assignee_ids, comments = defaultdict(list), defaultdict(list), defaultdict(list)
+        for task_id, tag_id in get_tag_links_of_tasks(task_ids, db):
+            tag_ids[task_id].append(tag_id)
+        for task_id, user_id in get_assignee_links_of_tasks(task_ids, db):
+            assignee_ids[task_id].append(user_id)
+        for comment in get_comments_of_tasks(task_ids, db):
+            comments[comment.task_id].append(ArchiveComment.model_validate(comment.model_dump()))
+        yield "".join(
+            _archive_line(ArchiveTask(**task.model_dump(), tag_ids=tag_ids[task.id], assignee_ids=assignee_ids[task.id],
+                                      comments=comments[task.id]))
+            for task in tasks
+        )
+
+
+# Splits a request body into batches of lines without holding more than a batch and one partial line
+async def iter_archive_line_batches(chunks: AsyncIterator[bytes], batch_size: int = IMPORT_BATCH_SIZE):
+    buffer, lines, first_line_number = b"", [], 1
+    async for chunk in chunks:
+        *complete, buffer = (buffer + chunk).split(b"\n")
+        lines += complete
+        if len(buffer) > MAX_ARCHIVE_LINE_BYTES:
+            raise archive_error(first_line_number + len(lines), "line is too long")
+        while len(lines) >= batch_size:
+            yield lines[:batch_size], first_line_number
+            first_line_number += batch_size
+            lines = lines[batch_size:]
+    if buffer:
+        lines.append(buffer)
+    if lines:
+        yield lines, first_line_number
+
+def archive_error(line_number: int, message: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Line {line_number}: {message}")
+
+
+# Postgres takes the rows through COPY, with psycopg2 in sync mode and asyncpg in async mode.
+# Enum columns store the member names, as SQLAlchemy does.
+def copy_rows(model: type[SQLModel], rows: list[dict], db: Session) -> None:
+    columns = list(rows[0])
+    values = [[value.name if isinstance(value, Enum) else value for value in row.values()] for row in rows]
+    connection = db.connection().connection
+    if db.bind.dialect.driver == "asyncpg":
+        await_only(connection.driver_connection.copy_records_to_table(
+            model.__tablename__, records=[tuple(row) for row in values], columns=columns
+        ))
+        return
+    data = io.StringIO("".join("\t".join(_copy_text(value) for value in row) + "\n" for row in values))
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY "{model.__tablename__}" ({column_list}) FROM STDIN', data)
+
+def _copy_text(value) -> str:
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+# rows must all have the same keys
+def load_rows(model: type[SQLModel], rows: list[dict], db: Session) -> None:
+    if not rows:
+        return
+    if db.bind.dialect.name == "postgresql":
+        copy_rows(model, rows, db)
+    else:
+        db.execute(insert(model), rows)
+
+# On Postgres the ids are drawn from the table's sequence up front so the rows can be copied with them,
+# elsewhere they come back from a multi-row INSERT ... RETURNING. In both cases in the order of the rows.
+def insert_rows_returning_ids(model: type[SQLModel], rows: list[dict], db: Session) -> list[int]:
+    if not rows:
+        return []
+    if db.bind.dialect.name == "postgresql":
+        sequence = func.pg_get_serial_sequence(model.__tablename__, "id")
+        ids = list(db.exec(select(func.nextval(sequence)).select_from(func.generate_series(1, len(rows)))).all())
+        copy_rows(model, [{"id": row_id, **row} for row_id, row in zip(ids, rows)], db)
+        return ids
+    return list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
+
+
+# Loads an archive into a new board owned by the importing user, a batch of lines at a time, within the
+# caller's transaction. Only the id maps of the users, lists and tags are kept between batches.
+class BoardArchiveImporter:
+    def __init__(self, owner_id: int, db: Session):
+        self.owner_id = owner_id
+        self.db = db
+        self.board: Optional[Board] = None
+        self.user_ids: dict[int, int] = {}
+        self.invited_ids: set[int] = set()
+        self.list_ids: dict[int, int] = {}
+        self.tag_ids: dict[int, int] = {}
+        self.tag_names: set[str] = set()
+        self.tag_usage: Counter[int] = Counter()
+        self.task_counts: TaskCountDeltas = Counter()
+        self.tasks = 0
+        self.comments = 0
+        self.unknown_users = 0
+        self._stage = 0
+
+    def add_lines(self, lines: list[bytes], first_line_number: int) -> None:
+        runs: list[tuple[str, list]] = []
+        for line_number, line in enumerate(lines, first_line_number):
+            if not line.strip():
+                continue
+            try:
+                record = archive_record_adapter.validate_json(line)
+            except ValidationError as error:
+                raise archive_error(line_number, error.errors(include_url=False)[0]["msg"])
+            stage = ARCHIVE_RECORD_ORDER.index(record.type)
+            if self.board is None and not runs and record.type != "board":
+                raise archive_error(line_number, "the archive must start with its board")
+            if stage < self._stage or (record.type == "board" and (self.board is not None or runs)):
+                raise archive_error(line_number, f"unexpected {record.type} record")
+            self._stage = stage
+            if runs and runs[-1][0] == record.type:
+                runs[-1][1].append((line_number, record))
+            else:
+                runs.append((record.type, [(line_number, record)]))
+        for record_type, records in runs:
+            getattr(self, f"_add_{record_type}s")(records)
+
+    def _add_boards(self, records: list[tuple[int, ArchiveBoard]]) -> None:
+        line_number, record = records[0]
+        if record.format_version > ARCHIVE_FORMAT_VERSION:
+            raise archive_error(line_number, f"unsupported format version {record.format_version}")
+        self.board = Board(name=record.name, description=record.description, owner_id=self.owner_id)
+        self.db.add(self.board)
+        self.db.flush()
+        self.db.add(UserBoardLink(user_id=self.owner_id, board_id=self.board.id,
+                                  role_id=get_role_id_by_name(role_name="owner", db=self.db)))
+        self.db.flush()
+
+    def _add_users(self, records: list[tuple[int, ArchiveUser]]) -> None:
+        user_ids_by_email = {record.email: record.id for _, record in records}
+        statement = select(User.id, User.email).where(User.email.in_(list(user_ids_by_email)))
+        for user_id, email in self.db.exec(statement).all():
+            self.user_ids[user_ids_by_email.pop(email)] = user_id
+        self.unknown_users += len(user_ids_by_email)
+
+    # The importer is the only member of the imported board: the archive's other members are invited, as the
+    # importer could have invited them, and join with the role an accepted invitation gives
+    def _add_members(self, records: list[tuple[int, ArchiveMember]]) -> None:
+        rows = []
+        for line_number, record in records:
+            if get_role_id_by_name(role_name=record.role_name, db=self.db) is None:
+                raise archive_error(line_number, f"unknown role {record.role_name}")
+            user_id = self.user_ids.get(record.user_id)
+            if user_id is None or user_id == self.owner_id or user_id in self.invited_ids:
+                continue
+            self.invited_ids.add(user_id)
+            rows.append({"status": InvitationStatus.PENDING, "created_at": utc_now(), "board_id": self.board.id,
+                         "invited_user_id": user_id, "inviter_user_id": self.owner_id})
+        load_rows(Invitation, rows, self.db)
+
+    def _add_lists(self, records: list[tuple[int, ArchiveList]]) -> None:
+        rows = [
+            {"name": record.name, "description": record.description, "created_at": record.created_at,
+             "rank": record.rank, "board_id": self.board.id}
+            for _, record in records
+        ]
+        new_ids = insert_rows_returning_ids(TaskList, rows, self.db)
+        self.list_ids.update(zip((record.id for _, record in records), new_ids))
+
+    def _add_tags(self, records: list[tuple[int, ArchiveTag]]) -> None:
+        for line_number, record in records:
+            if record.name in self.tag_names:
+                raise archive_error(line_number, f"duplicate tag {record.name}")
+            self.tag_names.add(record.name)
+        rows = [{"name": record.name, "usage_count": 0, "board_id": self.board.id} for _, record in records]
+        new_ids = insert_rows_returning_ids(TaskTag, rows, self.db)
+        self.tag_ids.update(zip((record.id for _, record in records), new_ids))
+
+    # An archive cannot speak for other users: tasks and comments are credited to the importer, whoever wrote
+    # them, and only the importer's own assignments are kept
+    def _add_tasks(self, records: list[tuple[int, ArchiveTask]]) -> None:
+        rows = []
+        for line_number, record in records:
+            list_id = self.list_ids.get(record.list_id)
+            if list_id is None:
+                raise archive_error(line_number, f"unknown list {record.list_id}")
+            if any(tag_id not in self.tag_ids for tag_id in record.tag_ids):
+                raise archive_error(line_number, "unknown tag")
+            rows.append({
+                "title": record.title, "description": record.description, "priority": record.priority,
+                "status": record.status, "created_at": record.created_at, "due_date": record.due_date,
+                "rank": record.rank, "comment_count": len(record.comments), "list_id": list_id,
+                "creator_id": self.owner_id, "board_id": self.board.id,
+            })
+            self.task_counts[self.board.id, list_id, record.status, record.priority or TaskPriority.NONE] += 1
+        task_ids = insert_rows_returning_ids(Task, rows, self.db)
+
+        tag_links, assignee_links, comments = [], [], []
+        for task_id, (_, record) in zip(task_ids, records):
+            for tag_id in {self.tag_ids[tag_id] for tag_id in record.tag_ids}:
+                tag_links.append({"task_id": task_id, "tag_id": tag_id})
+                self.tag_usage[tag_id] += 1
+            if any(self.user_ids.get(user_id) == self.owner_id for user_id in record.assignee_ids):
+                assignee_links.append({"task_id": task_id, "user_id": self.owner_id})
+            comments += [
+                {"content": comment.content, "created_at": comment.created_at, "edited_at": comment.edited_at,
+                 "user_id": self.owner_id, "task_id": task_id}
+                for comment in record.comments
+            ]
+        load_rows(TaskTagLink, tag_links, self.db)
+        load_rows(TaskUserLink, assignee_links, self.db)
+        load_rows(TaskComment, comments, self.db)
+        self.tasks += len(task_ids)
+        self.comments += len(comments)
+
+    # Sets the counters accumulated over the batches; the caller commits
+    def finish(self) -> Board:
+        if self.board is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="The archive has no board")
+        if self.tag_usage:
+            self.db.execute(update(TaskTag), [
+                {"id": tag_id, "usage_count": usage_count} for tag_id, usage_count in self.tag_usage.items()
+            ])
+        adjust_task_counts(self.task_counts, db=self.db)
+        bump_boards_version_of_members(board_id=self.board.id, db=self.db)
+        return self.board
@@ -0,0 +1,46 @@
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from backend.models.relationships import UserBoardLink, TaskUserLink
+from backend.models.task import Task
+from backend.models.user import User
+from backend.schemas.pagination import PageParams
+from backend.schemas.task import TaskFilterParams
+from backend.utils.pagination_utils import paginate
+from backend.utils.task_utils import filter_tasks
+
+
+def is_user_assigned_to_task(task_id: int, user_id: int, db: Session) -> bool:
+    statement = select(TaskUserLink).where(TaskUserLink.task_id == task_id, TaskUserLink.user_id == user_id)
+    return db.exec(statement).first() is not None
+
+def delete_task_assignment(task_id: int, user_id: int, db: Session) -> None:
+    db.exec(delete(TaskUserLink).where(TaskUserLink.task_id == task_id, TaskUserLink.user_id == user_id))
+
+def get_assignees_of_task(task_id: int, page: PageParams, db: Session) -> tuple[list[User], Optional[str]]:
+    statement = select(User).join(TaskUserLink, TaskUserLink.user_id == User.id).where(TaskUserLink.task_id == task_id)
+    return paginate(statement, User.id, page, db)
+
+# (task_id, user_id) pairs, served by the primary key
+def get_assignee_links_of_tasks(task_ids: list[int], db: Session) -> list[tuple[int, int]]:
+    statement = select(TaskUserLink.task_id, TaskUserLink.user_id).where(TaskUserLink.task_id.in_(task_ids))
+    return list(db.exec(statement).all())
+
+# One query across every board of the user: the (user_id, task_id) index yields the assigned task ids in
+# page order, each task is read by primary key and its board checked against the user's memberships,
+# so tasks of boards the user has left are skipped without a separate lookup. Pages are keyed on the
+# link's task_id rather than Task.id so that no sort is needed.
+def get_assigned_tasks_of_user(user_id: int, page: PageParams, db: Session,
+                               filters: Optional[TaskFilterParams] = None) -> tuple[list[Task], Optional[str]]:
+    statement = (
+        select(Task, TaskUserLink.task_id)
+        .select_from(TaskUserLink)
+        .join(Task, Task.id == TaskUserLink.task_id)
+        .join(UserBoardLink, (UserBoardLink.board_id == Task.board_id) & (UserBoardLink.user_id == user_id))
+        .where(TaskUserLink.user_id == user_id)
+    )
+    rows, next_cursor = paginate(filter_tasks(statement, filters or TaskFilterParams()), TaskUserLink.task_id,
+                                 page, db)
+    return [task for task, _ in rows], next_cursor
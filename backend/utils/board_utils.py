@@ -1,16 +1,80 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import delete, or_, update
 from sqlmodel import Session, select
 
+from backend.config import MEMBERSHIP_CACHE_SIZE, MEMBERSHIP_CACHE_TTL_SECONDS, BOARD_PURGE_BATCH_SIZE, \
+    BOARD_PURGE_CLAIM_TIMEOUT_SECONDS
+from backend.models.activity import TaskActivity
 from backend.models.board import Board
-from backend.models.relationships import UserBoardLink
+from backend.models.comment import TaskComment
+from backend.models.invitation import Invitation
+from backend.models.relationships import UserBoardLink, TaskTagLink, TaskUserLink
+from backend.models.tag import TaskTag
 from backend.models.user import User
 from backend.models.role import Role
+from backend.models.task import Task
+from backend.models.task_list import TaskList
+from backend.schemas.pagination import PageParams
+from backend.utils.cache_utils import TTLCache, MISSING
+from backend.utils.pagination_utils import paginate
+from backend.utils.stats_utils import delete_task_counts_of_board
+from backend.utils.time_utils import utc_now
+
+# (user_id, board_id) -> role_id of the membership, or None when the user is not in the board
+membership_cache = TTLCache(max_size=MEMBERSHIP_CACHE_SIZE, ttl_seconds=MEMBERSHIP_CACHE_TTL_SECONDS)
 
 
 def get_board_by_id( board_id: int, db : Session ) -> Board:
-    statement = select(Board).where(Board.id == board_id)
+    statement = select(Board).where(Board.id == board_id).where(Board.deleted_at.is_(None))
     board = db.exec(statement).first()
     return board
 
+def get_board_version(board_id: int, db: Session) -> Optional[int]:
+    return db.exec(select(Board.version).where(Board.id == board_id)).first()
+
+# Call right before commit: the row lock it takes on the board is held until the transaction ends
+def bump_board_version(board_id: int, db: Session) -> None:
+    db.exec(update(Board).where(Board.id == board_id).values(version=Board.version + 1))
+
+def bump_board_versions_of_user(user_id: int, db: Session) -> None:
+    board_ids = select(UserBoardLink.board_id).where(UserBoardLink.user_id == user_id)
+    db.exec(update(Board).where(Board.id.in_(board_ids)).values(version=Board.version + 1))
+
+def get_user_boards_version(user_id: int, db: Session) -> Optional[int]:
+    return db.exec(select(User.boards_version).where(User.id == user_id)).first()
+
+def bump_user_boards_version(user_id: int, db: Session) -> None:
+    db.exec(update(User).where(User.id == user_id).values(boards_version=User.boards_version + 1))
+
+def bump_boards_version_of_members(board_id: int, db: Session) -> None:
+    member_ids = select(UserBoardLink.user_id).where(UserBoardLink.board_id == board_id)
+    db.exec(update(User).where(User.id.in_(member_ids)).values(boards_version=User.boards_version + 1))
+
+# Loads the whole board tree in a fixed number of queries: the board, its lists, and the tasks of
+# those lists with their tags joined in, instead of one query per list and per task.
+def get_board_with_tasks(board_id: int, db: Session) -> Optional[Board]:
+    statement = (
+        select(Board)
+        .where(Board.id == board_id)
+        .where(Board.deleted_at.is_(None))
+        .options(
+            selectinload(Board.task_lists)
+            .selectinload(TaskList.task_lists)
+            .joinedload(Task.task_tags)
+        )
+    )
+    return db.exec(statement).first()
+
+def get_all_boards(page: PageParams, db: Session):
+    return paginate(select(Board).where(Board.deleted_at.is_(None)), id_column=Board.id, page=page, db=db)
+
+def get_boards_of_user(user_id: int, page: PageParams, db: Session):
+    board_statement = select(Board).join(UserBoardLink).where(UserBoardLink.user_id == user_id)
+    return paginate(board_statement, id_column=Board.id, page=page, db=db)
+
 def check_if_user_in_board(board_id: int, user_id: int, db: Session) -> bool:
     statement = (select(UserBoardLink)
                 .where(UserBoardLink.user_id == user_id)
@@ -21,16 +85,20 @@ def check_if_user_in_board(board_id: int, user_id: int, db: Session) -> bool:
         return True
     return False
 
-def get_users_in_boards(board_id: int, db:Session):
-    users_in_board_statement = (
+def get_users_in_board_statement(board_id: int):
+    return (
                 select(User, Role)
                 .select_from(User)
                 .join(UserBoardLink)
                 .join(Role)
                 .where(UserBoardLink.board_id == board_id)
     )
-    users_in_board = db.exec(users_in_board_statement).all()
-    return users_in_board
+
+def get_users_in_boards(board_id: int, page: PageParams, db:Session):
+    return paginate(get_users_in_board_statement(board_id), id_column=User.id, page=page, db=db)
+
+def get_all_users_in_board(board_id: int, db: Session):
+    return db.exec(get_users_in_board_statement(board_id).order_by(User.id)).all()
 
 def get_user_board_link(board_id:int, user_id:int, db:Session):
     link_statement = (
@@ -43,5 +111,91 @@ def get_user_board_link(board_id:int, user_id:int, db:Session):
 
     return board_user_link
 
+def get_user_board_role_id(board_id: int, user_id: int, db: Session) -> Optional[int]:
+    key = (user_id, board_id)
+    role_id = membership_cache.get(key)
+    if role_id is MISSING:
+        board_user_link = get_user_board_link(board_id=board_id, user_id=user_id, db=db)
+        role_id = board_user_link.role_id if board_user_link else None
+        membership_cache.set(key, role_id)
+    return role_id
+
+def invalidate_board_membership(board_id: int, user_id: Optional[int] = None):
+    if user_id is not None:
+        membership_cache.pop((user_id, board_id))
+    else:
+        membership_cache.pop_where(lambda key: key[1] == board_id)
+
+def invalidate_user_memberships(user_id: int):
+    membership_cache.pop_where(lambda key: key[0] == user_id)
+
+
+# Hides the board from everyone at once: it is marked deleted and its memberships and invitations are
+# removed, the only rows through which users reach it. Everything else is left to purge_board.
+def mark_board_deleted(board_id: int, db: Session) -> None:
+    db.exec(delete(UserBoardLink).where(UserBoardLink.board_id == board_id))
+    db.exec(delete(Invitation).where(Invitation.board_id == board_id))
+    db.exec(update(Board).where(Board.id == board_id).values(deleted_at=utc_now(), version=Board.version + 1))
+
+# Claims a deleted board for the caller's purge, or renews the caller's previous claim. A board is
+# claimed only while no other purge holds a claim renewed within BOARD_PURGE_CLAIM_TIMEOUT_SECONDS, so
+# the periodic purges of all workers and the delete request's own purge never work on it at once, while
+# a purge interrupted by a restart is taken over once its claim has gone stale. The update locks the
+# board row until the caller commits. Returns the new claim, None if the board could not be claimed.
+def claim_board_purge(board_id: int, db: Session, previous_claim: Optional[datetime] = None) -> Optional[datetime]:
+    now = utc_now()
+    if previous_claim is None:
+        stale_before = now - timedelta(seconds=BOARD_PURGE_CLAIM_TIMEOUT_SECONDS)
+        claimable = or_(Board.purge_started_at.is_(None), Board.purge_started_at < stale_before)
+    else:
+        claimable = Board.purge_started_at == previous_claim
+    result = db.exec(
+        update(Board)
+        .where(Board.id == board_id, Board.deleted_at.is_not(None), claimable)
+        .values(purge_started_at=now)
+    )
+    return now if result.rowcount == 1 else None
+
+# Deletes a board marked deleted with set-based statements, committing every batch_size tasks so that no
+# transaction holds its locks for long. Safe to run again after an interruption, each step only removes
+# what is left. Returns False, having left the board alone, if another purge holds it or took it over.
+def purge_board(board_id: int, db: Session, batch_size: int = BOARD_PURGE_BATCH_SIZE) -> bool:
+    claim = claim_board_purge(board_id=board_id, db=db)
+    db.commit()
+    if claim is None:
+        return False
+
+    def renew_claim() -> bool:
+        nonlocal claim
+        claim = claim_board_purge(board_id=board_id, db=db, previous_claim=claim)
+        if claim is None:
+            db.rollback()
+        return claim is not None
+
+    while task_ids := list(db.exec(select(Task.id).where(Task.board_id == board_id).limit(batch_size))):
+        if not renew_claim():
+            return False
+        db.exec(delete(TaskTagLink).where(TaskTagLink.task_id.in_(task_ids)))
+        db.exec(delete(TaskUserLink).where(TaskUserLink.task_id.in_(task_ids)))
+        db.exec(delete(TaskComment).where(TaskComment.task_id.in_(task_ids)))
+        db.exec(delete(Task).where(Task.id.in_(task_ids)))
+        db.commit()
+    activities_statement = select(TaskActivity.id).where(TaskActivity.board_id == board_id).limit(batch_size)
+    while activity_ids := list(db.exec(activities_statement)):
+        if not renew_claim():
+            return False
+        db.exec(delete(TaskActivity).where(TaskActivity.id.in_(activity_ids)))
+        db.commit()
 
+    if not renew_claim():
+        return False
+    db.exec(delete(TaskTag).where(TaskTag.board_id == board_id))
+    delete_task_counts_of_board(board_id=board_id, db=db)
+    db.exec(delete(TaskList).where(TaskList.board_id == board_id))
+    db.exec(delete(Board).where(Board.id == board_id))
+    db.commit()
+    return True
 
+def purge_deleted_boards(db: Session) -> int:
+    board_ids = list(db.exec(select(Board.id).where(Board.deleted_at.is_not(None))))
+    return sum(purge_board(board_id=board_id, db=db) for board_id in board_ids)
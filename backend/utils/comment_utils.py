@@ -0,0 +1,31 @@
+from typing import Optional
+
+from sqlmodel import Session, select, update
+
+from backend.models.comment import TaskComment
+from backend.models.task import Task
+from backend.schemas.pagination import PageParams
+from backend.utils.pagination_utils import paginate
+
+
+def get_comment_of_task(comment_id: int, task_id: int, db: Session) -> Optional[TaskComment]:
+    statement = select(TaskComment).where(TaskComment.id == comment_id, TaskComment.task_id == task_id)
+    return db.exec(statement).first()
+
+# oldest first, served by the (task_id, created_at) index
+def get_comments_of_task(task_id: int, page: PageParams, db: Session) -> tuple[list[TaskComment], Optional[str]]:
+    statement = select(TaskComment).where(TaskComment.task_id == task_id)
+    return paginate(statement, TaskComment.id, page, db, sort_column=TaskComment.created_at)
+
+# grouped by task and oldest first, served by the (task_id, created_at) index
+def get_comments_of_tasks(task_ids: list[int], db: Session) -> list[TaskComment]:
+    statement = (
+        select(TaskComment)
+        .where(TaskComment.task_id.in_(task_ids))
+        .order_by(TaskComment.task_id, TaskComment.created_at)
+    )
+    return list(db.exec(statement).all())
+
+# Applied in the transaction that adds or removes the comment, so the count never drifts from the rows
+def adjust_comment_count(task_id: int, delta: int, db: Session) -> None:
+    db.exec(update(Task).where(Task.id == task_id).values(comment_count=Task.comment_count + delta))
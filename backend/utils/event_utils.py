@@ -0,0 +1,238 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.config import EVENT_BACKEND, EVENT_BACKEND_PATH, EVENT_QUEUE_SIZE, EVENT_POLL_INTERVAL_SECONDS, \
+    EVENT_RETENTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# sent in place of the dropped events when a subscriber falls more than a queue behind,
+# the client should reload the board, a conditional GET is enough if nothing changed
+RESYNC_EVENT = "resync"
+BOARD_DELETED_EVENT = "board.deleted"
+# the last event of a stream whose user lost access to the board
+ACCESS_REVOKED_EVENT = "access.revoked"
+SUBSCRIBED_EVENT = "subscribed"
+
+Deliver = Callable[[int, str], None]
+
+
+# Delivers to the subscribers of this process only
+class LocalEventBackend:
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+
+    # controllers publish from the threadpool in sync mode, so delivery is handed to the loop
+    def publish(self, board_id: int, message: str) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._deliver, board_id, message)
+
+
+# Shares events between the workers of a host through an append-only table in a local SQLite file,
+# each worker polls it for rows newer than the last one it saw. A stand-in for a real broker such as
+# Redis pub/sub or Postgres LISTEN/NOTIFY when the workers span several hosts.
+class SQLiteEventBackend:
+    def __init__(self, path: str, poll_interval_seconds: float, retention_seconds: float):
+        self.path = path
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        self._deliver: Optional[Deliver] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._last_id = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS event "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, board_id INTEGER NOT NULL, message TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_event_created_at ON event (created_at)")
+        # only events published after this worker started are delivered
+        self._last_id = connection.execute("SELECT coalesce(max(id), 0) FROM event").fetchone()[0]
+        self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._poller:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+
+    def publish(self, board_id: int, message: str) -> None:
+        try:
+            self._connection().execute("INSERT INTO event (board_id, message, created_at) VALUES (?, ?, ?)",
+                                       (board_id, message, time.time()))
+        except sqlite3.Error:
+            logger.exception("Publishing board %s event failed", board_id)
+
+    def _read_new_events(self) -> list[tuple[int, int, str]]:
+        connection = self._connection()
+        rows = connection.execute("SELECT id, board_id, message FROM event WHERE id > ? ORDER BY id LIMIT 1000",
+                                  (self._last_id,)).fetchall()
+        connection.execute("DELETE FROM event WHERE created_at < ?", (time.time() - self.retention_seconds,))
+        return rows
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._read_new_events)
+            except sqlite3.Error:
+                logger.exception("Reading board events failed")
+                rows = []
+            for event_id, board_id, message in rows:
+                self._last_id = event_id
+                self._deliver(board_id, message)
+            if len(rows) < 1000:
+                await asyncio.sleep(self.poll_interval_seconds)
+
+
+class Subscription:
+    def __init__(self, board_id: int, max_queue_size: int):
+        self.board_id = board_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+
+    # Never blocks the publisher: a full queue is discarded and replaced by a single resync event
+    def offer(self, message: str) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(encode_event(RESYNC_EVENT, self.board_id, {"dropped": self.dropped}))
+            return False
+
+    async def get(self, timeout: Optional[float]) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    def __init__(self, backend: LocalEventBackend | SQLiteEventBackend, max_queue_size: int):
+        self.backend = backend
+        self.max_queue_size = max_queue_size
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    async def start(self) -> None:
+        await self.backend.start(self._fan_out)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+    # subscriptions are only touched on the event loop
+    def subscribe(self, board_id: int) -> Subscription:
+        subscription = Subscription(board_id, self.max_queue_size)
+        self._subscriptions[board_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.board_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.board_id]
+
+    def publish(self, board_id: int, event_type: str, data: Any) -> None:
+        with self._lock:
+            self.published += 1
+        self.backend.publish(board_id, encode_event(event_type, board_id, data))
+
+    def _fan_out(self, board_id: int, message: str) -> None:
+        for subscription in self._subscriptions.get(board_id, ()):
+            if subscription.offer(message):
+                self.delivered += 1
+            else:
+                self.overflows += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "boards": len(self._subscriptions),
+            "subscribers": sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+
+def encode_event(event_type: str, board_id: int, data: Any) -> str:
+    return json.dumps({"type": event_type, "board_id": board_id, "data": jsonable_encoder(data)})
+
+def create_event_broker() -> EventBroker:
+    if EVENT_BACKEND == "memory":
+        backend = LocalEventBackend()
+    elif EVENT_BACKEND == "sqlite":
+        backend = SQLiteEventBackend(path=EVENT_BACKEND_PATH, poll_interval_seconds=EVENT_POLL_INTERVAL_SECONDS,
+                                     retention_seconds=EVENT_RETENTION_SECONDS)
+    else:
+        raise ValueError(f"Unknown EVENT_BACKEND {EVENT_BACKEND}")
+    return EventBroker(backend=backend, max_queue_size=EVENT_QUEUE_SIZE)
+
+event_broker = create_event_broker()
+
+
+# Controllers call this after their commit, a rolled back write must not be announced
+def publish_board_event(board_id: int, event_type: str, data: Any = None) -> None:
+    event_broker.publish(board_id, event_type, data)
+
+# Yields each event of the board as it is published, or None after heartbeat_seconds without one.
+# The first event is "subscribed": a client should load the board only once it has arrived, so no
+# write can fall between its read and the stream. Ends after the board is deleted; messages start
+# with their type since encode_event writes it first. Access is only checked when the stream opens,
+# so has_access is awaited again on every heartbeat and before every member event: once it returns
+# False the stream ends with an "access.revoked" event, whichever worker changed the membership.
+async def iter_board_events(board_id: int, heartbeat_seconds: Optional[float],
+                            has_access: Optional[Callable[[], Awaitable[bool]]] = None):
+    board_deleted = encode_event(BOARD_DELETED_EVENT, board_id, None).split(",", 1)[0]
+    member_event = encode_event("member.", board_id, None).split('",', 1)[0]
+    subscription = event_broker.subscribe(board_id)
+    try:
+        yield encode_event(SUBSCRIBED_EVENT, board_id, None)
+        while True:
+            message = await subscription.get(timeout=heartbeat_seconds)
+            if has_access is not None and (message is None or message.startswith(member_event)) \
+                    and not await has_access():
+                yield encode_event(ACCESS_REVOKED_EVENT, board_id, None)
+                return
+            yield message
+            if message is not None and message.startswith(board_deleted):
+                return
+    finally:
+        event_broker.unsubscribe(subscription)
@@ -1,6 +1,8 @@
 from sqlmodel import Session, select
 
 from backend.models.invitation import Invitation, InvitationStatus
+from backend.schemas.pagination import PageParams
+from backend.utils.pagination_utils import paginate
 
 def get_invitation_of_user(invitation_id: int, user_id: int, db : Session) -> Invitation:
     invitation_statement = (
@@ -11,23 +13,21 @@ def get_invitation_of_user(invitation_id: int, user_id: int, db : Session) -> In
     invitation = db.exec(invitation_statement).first()
     return invitation
 
-def get_pending_invitations_for_user(user_id: int, db: Session) -> list[Invitation]:
+def get_pending_invitations_for_user(user_id: int, page: PageParams, db: Session):
     invitation_statement = (
         select(Invitation)
         .where(Invitation.invited_user_id == user_id)
         .where(Invitation.status == InvitationStatus.PENDING)
     )
-    pending_invitations =db.exec(invitation_statement).all()
-    return pending_invitations
+    return paginate(invitation_statement, id_column=Invitation.id, page=page, db=db)
 
-def get_past_invitations_for_user(user_id: int, db: Session) -> list[Invitation]:
+def get_past_invitations_for_user(user_id: int, page: PageParams, db: Session):
     invitation_statement = (
         select(Invitation)
         .where(Invitation.invited_user_id == user_id)
         .where(Invitation.status != InvitationStatus.PENDING)
     )
-    past_invitations =db.exec(invitation_statement).all()
-    return past_invitations
+    return paginate(invitation_statement, id_column=Invitation.id, page=page, db=db)
 
 def get_pending_board_invitation_of_user(board_id: int, user_id: int, db : Session) -> Invitation:
     invitation_statement = (
@@ -1,6 +1,13 @@
+from typing import Optional
+
+from sqlalchemy import delete
 from sqlmodel import Session, select, SQLModel
 
+from backend.models.relationships import UserBoardLink
+from backend.models.role import Role
 from backend.models.task_list import TaskList
+from backend.schemas.pagination import PageParams
+from backend.utils.pagination_utils import paginate
 
 
 def get_task_list_by_id( task_list_id: int, db : Session ) -> TaskList:
@@ -8,9 +15,25 @@ def get_task_list_by_id( task_list_id: int, db : Session ) -> TaskList:
     task_list = db.exec(statement).first()
     return task_list
 
-def get_lists_of_board(board_id: int, db: Session):
+def get_task_list_with_user_role(task_list_id: int, user_id: int, db: Session) -> tuple[Optional[TaskList], Optional[str]]:
+    statement = (
+        select(TaskList, Role.name)
+        .outerjoin(UserBoardLink, (UserBoardLink.board_id == TaskList.board_id) & (UserBoardLink.user_id == user_id))
+        .outerjoin(Role, Role.id == UserBoardLink.role_id)
+        .where(TaskList.id == task_list_id)
+    )
+    row = db.exec(statement).first()
+    if not row:
+        return None, None
+    return row[0], row[1]
+
+def get_lists_of_board(board_id: int, page: PageParams, db: Session):
     lists_statement = select(TaskList).where(TaskList.board_id == board_id)
-    lists = db.exec(lists_statement).all()
-    return lists
+    return paginate(lists_statement, id_column=TaskList.id, page=page, db=db, sort_column=TaskList.rank)
 
+def get_all_lists_of_board(board_id: int, db: Session) -> list[TaskList]:
+    return list(db.exec(select(TaskList).where(TaskList.board_id == board_id).order_by(TaskList.rank)).all())
 
+# a DELETE statement, so the ORM does not load the list's tasks to unlink them
+def delete_task_list(task_list_id: int, db: Session) -> None:
+    db.exec(delete(TaskList).where(TaskList.id == task_list_id))
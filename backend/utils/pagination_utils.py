@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Integer, String, TypeDecorator, and_, or_, tuple_
+from sqlalchemy.engine import Row
+from sqlmodel import Session
+
+from backend.schemas.pagination import PageParams
+
+
+def encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: list) -> list[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_decode_cursor_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+# The cursor comes from the client, so each value must have the type of its column before it reaches
+# the driver: an int for integer ids, a string for names and ranks, an ISO string for timestamps and a
+# number for scores. NULL is only allowed for a nullable sort column.
+def _decode_cursor_value(column, value: Any) -> Any:
+    if value is None:
+        if getattr(column, "nullable", False) is not True:
+            raise ValueError
+        return None
+    column_type = column.type.impl_instance if isinstance(column.type, TypeDecorator) else column.type
+    if isinstance(column_type, DateTime):
+        if not isinstance(value, str):
+            raise ValueError
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Integer):
+        valid = type(value) is int
+    elif isinstance(column_type, String):
+        valid = isinstance(value, str)
+    else:
+        valid = type(value) in (int, float)
+    if not valid:
+        raise ValueError
+    return value
+
+# Keyset pagination: rows are ordered by (sort_column, id_column) and each page continues strictly after
+# the last row of the previous one, so deep pages use the same index range scan as the first page.
+# The cursor values are read from a selected column of the same name, or else from the first entity of each row.
+def paginate(statement, id_column, page: PageParams, db: Session, sort_column=None,
+             descending: bool = False) -> tuple[list, Optional[str]]:
+    columns = [id_column] if sort_column is None else [sort_column, id_column]
+    if page.cursor:
+        values = decode_cursor(page.cursor, columns)
+        statement = statement.where(_after_cursor(columns, values, descending))
+    order = [column.desc() if descending else column.asc() for column in columns]
+    if getattr(sort_column, "nullable", False):
+        order[0] = order[0].nulls_last()
+    statement = statement.order_by(*order)
+    rows = db.exec(statement.limit(page.limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last_row = rows[-1]
+        if isinstance(last_row, Row):
+            last_entity, selected = last_row[0], last_row._mapping
+        else:
+            last_entity, selected = last_row, {}
+        next_cursor = encode_cursor([
+            selected[column.key] if column.key in selected else getattr(last_entity, column.key) for column in columns
+        ])
+    return rows, next_cursor
+
+# NULL sort values come after every other value in both directions, so a page continues either inside
+# the non-NULL range (and then into the NULLs) or inside the NULLs by id
+def _after_cursor(columns: list, values: list[Any], descending: bool):
+    def after(left, right):
+        return left < right if descending else left > right
+
+    if len(columns) == 1 or not getattr(columns[0], "nullable", False):
+        return after(tuple_(*columns), tuple_(*values))
+    sort_column, id_column = columns
+    sort_value, id_value = values
+    if sort_value is None:
+        return and_(sort_column.is_(None), after(id_column, id_value))
+    return or_(sort_column.is_(None), after(tuple_(sort_column, id_column), tuple_(sort_value, id_value)))
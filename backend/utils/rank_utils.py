@@ -0,0 +1,118 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from backend.utils.board_utils import bump_board_version
+from backend.utils.event_utils import publish_board_event
+
+# Ranks are base-36 fractions written without the leading "0." or trailing zeros, so comparing them
+# as strings orders them numerically. Digits and lowercase letters sort the same way under every
+# collation. Placing an item between two others only needs a new rank for that one item.
+RANK_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+RANK_BASE = len(RANK_DIGITS)
+RANK_WIDTH = 6
+# appended items are spaced this many units apart at RANK_WIDTH, leaving room to insert between them
+RANK_APPEND_GAP = RANK_BASE ** 2
+
+
+def _rank_to_int(rank: str, width: int) -> int:
+    return int(rank.ljust(width, "0"), RANK_BASE) if rank else 0
+
+def _int_to_rank(value: int, width: int) -> str:
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, RANK_BASE)
+        digits.append(RANK_DIGITS[digit])
+    return "".join(reversed(digits)).rstrip("0")
+
+# Returns count ascending ranks strictly between previous_rank and next_rank, None meaning an open end.
+# Appends and prepends step by a fixed gap instead of halving the rest of the space, so a list filled
+# from either end keeps ranks of RANK_WIDTH digits. Ranks for an empty range are spread over the lower half of the space.
+def ranks_between(previous_rank: Optional[str], next_rank: Optional[str], count: int = 1) -> list[str]:
+    if previous_rank is not None and next_rank is not None and previous_rank >= next_rank:
+        raise ValueError("previous_rank must sort before next_rank")
+
+    width = max(len(previous_rank or ""), len(next_rank or ""), RANK_WIDTH)
+    while True:
+        low = _rank_to_int(previous_rank, width)
+        if previous_rank is None and next_rank is not None:
+            high = _rank_to_int(next_rank, width)
+            gap = min(RANK_APPEND_GAP, high // (count + 1))
+            if gap >= 1:
+                return [_int_to_rank(high - (count - i) * gap, width) for i in range(count)]
+        elif next_rank is not None:
+            high = _rank_to_int(next_rank, width)
+            if high - low > count:
+                return [_int_to_rank(low + (high - low) * (i + 1) // (count + 1), width) for i in range(count)]
+        elif previous_rank is not None:
+            gap = min(RANK_APPEND_GAP, (RANK_BASE ** width - low) // (count + 1))
+            if gap >= 1:
+                return [_int_to_rank(low + (i + 1) * gap, width) for i in range(count)]
+        elif RANK_BASE ** width > 2 * (count + 1):
+            space = RANK_BASE ** width // 2
+            return [_int_to_rank((i + 1) * space // (count + 1), width) for i in range(count)]
+        width += 1
+
+def rank_between(previous_rank: Optional[str], next_rank: Optional[str]) -> str:
+    return ranks_between(previous_rank, next_rank)[0]
+
+# Fills in whichever neighbour the caller did not pin down with a single seek on the (scope, rank) index.
+# With neither given the item goes last.
+def get_neighbour_ranks(model, scope_column, scope_id: int, previous_rank: Optional[str], next_rank: Optional[str],
+                        db: Session, exclude_id: Optional[int] = None) -> tuple[Optional[str], Optional[str]]:
+    def scoped(statement):
+        statement = statement.where(scope_column == scope_id)
+        if exclude_id is not None:
+            statement = statement.where(model.id != exclude_id)
+        return statement
+
+    if previous_rank is None and next_rank is None:
+        previous_rank = db.exec(scoped(select(func.max(model.rank)))).first()
+    elif next_rank is None:
+        next_rank = db.exec(scoped(select(func.min(model.rank))).where(model.rank > previous_rank)).first()
+    elif previous_rank is None:
+        previous_rank = db.exec(scoped(select(func.max(model.rank))).where(model.rank < next_rank)).first()
+    return previous_rank, next_rank
+
+# Rank for putting an item (exclude_id when it already exists) between the given neighbours of the scope,
+# and whether the scope should be rebalanced. Two items only share a rank after concurrent inserts at the
+# same spot; the item then goes right after both and the caller rebalances the scope in the background,
+# so a move stays a single-row update.
+def get_rank_for_position(model, scope_column, scope_id: int, db: Session, previous_id: Optional[int] = None,
+                          next_id: Optional[int] = None, exclude_id: Optional[int] = None) -> tuple[str, bool]:
+    def get_neighbour_rank(item_id: Optional[int]) -> Optional[str]:
+        if item_id is None:
+            return None
+        rank = db.exec(select(model.rank).where(model.id == item_id).where(scope_column == scope_id)).first()
+        if rank is None or item_id == exclude_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid neighbour {item_id}")
+        return rank
+
+    previous_rank, next_rank = get_neighbour_ranks(model, scope_column, scope_id,
+                                                   previous_rank=get_neighbour_rank(previous_id),
+                                                   next_rank=get_neighbour_rank(next_id),
+                                                   db=db, exclude_id=exclude_id)
+    if previous_rank is not None and next_rank is not None and previous_rank > next_rank:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Previous neighbour must come before the next one")
+    if previous_rank is not None and previous_rank == next_rank:
+        _, next_rank = get_neighbour_ranks(model, scope_column, scope_id, previous_rank=previous_rank,
+                                           next_rank=None, db=db, exclude_id=exclude_id)
+        return rank_between(previous_rank, next_rank), True
+    return rank_between(previous_rank, next_rank), False
+
+# Rewrites every rank in the scope to evenly spaced short keys, keeping the current order. Pass the
+# board_id when running outside a request, so the rewritten ranks also change the board's version.
+def rebalance_ranks(model, scope_column, scope_id: int, db: Session, board_id: Optional[int] = None) -> None:
+    ids = db.exec(select(model.id).where(scope_column == scope_id).order_by(model.rank, model.id)).all()
+    if not ids:
+        return
+    ranks = ranks_between(None, None, count=len(ids))
+    db.execute(update(model), [{"id": item_id, "rank": rank} for item_id, rank in zip(ids, ranks)])
+    if board_id is not None:
+        bump_board_version(board_id=board_id, db=db)
+    db.commit()
+    if board_id is not None:
+        publish_board_event(board_id, "ranks.rebalanced", {"scope": model.__tablename__, "scope_id": scope_id})
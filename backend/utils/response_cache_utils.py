@@ -0,0 +1,31 @@
+from typing import Callable
+
+from pydantic import BaseModel
+
+from backend.config import RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_PATH, RESPONSE_CACHE_SIZE, \
+    RESPONSE_CACHE_TTL_SECONDS
+from backend.utils.cache_utils import TTLCache, SQLiteTTLCache, MISSING
+
+
+def create_response_cache() -> TTLCache | SQLiteTTLCache:
+    if RESPONSE_CACHE_BACKEND == "memory":
+        return TTLCache(max_size=RESPONSE_CACHE_SIZE, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+    if RESPONSE_CACHE_BACKEND == "sqlite":
+        return SQLiteTTLCache(path=RESPONSE_CACHE_PATH, max_size=RESPONSE_CACHE_SIZE,
+                              ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+    if RESPONSE_CACHE_BACKEND == "none":
+        return TTLCache(max_size=0, ttl_seconds=0)
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {RESPONSE_CACHE_BACKEND}")
+
+# key -> JSON body of a response
+response_cache = create_response_cache()
+
+
+# Keys embed a version that every write bumps, the board's version or the user's boards_version, so
+# a write invalidates its entries by making their keys unreachable; they then age out by TTL or LRU.
+def get_cached_json(key: str, build: Callable[..., BaseModel], **kwargs) -> bytes:
+    content = response_cache.get(key)
+    if content is MISSING:
+        content = build(**kwargs).model_dump_json().encode()
+        response_cache.set(key, content)
+    return content
@@ -1,7 +1,11 @@
+from typing import Optional
+
 from sqlmodel import Session, select
 
 from backend.models.role import Role
 
+role_ids_by_name: dict[str, int] = {}
+
 
 def get_role_by_name(role_name: str , db: Session):
     role_statement = select(Role).where(Role.name == role_name)
@@ -11,4 +15,16 @@ def get_role_by_name(role_name: str , db: Session):
 def get_role_by_id(role_id: int, db: Session):
     role_statement = select(Role).where(Role.id == role_id)
     role = db.exec(role_statement).first()
-    return role
\ No newline at end of file
+    return role
+
+def load_role_ids(db: Session) -> dict[str, int]:
+    roles = db.exec(select(Role)).all()
+    role_ids_by_name.clear()
+    role_ids_by_name.update({role.name: role.id for role in roles})
+    return role_ids_by_name
+
+# roles are static after initialization, so the map is only reloaded when a name is unknown
+def get_role_id_by_name(role_name: str, db: Session) -> Optional[int]:
+    if role_name not in role_ids_by_name:
+        load_role_ids(db)
+    return role_ids_by_name.get(role_name)
@@ -0,0 +1,161 @@
+import re
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, bindparam, column, func, literal_column, table, text, tuple_, union_all
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, select
+
+from backend.models.comment import TaskComment
+from backend.models.task import Task
+from backend.schemas.pagination import PageParams
+from backend.utils.pagination_utils import encode_cursor, decode_cursor
+
+SEARCH_LANGUAGE = "english"
+
+# Postgres keeps a generated tsvector next to each row and btree_gin lets the task index lead with
+# board_id, so a search only walks the postings of one board. SQLite uses external-content FTS5
+# tables kept in sync by triggers, with board_id indexed as a token for the same effect. Both are
+# maintained row by row on every write, bulk ones included.
+SEARCH_INDEX_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS btree_gin",
+        f"""ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(description, '')), 'B')
+        ) STORED""",
+        "CREATE INDEX IF NOT EXISTS ix_task_board_id_search_vector ON task USING GIN (board_id, search_vector)",
+        f"""ALTER TABLE taskcomment ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            to_tsvector('{SEARCH_LANGUAGE}', content)
+        ) STORED""",
+        "CREATE INDEX IF NOT EXISTS ix_taskcomment_search_vector ON taskcomment USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+            title, description, board_id, content='task', content_rowid='id', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+            INSERT INTO task_fts(rowid, title, description, board_id)
+            VALUES (new.id, new.title, new.description, new.board_id);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+            INSERT INTO task_fts(task_fts, rowid, title, description, board_id)
+            VALUES ('delete', old.id, old.title, old.description, old.board_id);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF title, description, board_id ON task BEGIN
+            INSERT INTO task_fts(task_fts, rowid, title, description, board_id)
+            VALUES ('delete', old.id, old.title, old.description, old.board_id);
+            INSERT INTO task_fts(rowid, title, description, board_id)
+            VALUES (new.id, new.title, new.description, new.board_id);
+        END""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS taskcomment_fts USING fts5(
+            content, content='taskcomment', content_rowid='id', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS taskcomment_fts_insert AFTER INSERT ON taskcomment BEGIN
+            INSERT INTO taskcomment_fts(rowid, content) VALUES (new.id, new.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS taskcomment_fts_delete AFTER DELETE ON taskcomment BEGIN
+            INSERT INTO taskcomment_fts(taskcomment_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS taskcomment_fts_update AFTER UPDATE OF content ON taskcomment BEGIN
+            INSERT INTO taskcomment_fts(taskcomment_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO taskcomment_fts(rowid, content) VALUES (new.id, new.content);
+        END""",
+    ],
+}
+
+# FTS5 tables created over existing rows start empty and have to be filled once
+SEARCH_INDEX_BACKFILL = {
+    "sqlite": [
+        "INSERT INTO task_fts(task_fts) VALUES ('rebuild')",
+        "INSERT INTO taskcomment_fts(taskcomment_fts) VALUES ('rebuild')",
+    ],
+}
+
+
+def create_search_indexes(connection: Connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        existing = connection.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE name IN ('task_fts', 'taskcomment_fts')"
+        ).scalar()
+    for statement in SEARCH_INDEX_DDL.get(dialect, []):
+        connection.exec_driver_sql(statement)
+    if dialect == "sqlite" and not existing:
+        for statement in SEARCH_INDEX_BACKFILL["sqlite"]:
+            connection.exec_driver_sql(statement)
+
+def _to_fts5_query(query: str) -> Optional[str]:
+    # every word quoted, so user input can never be parsed as FTS5 operators
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"' for word in words) if words else None
+
+def _get_hit_statements(board_id: int, query: str, dialect: str):
+    if dialect == "postgresql":
+        ts_query = func.websearch_to_tsquery(SEARCH_LANGUAGE, bindparam("query", query))
+        task_vector = literal_column("task.search_vector")
+        comment_vector = literal_column("taskcomment.search_vector")
+        task_hits = (
+            select(Task.id.label("task_id"), func.ts_rank(task_vector, ts_query).label("score"))
+            .where(Task.board_id == board_id)
+            .where(task_vector.op("@@")(ts_query))
+        )
+        comment_hits = (
+            select(TaskComment.task_id.label("task_id"), func.ts_rank(comment_vector, ts_query).label("score"))
+            .join(Task, Task.id == TaskComment.task_id)
+            .where(Task.board_id == board_id)
+            .where(comment_vector.op("@@")(ts_query))
+        )
+        return task_hits, comment_hits
+
+    if dialect == "sqlite":
+        fts_query = _to_fts5_query(query)
+        if fts_query is None:
+            return None
+        task_fts = table("task_fts", column("rowid"))
+        comment_fts = table("taskcomment_fts", column("rowid"))
+        # bm25 is lower for better matches; title counts more than description, board_id not at all
+        task_query = f'board_id : "{board_id}" AND {{title description}} : ({fts_query})'
+        task_hits = (
+            select(task_fts.c.rowid.label("task_id"),
+                   (-literal_column("bm25(task_fts, 10.0, 4.0, 0.0)", Float)).label("score"))
+            .where(text("task_fts MATCH :task_query").bindparams(task_query=task_query))
+        )
+        comment_hits = (
+            select(TaskComment.task_id.label("task_id"), (-literal_column("bm25(taskcomment_fts)", Float)).label("score"))
+            .select_from(comment_fts.join(TaskComment, TaskComment.id == comment_fts.c.rowid))
+            .join(Task, Task.id == TaskComment.task_id)
+            .where(Task.board_id == board_id)
+            .where(text("taskcomment_fts MATCH :comment_query").bindparams(comment_query=fts_query))
+        )
+        return task_hits, comment_hits
+
+    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Search is not supported on this database")
+
+# Tasks of the board matching the query in their title, description or comments, best first.
+# A task scores as its best hit and pages continue after the (score, task id) of the previous page.
+def search_tasks_of_board(board_id: int, query: str, page: PageParams, db: Session) -> tuple[list, Optional[str]]:
+    hit_statements = _get_hit_statements(board_id, query, db.get_bind().dialect.name)
+    if hit_statements is None:
+        return [], None
+
+    hits = union_all(*hit_statements).subquery("hits")
+    ranked = (
+        select(hits.c.task_id, func.max(hits.c.score).label("score"))
+        .group_by(hits.c.task_id)
+        .subquery("ranked")
+    )
+    statement = select(ranked.c.task_id, ranked.c.score)
+    columns = [ranked.c.score, ranked.c.task_id]
+    if page.cursor:
+        statement = statement.where(tuple_(*columns) < tuple_(*decode_cursor(page.cursor, columns)))
+    statement = statement.order_by(ranked.c.score.desc(), ranked.c.task_id.desc()).limit(page.limit + 1)
+    rows = db.exec(statement).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor([rows[-1].score, rows[-1].task_id])
+
+    tasks = {task.id: task for task in db.exec(select(Task).where(Task.id.in_([row.task_id for row in rows])))}
+    return [(tasks[row.task_id], row.score) for row in rows], next_cursor
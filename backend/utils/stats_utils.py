@@ -0,0 +1,83 @@
+from collections import Counter
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, literal, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from backend.models.task import Task, TaskPriority, TaskStatus
+from backend.models.task_count import TaskCount
+
+# (board_id, list_id, status, priority) -> change in the number of tasks
+TaskCountDeltas = Counter[tuple[int, int, TaskStatus, TaskPriority]]
+
+OPEN_STATUSES = [task_status for task_status in TaskStatus if task_status != TaskStatus.COMPLETED]
+
+
+def task_count_key(task) -> tuple[int, int, TaskStatus, TaskPriority]:
+    return task.board_id, task.list_id, TaskStatus(task.status), TaskPriority(task.priority or TaskPriority.NONE)
+
+def count_tasks(tasks: Iterable, sign: int = 1) -> TaskCountDeltas:
+    deltas = Counter()
+    for task in tasks:
+        deltas[task_count_key(task)] += sign
+    return deltas
+
+# The increments are applied with an upsert, so concurrent writers to the same list add up instead of
+# overwriting each other. Call it in the same transaction as the task change it accounts for.
+def adjust_task_counts(deltas: TaskCountDeltas, db: Session) -> None:
+    rows = [
+        {"board_id": board_id, "list_id": list_id, "status": task_status, "priority": priority, "count": delta}
+        for (board_id, list_id, task_status, priority), delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+    dialect_insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    statement = dialect_insert(TaskCount).values(rows)
+    db.exec(statement.on_conflict_do_update(
+        index_elements=[TaskCount.list_id, TaskCount.status, TaskCount.priority],
+        set_={"count": TaskCount.count + statement.excluded.count}
+    ))
+
+def delete_task_counts_of_list(list_id: int, db: Session) -> None:
+    db.exec(delete(TaskCount).where(TaskCount.list_id == list_id))
+
+def delete_task_counts_of_board(board_id: int, db: Session) -> None:
+    db.exec(delete(TaskCount).where(TaskCount.board_id == board_id))
+
+def get_task_counts_of_board(board_id: int, db: Session) -> list[TaskCount]:
+    counts_statement = select(TaskCount).where(TaskCount.board_id == board_id).where(TaskCount.count != 0)
+    return db.exec(counts_statement).all()
+
+# Overdue depends on the clock, so it is counted at read time; the (board_id, status, due_date) index
+# limits the scan to the open tasks that are already past due
+def get_overdue_counts_of_board(board_id: int, now: datetime, db: Session) -> dict[int, int]:
+    overdue_statement = (
+        select(Task.list_id, func.count())
+        .where(Task.board_id == board_id)
+        .where(Task.status.in_(OPEN_STATUSES))
+        .where(Task.due_date < now)
+        .group_by(Task.list_id)
+    )
+    return dict(db.exec(overdue_statement).all())
+
+# Rebuilds every counter from the task table with one GROUP BY. On Postgres the counter table is locked
+# against writers first: a writer that already adjusted counters has committed its tasks by the time
+# the lock is granted, and one that has not yet will apply its delta on top of the rebuilt rows.
+def rebuild_task_counts(db: Session) -> int:
+    if db.bind.dialect.name == "postgresql":
+        db.exec(text("LOCK TABLE taskcount IN EXCLUSIVE MODE"))
+    db.exec(delete(TaskCount))
+    # tasks without a priority are counted as NONE, grouped under the same key as the NONE ones
+    priority = func.coalesce(Task.priority, literal(TaskPriority.NONE, Task.priority.type))
+    counts_statement = (
+        select(Task.list_id, Task.status, priority, Task.board_id, func.count())
+        .group_by(Task.board_id, Task.list_id, Task.status, priority)
+    )
+    result = db.exec(insert(TaskCount).from_select(
+        ["list_id", "status", "priority", "board_id", "count"], counts_statement
+    ))
+    db.commit()
+    return result.rowcount
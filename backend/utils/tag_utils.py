@@ -0,0 +1,95 @@
+from typing import Optional
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from backend.models.relationships import UserBoardLink, TaskTagLink
+from backend.models.role import Role
+from backend.models.tag import TaskTag
+from backend.models.task import Task
+from backend.schemas.pagination import PageParams
+from backend.utils.pagination_utils import paginate
+
+
+def get_tag_with_user_role(tag_id: int, user_id: int, db: Session) -> tuple[Optional[TaskTag], Optional[str]]:
+    statement = (
+        select(TaskTag, Role.name)
+        .outerjoin(UserBoardLink, (UserBoardLink.board_id == TaskTag.board_id) & (UserBoardLink.user_id == user_id))
+        .outerjoin(Role, Role.id == UserBoardLink.role_id)
+        .where(TaskTag.id == tag_id)
+    )
+    row = db.exec(statement).first()
+    if not row:
+        return None, None
+    return row[0], row[1]
+
+def get_tag_of_board_by_name(board_id: int, name: str, db: Session) -> Optional[TaskTag]:
+    statement = select(TaskTag).where(TaskTag.board_id == board_id, TaskTag.name == name)
+    return db.exec(statement).first()
+
+def get_all_tags_of_board(board_id: int, db: Session) -> list[TaskTag]:
+    return list(db.exec(select(TaskTag).where(TaskTag.board_id == board_id).order_by(TaskTag.name)).all())
+
+# (task_id, tag_id) pairs, served by the primary key
+def get_tag_links_of_tasks(task_ids: list[int], db: Session) -> list[tuple[int, int]]:
+    statement = select(TaskTagLink.task_id, TaskTagLink.tag_id).where(TaskTagLink.task_id.in_(task_ids))
+    return list(db.exec(statement).all())
+
+# by name, served by the unique (board_id, name) index
+def get_tags_of_board(board_id: int, page: PageParams, db: Session) -> tuple[list[TaskTag], Optional[str]]:
+    statement = select(TaskTag).where(TaskTag.board_id == board_id)
+    return paginate(statement, TaskTag.id, page, db, sort_column=TaskTag.name)
+
+# driven by the (tag_id, task_id) index, which yields the task ids in page order, then a primary key lookup per task
+def get_tasks_of_tag(tag_id: int, page: PageParams, db: Session) -> tuple[list[Task], Optional[str]]:
+    statement = select(Task).where(Task.id.in_(select(TaskTagLink.task_id).where(TaskTagLink.tag_id == tag_id)))
+    return paginate(statement, Task.id, page, db)
+
+def get_tagged_task_ids(tag_id: int, task_ids: list[int], db: Session) -> set[int]:
+    statement = select(TaskTagLink.task_id).where(TaskTagLink.tag_id == tag_id, TaskTagLink.task_id.in_(task_ids))
+    return set(db.exec(statement).all())
+
+def adjust_tag_usage_count(tag_id: int, delta: int, db: Session) -> None:
+    db.exec(update(TaskTag).where(TaskTag.id == tag_id).values(usage_count=TaskTag.usage_count + delta))
+
+# One multi-row insert that skips the links a concurrent request has just added, so the usage count only
+# grows by the links this one created. Returns the ids of the tasks that were tagged.
+def insert_tag_links(tag_id: int, task_ids: list[int], db: Session) -> set[int]:
+    dialect_insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    statement = (
+        dialect_insert(TaskTagLink)
+        .values([{"tag_id": tag_id, "task_id": task_id} for task_id in task_ids])
+        .on_conflict_do_nothing(index_elements=[TaskTagLink.task_id, TaskTagLink.tag_id])
+        .returning(TaskTagLink.task_id)
+    )
+    inserted_ids = set(db.exec(statement).scalars().all())
+    adjust_tag_usage_count(tag_id=tag_id, delta=len(inserted_ids), db=db)
+    return inserted_ids
+
+# Returns the ids of the tasks that were untagged, the usage count only drops by those
+def delete_tag_links(tag_id: int, task_ids: list[int], db: Session) -> set[int]:
+    statement = (
+        delete(TaskTagLink)
+        .where(TaskTagLink.tag_id == tag_id, TaskTagLink.task_id.in_(task_ids))
+        .returning(TaskTagLink.task_id)
+    )
+    deleted_ids = set(db.exec(statement).scalars().all())
+    adjust_tag_usage_count(tag_id=tag_id, delta=-len(deleted_ids), db=db)
+    return deleted_ids
+
+def delete_tag_with_links(tag_id: int, db: Session) -> None:
+    db.exec(delete(TaskTagLink).where(TaskTagLink.tag_id == tag_id))
+    db.exec(delete(TaskTag).where(TaskTag.id == tag_id))
+
+# Called before the links of deleted tasks are removed, one grouped read and an update per tag they carried.
+# task_ids is a list or a SELECT of task ids.
+def release_tags_of_tasks(task_ids, db: Session) -> None:
+    statement = (
+        select(TaskTagLink.tag_id, func.count())
+        .where(TaskTagLink.task_id.in_(task_ids))
+        .group_by(TaskTagLink.tag_id)
+    )
+    for tag_id, count in db.exec(statement).all():
+        adjust_tag_usage_count(tag_id=tag_id, delta=-count, db=db)
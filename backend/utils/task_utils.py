@@ -1,6 +1,18 @@
+from typing import Optional
+
+from sqlalchemy import delete, exists, insert, update
 from sqlmodel import Session, select
 
+from backend.models.comment import TaskComment
+from backend.models.relationships import UserBoardLink, TaskTagLink, TaskUserLink
+from backend.models.role import Role
 from backend.models.task import Task
+from backend.schemas.pagination import PageParams
+from backend.schemas.task import TaskFilterParams, TaskSortField
+from backend.utils.pagination_utils import paginate
+from backend.utils.tag_utils import release_tags_of_tasks
+
+STREAM_BATCH_SIZE = 1000
 
 
 def get_task_by_id(task_id: int, db: Session):
@@ -8,12 +20,94 @@ def get_task_by_id(task_id: int, db: Session):
     task = db.exec(list_statement).first()
     return task
 
-def get_tasks_of_list(list_id: int, db: Session):
-    tasks_statement = select(Task).where(Task.list_id == list_id)
-    tasks = db.exec(tasks_statement).all()
-    return tasks
+def get_task_with_user_role(task_id: int, user_id: int, db: Session) -> tuple[Optional[Task], Optional[str]]:
+    statement = (
+        select(Task, Role.name)
+        .outerjoin(UserBoardLink, (UserBoardLink.board_id == Task.board_id) & (UserBoardLink.user_id == user_id))
+        .outerjoin(Role, Role.id == UserBoardLink.role_id)
+        .where(Task.id == task_id)
+    )
+    row = db.exec(statement).first()
+    if not row:
+        return None, None
+    return row[0], row[1]
+
+def get_tasks_of_board_by_ids(board_id: int, task_ids: list[int], db: Session) -> list[Task]:
+    statement = select(Task).where(Task.board_id == board_id).where(Task.id.in_(task_ids))
+    return list(db.exec(statement).all())
+
+# one multi-row INSERT ... RETURNING, the returned tasks are in the same order as the rows
+def bulk_insert_tasks(rows: list[dict], db: Session) -> list[Task]:
+    return list(db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows))
+
+# rows are dicts holding the task id and the columns to change, sent as a single executemany
+def bulk_update_tasks(rows: list[dict], db: Session) -> None:
+    db.execute(update(Task), rows)
+
+# removes the rows that reference the tasks first, one statement per table whatever the number of tasks.
+# task_ids is a list or a SELECT of task ids. Their activity is kept, it is the board's audit trail.
+def bulk_delete_tasks(task_ids, db: Session) -> None:
+    release_tags_of_tasks(task_ids=task_ids, db=db)
+    db.exec(delete(TaskTagLink).where(TaskTagLink.task_id.in_(task_ids)))
+    db.exec(delete(TaskUserLink).where(TaskUserLink.task_id.in_(task_ids)))
+    db.exec(delete(TaskComment).where(TaskComment.task_id.in_(task_ids)))
+    db.exec(delete(Task).where(Task.id.in_(task_ids)))
+
+# the list's tasks are selected through the list_id index by each statement, never loaded
+def delete_tasks_of_list(list_id: int, db: Session) -> None:
+    bulk_delete_tasks(task_ids=select(Task.id).where(Task.list_id == list_id), db=db)
+
+TASK_SORT_COLUMNS = {
+    TaskSortField.ID: None,
+    TaskSortField.RANK: Task.rank,
+    TaskSortField.CREATED_AT: Task.created_at,
+    TaskSortField.DUE_DATE: Task.due_date,
+}
+
+# Filters become WHERE clauses next to the board or list condition, so they are served by the
+# (board_id, status, due_date), (board_id, priority) and (board_id, due_date) indexes. The assignee
+# filter probes the link table's primary key per task; the tag filter reads the tag's tasks from the
+# (tag_id, task_id) index instead, so a rare tag does not walk every task of the board.
+def filter_tasks(tasks_statement, filters: TaskFilterParams):
+    if filters.status:
+        tasks_statement = tasks_statement.where(Task.status.in_(filters.status))
+    if filters.priority:
+        tasks_statement = tasks_statement.where(Task.priority.in_(filters.priority))
+    if filters.due_after is not None:
+        tasks_statement = tasks_statement.where(Task.due_date >= filters.due_after)
+    if filters.due_before is not None:
+        tasks_statement = tasks_statement.where(Task.due_date < filters.due_before)
+    if filters.creator_id is not None:
+        tasks_statement = tasks_statement.where(Task.creator_id == filters.creator_id)
+    if filters.assignee_id is not None:
+        # correlated on Task only, the statement may already select from TaskUserLink
+        tasks_statement = tasks_statement.where(exists().where(
+            TaskUserLink.task_id == Task.id, TaskUserLink.user_id == filters.assignee_id
+        ).correlate(Task))
+    if filters.tag_id is not None:
+        tasks_statement = tasks_statement.where(Task.id.in_(
+            select(TaskTagLink.task_id).where(TaskTagLink.tag_id == filters.tag_id)
+        ))
+    return tasks_statement
+
+def get_tasks_of_list(list_id: int, page: PageParams, db: Session, filters: Optional[TaskFilterParams] = None):
+    filters = filters or TaskFilterParams()
+    tasks_statement = filter_tasks(select(Task).where(Task.list_id == list_id), filters)
+    return paginate(tasks_statement, id_column=Task.id, page=page, db=db,
+                    sort_column=TASK_SORT_COLUMNS[filters.sort or TaskSortField.RANK], descending=filters.descending)
+
+def get_tasks_of_board(board_id: int, page: PageParams, db: Session, filters: Optional[TaskFilterParams] = None):
+    filters = filters or TaskFilterParams()
+    tasks_statement = filter_tasks(select(Task).where(Task.board_id == board_id), filters)
+    return paginate(tasks_statement, id_column=Task.id, page=page, db=db,
+                    sort_column=TASK_SORT_COLUMNS[filters.sort or TaskSortField.ID], descending=filters.descending)
 
-def get_tasks_of_board(board_id: int, db: Session):
-    tasks_statement = select(Task).where(Task.board_id == board_id)
-    tasks = db.exec(tasks_statement).all()
-    return tasks
\ No newline at end of file
+# yield_per makes the driver use a server-side cursor, so only one batch of rows is in memory at a time
+def iter_task_batches_of_board(board_id: int, db: Session, batch_size: int = STREAM_BATCH_SIZE):
+    tasks_statement = (
+        select(Task)
+        .where(Task.board_id == board_id)
+        .order_by(Task.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.exec(tasks_statement).partitions()
@@ -1,19 +1,42 @@
-from sqlmodel import Session, select
+import hashlib
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
 from datetime import datetime, UTC
 
-from backend.authentication.jwt_handler import verify_token
+from backend.config import REVOKED_TOKEN_CACHE_SIZE
 from backend.models.blacklistedtoken import BlacklistedToken
+from backend.utils.cache_utils import TTLCache
+from backend.utils.time_utils import utc_now
 
-def blacklist_refresh_token(token: str, expires_at: datetime, db: Session):
-    db_token = BlacklistedToken(token=token, expires_at=expires_at)
-    db.add(db_token)
-    db.commit()
+# ids this worker has seen revoked, kept until the token would have expired anyway
+revoked_token_ids = TTLCache(max_size=REVOKED_TOKEN_CACHE_SIZE, ttl_seconds=0)
+
+
+# tokens issued before jti was added are identified by a digest of the token itself
+def get_token_id(token: str, payload: dict) -> str:
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
 
-def check_blacklisted(token:str, db: Session):
-    existing_blacklist = db.exec(
-        select(BlacklistedToken).where(BlacklistedToken.token == token)
-    ).first()
+# The unique index on jti makes revoking and checking one atomic insert: returns False when the token
+# was already revoked, so a replayed refresh token is rejected without a separate lookup.
+def revoke_token(token_id: str, expires_at: datetime, db: Session) -> bool:
+    if revoked_token_ids.get(token_id, False):
+        return False
 
-    if existing_blacklist:
-        return True
-    return False
+    db.add(BlacklistedToken(jti=token_id, expires_at=expires_at))
+    try:
+        db.commit()
+        revoked = True
+    except IntegrityError:
+        db.rollback()
+        revoked = False
+
+    remaining_seconds = (expires_at - datetime.now(UTC)).total_seconds()
+    revoked_token_ids.set(token_id, True, ttl_seconds=remaining_seconds)
+    return revoked
+
+def purge_expired_revocations(db: Session) -> int:
+    result = db.exec(delete(BlacklistedToken).where(BlacklistedToken.expires_at < utc_now()))
+    db.commit()
+    return result.rowcount
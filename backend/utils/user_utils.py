@@ -1,5 +1,7 @@
 from sqlmodel import Session, select
 from backend.models.user import User
+from backend.schemas.pagination import PageParams
+from backend.utils.pagination_utils import paginate
 
 def email_exists(email:str, db : Session ) -> bool:
     statement = select(User).where(User.email == email)
@@ -18,3 +20,5 @@ def get_user_by_email( email: str, db : Session ) -> User:
     user = db.exec(statement).first()
     return user
 
+def get_all_users(page: PageParams, db: Session):
+    return paginate(select(User), id_column=User.id, page=page, db=db)
@@ -0,0 +1,62 @@
+# Measures per-request authentication overhead with and without the decoded token cache.
+#
+#   python -m benchmarks.auth_overhead_benchmark --requests 20000
+#
+# Runs in process: get_current_user is timed on its own, then through a minimal app whose route
+# depends on it both directly and via require_role, as the real routes do. No database is needed.
+import argparse
+import asyncio
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from backend.authentication import jwt_handler
+from backend.config import TOKEN_CACHE_SIZE
+from backend.authentication.jwt_handler import create_access_token, get_current_user
+from backend.dependencies.auth_dependencies import require_role
+from backend.schemas.authentication import TokenData
+from backend.utils.cache_utils import TTLCache
+
+
+def time_dependency(token: str, request_count: int) -> float:
+    async def run():
+        start = time.perf_counter()
+        for _ in range(request_count):
+            await get_current_user(token)
+        return time.perf_counter() - start
+    return asyncio.run(run())
+
+
+def time_requests(token: str, request_count: int) -> float:
+    app = FastAPI()
+
+    @app.get("/protected")
+    async def protected(_: TokenData = Depends(get_current_user), __: TokenData = Depends(require_role(["user"]))):
+        return None
+
+    headers = {"Authorization": f"Bearer {token}"}
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        for _ in range(request_count):
+            client.get("/protected", headers=headers)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "1", "roles": ["user"]})
+    for mode, cache_size in (("uncached", 0), ("cached", TOKEN_CACHE_SIZE)):
+        jwt_handler.token_cache = TTLCache(max_size=cache_size, ttl_seconds=0)
+        dependency_seconds = time_dependency(token, args.requests)
+        request_seconds = time_requests(token, args.requests // 10)
+        print(f"{mode:>8}: get_current_user {dependency_seconds / args.requests * 1e6:7.1f} us/call | "
+              f"request {request_seconds / (args.requests // 10) * 1e6:8.1f} us/request | "
+              f"hit rate {jwt_handler.token_cache.stats()['hit_rate']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_EMAIL = "bench@taskflow.local"
+BENCH_PASSWORD = "bench"
+
+SERVER_START_TIMEOUT_SECONDS = 30
+
+
+def seed_database(task_count: int) -> int:
+    from sqlmodel import Session
+
+    from backend.authentication.encryption import hash_password
+    from backend.database.db_config import engine
+    from backend.database.db_init import create_tables, initialize_roles_and_permissions
+    from backend.models.board import Board
+    from backend.models.relationships import UserBoardLink
+    from backend.models.task import Task
+    from backend.models.task_list import TaskList
+    from backend.models.user import User
+    from backend.utils.rank_utils import ranks_between, rank_between
+    from backend.utils.role_utils import get_role_by_name
+
+    create_tables()
+    initialize_roles_and_permissions()
+    with Session(engine) as db:
+        user = User(name="bench", email=BENCH_EMAIL, hashed_password=hash_password(BENCH_PASSWORD))
+        db.add(user)
+        db.flush()
+        board = Board(name="bench", owner_id=user.id)
+        db.add(board)
+        db.flush()
+        owner_role = get_role_by_name(role_name="owner", db=db)
+        db.add(UserBoardLink(user_id=user.id, board_id=board.id, role_id=owner_role.id))
+        task_list = TaskList(name="bench", board_id=board.id, rank=rank_between(None, None))
+        db.add(task_list)
+        db.flush()
+        db.add_all(
+            Task(title=f"task {i}", list_id=task_list.id, creator_id=user.id, board_id=board.id, due_date=None,
+                 rank=rank)
+            for i, rank in enumerate(ranks_between(None, None, count=task_count))
+        )
+        db.commit()
+        return board.id
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning",
+         "--backlog", "4096"],
+        env=env,
+        cwd=REPOSITORY_ROOT,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Server did not start")
+
+
+def use_throwaway_sqlite(database_url: str | None, async_database_url: str | None):
+    if not database_url:
+        database_file = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+        database_url = f"sqlite:///{database_file}"
+        async_database_url = f"sqlite+aiosqlite:///{database_file}"
+    os.environ["DATABASE_URL"] = database_url
+    if async_database_url:
+        os.environ["ASYNC_DATABASE_URL"] = async_database_url
+
+
+def latency_summary(latencies: list[float], elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+    }
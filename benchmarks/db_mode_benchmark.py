@@ -0,0 +1,73 @@
+# Compares the sync threadpool mode against DB_ASYNC mode under many concurrent connections.
+#
+#   python -m benchmarks.db_mode_benchmark --concurrency 500 --requests 5000
+#
+# Each mode is served by its own uvicorn process against the same seeded database. By default a
+# throwaway SQLite file is used; pass --database-url/--async-database-url to benchmark Postgres.
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.common import BENCH_EMAIL, BENCH_PASSWORD, latency_summary, seed_database, start_server, \
+    use_throwaway_sqlite
+
+
+async def run_load(base_url: str, path: str, request_count: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        login = await client.post("/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        latencies = []
+        errors = 0
+        remaining = iter(range(request_count))
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=headers)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {**latency_summary(latencies, elapsed), "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url")
+    parser.add_argument("--async-database-url")
+    args = parser.parse_args()
+
+    use_throwaway_sqlite(args.database_url, args.async_database_url)
+    board_id = seed_database(task_count=args.tasks)
+    path = f"/board/{board_id}/task"
+
+    print(f"GET {path}: {args.requests} requests, {args.concurrency} concurrent connections")
+    for mode, db_async in (("sync", "false"), ("async", "true")):
+        server = start_server(args.port, env={**os.environ, "DB_ASYNC": db_async})
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", path, args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{mode:>5}: {result['requests_per_second']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+              f"p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# Checks the query plan of every database helper in backend/utils against seeded data.
+#
+#   python -m benchmarks.explain_check --tasks 5000
+#
+# Each helper that takes a `db` session is called with sample arguments picked by parameter name,
+# inside a transaction that is rolled back. Every statement it issues is captured and explained;
+# a full table scan that is not listed in EXPECTED_SCANS fails the check. Postgres plans are taken
+# with enable_seqscan off, so a sequential scan there means no usable index exists, not that the
+# seeded tables are too small to bother. Exits non-zero when a scan is flagged.
+import argparse
+import importlib
+import inspect
+import pkgutil
+import re
+import sys
+from types import GeneratorType
+
+from benchmarks.common import seed_database, use_throwaway_sqlite
+
+# (helper, table) pairs that read a whole table by design
+EXPECTED_SCANS = {
+    ("get_all_users", "user"),
+    ("get_all_boards", "board"),
+    ("load_role_ids", "role"),
+    ("get_role_id_by_name", "role"),
+    # joinedload nests the link join, which SQLite materializes once per query rather than probing
+    ("get_board_with_tasks", "tasktaglink"),
+}
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?! USING)")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def seed_related_rows(board_id: int, db) -> dict:
+    from sqlmodel import select
+
+    from backend.models.invitation import Invitation
+    from backend.models.relationships import TaskTagLink, TaskUserLink
+    from backend.models.tag import TaskTag
+    from backend.models.task import Task
+    from backend.models.user import User
+
+    invited = User(name="invited", email="invited@taskflow.local", hashed_password="-")
+    db.add(invited)
+    db.flush()
+    owner_id = db.get(Task, 1).creator_id
+    db.add(Invitation(board_id=board_id, invited_user_id=invited.id, inviter_user_id=owner_id))
+    task_ids = list(db.exec(select(Task.id).where(Task.board_id == board_id).limit(10)))
+    tag = TaskTag(name="bench", board_id=board_id, usage_count=len(task_ids))
+    db.add(tag)
+    db.flush()
+    db.add_all(TaskTagLink(task_id=task_id, tag_id=tag.id) for task_id in task_ids)
+    db.add_all(TaskUserLink(task_id=task_id, user_id=owner_id) for task_id in task_ids)
+    db.commit()
+    return {"user_id": owner_id, "task_ids": task_ids}
+
+
+def sample_arguments(board_id: int, seeded: dict) -> dict:
+    from backend.models.task import TaskPriority, TaskStatus
+    from backend.schemas.pagination import PageParams
+    from backend.schemas.task import TaskFilterParams, TaskSortField
+    from backend.utils.time_utils import utc_now
+
+    task_ids = seeded["task_ids"]
+    return {
+        "board_id": board_id,
+        "user_id": seeded["user_id"],
+        "task_id": task_ids[0],
+        "task_ids": task_ids,
+        "task_list_id": 1,
+        "list_id": 1,
+        "invitation_id": 1,
+        "comment_id": 1,
+        "tag_id": 1,
+        "name": "bench",
+        "role_id": 1,
+        "role_name": "owner",
+        "email": "bench@taskflow.local",
+        "query": "task",
+        "page": PageParams(),
+        "filters": TaskFilterParams(status=[TaskStatus.BLOCKED], priority=[TaskPriority.CRITICAL],
+                                    due_after=utc_now(), assignee_id=seeded["user_id"], tag_id=1,
+                                    sort=TaskSortField.DUE_DATE),
+        "token_id": "explain-check",
+        "expires_at": utc_now(),
+        "now": utc_now(),
+    }
+
+
+def find_helpers():
+    import backend.utils
+
+    for module_info in pkgutil.iter_modules(backend.utils.__path__):
+        module = importlib.import_module(f"backend.utils.{module_info.name}")
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if function.__module__ != module.__name__ or name.startswith("_"):
+                continue
+            if "db" in inspect.signature(function).parameters:
+                yield module_info.name, name, function
+
+
+def explain(connection, statement: str, parameters) -> list[str]:
+    if connection.dialect.name == "postgresql":
+        cursor = connection.connection.cursor()
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        return [row[0] for row in cursor.fetchall()]
+    cursor = connection.connection.cursor()
+    cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[-1] for row in cursor.fetchall()]
+
+
+def find_scans(dialect: str, plan: list[str]) -> set[str]:
+    from sqlmodel import SQLModel
+
+    pattern = POSTGRES_SCAN if dialect == "postgresql" else SQLITE_SCAN
+    scans = set()
+    for line in plan:
+        match = pattern.search(line.strip())
+        if not match:
+            continue
+        # SQLAlchemy aliases tables as <name>_1; subqueries and FTS tables are not real tables
+        table = re.sub(r"_\d+$", "", match.group(1))
+        if table in SQLModel.metadata.tables:
+            scans.add(table)
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    use_throwaway_sqlite(args.database_url, None)
+    board_id = seed_database(task_count=args.tasks)
+
+    from sqlalchemy import event
+    from sqlmodel import Session
+
+    from backend.database.db_config import engine
+
+    with Session(engine) as db:
+        seeded = seed_related_rows(board_id, db)
+    arguments = sample_arguments(board_id, seeded)
+
+    flagged, skipped = [], []
+    for module_name, name, function in find_helpers():
+        parameters = inspect.signature(function).parameters
+        missing = [parameter for parameter in parameters.values() if parameter.name != "db"
+                   and parameter.name not in arguments and parameter.default is inspect.Parameter.empty]
+        if missing:
+            skipped.append(f"{module_name}.{name}")
+            continue
+
+        captured = []
+        with engine.connect() as connection:
+            def capture(_connection, _cursor, statement, statement_parameters, _context, executemany):
+                if statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+                    captured.append((statement, statement_parameters[0] if executemany else statement_parameters))
+
+            transaction = connection.begin()
+            event.listen(connection, "before_cursor_execute", capture)
+            try:
+                with Session(bind=connection, join_transaction_mode="create_savepoint") as db:
+                    result = function(**{key: arguments[key] for key in parameters if key in arguments}, db=db)
+                    if isinstance(result, GeneratorType):
+                        list(result)
+            except Exception as error:
+                print(f"  error {module_name}.{name}: {error!r}")
+            finally:
+                event.remove(connection, "before_cursor_execute", capture)
+            transaction.rollback()
+
+            for statement, statement_parameters in captured:
+                with connection.begin():
+                    plan = explain(connection, statement, statement_parameters)
+                unexpected = {table for table in find_scans(connection.dialect.name, plan)
+                              if (name, table) not in EXPECTED_SCANS}
+                if unexpected:
+                    flagged.append((f"{module_name}.{name}", unexpected, statement, plan))
+                if args.verbose:
+                    print(f"{module_name}.{name}: {' | '.join(plan)}")
+
+    for helper, tables, statement, plan in flagged:
+        print(f"FULL SCAN of {', '.join(sorted(tables))} in {helper}")
+        print(f"  {' '.join(statement.split())}")
+        for line in plan:
+            print(f"    {line}")
+    if skipped:
+        print(f"Skipped (no sample arguments): {', '.join(skipped)}")
+    print(f"{len(flagged)} unexpected full scan(s)")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
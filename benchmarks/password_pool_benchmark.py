@@ -0,0 +1,90 @@
+# Measures how a login storm affects unrelated reads, with bcrypt inline versus in the process pool.
+#
+#   python -m benchmarks.password_pool_benchmark --login-clients 50 --read-clients 50 --duration 20
+#
+# Login clients post to /login in a loop while read clients poll GET /board/{id}/task. Read latency
+# should stay flat in pool mode, with excess logins rejected with 503 instead of queueing.
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.common import BENCH_EMAIL, BENCH_PASSWORD, latency_summary, seed_database, start_server, \
+    use_throwaway_sqlite
+
+
+async def run_mixed_load(base_url: str, read_path: str, login_clients: int, read_clients: int,
+                         duration: float) -> dict:
+    limits = httpx.Limits(max_connections=login_clients + read_clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        login = await client.post("/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        login_latencies, read_latencies = [], []
+        rejected_logins = 0
+        deadline = time.monotonic() + duration
+
+        async def login_worker():
+            nonlocal rejected_logins
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.post("/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+                if response.status_code == 503:
+                    rejected_logins += 1
+                    await asyncio.sleep(0.05)
+                else:
+                    login_latencies.append(time.perf_counter() - start)
+
+        async def read_worker():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                await client.get(read_path, headers=headers)
+                read_latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(login_clients)),
+                             *(read_worker() for _ in range(read_clients)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "reads": latency_summary(read_latencies, elapsed),
+        "logins": latency_summary(login_latencies, elapsed) if login_latencies else None,
+        "rejected_logins": rejected_logins,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--login-clients", type=int, default=50)
+    parser.add_argument("--read-clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--db-async", action="store_true")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--database-url")
+    parser.add_argument("--async-database-url")
+    args = parser.parse_args()
+
+    use_throwaway_sqlite(args.database_url, args.async_database_url)
+    board_id = seed_database(task_count=20)
+    read_path = f"/board/{board_id}/task"
+
+    print(f"{args.login_clients} login clients + {args.read_clients} read clients for {args.duration}s")
+    for mode, workers in (("inline", 0), ("pool", args.workers)):
+        env = {**os.environ, "PASSWORD_HASH_WORKERS": str(workers), "DB_ASYNC": str(args.db_async).lower()}
+        server = start_server(args.port, env=env)
+        try:
+            result = asyncio.run(run_mixed_load(f"http://127.0.0.1:{args.port}", read_path, args.login_clients,
+                                                args.read_clients, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+        reads, logins = result["reads"], result["logins"]
+        print(f"{mode:>6}: reads {reads['requests_per_second']:7.1f} req/s p50 {reads['p50_ms']:7.1f} ms "
+              f"p99 {reads['p99_ms']:7.1f} ms | logins {logins['requests_per_second'] if logins else 0:6.1f} req/s "
+              f"p99 {logins['p99_ms'] if logins else 0:7.1f} ms rejected {result['rejected_logins']}")
+
+
+if __name__ == "__main__":
+    main()
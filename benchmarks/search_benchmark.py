@@ -0,0 +1,99 @@
+# Measures board search latency over a large seeded task table.
+#
+#   python -m benchmarks.search_benchmark --tasks 1000000 --boards 100
+#
+# Tasks get titles and descriptions drawn from a fixed vocabulary, so common and rare words both
+# occur. Searches run in process against the search helper, the same call the endpoint makes.
+import argparse
+import random
+from datetime import datetime, UTC
+import statistics
+import time
+
+from benchmarks.common import use_throwaway_sqlite
+
+VOCABULARY_SIZE = 5000
+SEED_CHUNK_SIZE = 10000
+
+
+def seed_tasks(task_count: int, board_count: int, vocabulary: list[str]) -> list[int]:
+    from sqlalchemy import insert
+    from sqlmodel import Session
+
+    from backend.database.db_config import engine
+    from backend.database.db_init import create_tables, initialize_roles_and_permissions
+    from backend.models.board import Board
+    from backend.models.task import Task
+    from backend.models.task_list import TaskList
+    from backend.utils.rank_utils import ranks_between
+
+    create_tables()
+    initialize_roles_and_permissions()
+    rng = random.Random(0)
+    # Zipf-like weights, so a few words are in many tasks and most are rare
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    with Session(engine) as db:
+        boards = [Board(name=f"board {i}", owner_id=1) for i in range(board_count)]
+        db.add_all(boards)
+        db.flush()
+        lists = [TaskList(name="list", board_id=board.id, rank="i") for board in boards]
+        db.add_all(lists)
+        db.flush()
+        ranks = ranks_between(None, None, count=SEED_CHUNK_SIZE)
+        for start in range(0, task_count, SEED_CHUNK_SIZE):
+            rows = []
+            for i in range(min(SEED_CHUNK_SIZE, task_count - start)):
+                task_list = lists[rng.randrange(board_count)]
+                rows.append({
+                    "title": " ".join(rng.choices(vocabulary, weights, k=4)),
+                    "description": " ".join(rng.choices(vocabulary, weights, k=12)),
+                    "status": "TODO",
+                    "created_at": datetime.now(UTC),
+                    "rank": ranks[i],
+                    "list_id": task_list.id,
+                    "creator_id": 1,
+                    "board_id": task_list.board_id,
+                })
+            db.execute(insert(Task), rows)
+            db.commit()
+        return [board.id for board in boards]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--boards", type=int, default=100)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    use_throwaway_sqlite(args.database_url, None)
+    vocabulary = [f"word{i}" for i in range(VOCABULARY_SIZE)]
+    start = time.perf_counter()
+    board_ids = seed_tasks(args.tasks, args.boards, vocabulary)
+    print(f"seeded {args.tasks} tasks in {args.boards} boards in {time.perf_counter() - start:.0f}s")
+
+    from sqlmodel import Session
+
+    from backend.database.db_config import engine
+    from backend.schemas.pagination import PageParams
+    from backend.utils.search_utils import search_tasks_of_board
+
+    rng = random.Random(1)
+    page = PageParams()
+    with Session(engine) as db:
+        for label, words in (("common word", vocabulary[:10]), ("rare word", vocabulary[-1000:]),
+                             ("two words", None)):
+            latencies = []
+            for _ in range(args.searches):
+                query = " ".join(rng.sample(vocabulary[:100], 2)) if words is None else rng.choice(words)
+                search_start = time.perf_counter()
+                search_tasks_of_board(board_id=rng.choice(board_ids), query=query, page=page, db=db)
+                latencies.append(time.perf_counter() - search_start)
+            latencies.sort()
+            print(f"{label:>12}: p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+                  f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
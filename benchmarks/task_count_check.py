@@ -0,0 +1,57 @@
+# Checks that rebuild_task_counts reproduces the counters the write paths maintain.
+#
+#   python -m benchmarks.task_count_check --tasks 500
+#
+# Seeds a board, gives its tasks a mix of statuses and priorities, including tasks without a priority
+# next to tasks whose priority is NONE in the same list, rebuilds the counters and compares them with
+# count_tasks over the task table. Exits non-zero when a counter differs or the rebuild fails.
+import argparse
+import sys
+
+from benchmarks.common import seed_database, use_throwaway_sqlite
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    use_throwaway_sqlite(args.database_url, None)
+    board_id = seed_database(task_count=args.tasks)
+
+    from sqlmodel import Session, select
+
+    from backend.database.db_config import engine
+    from backend.models.task import Task, TaskPriority, TaskStatus
+    from backend.models.task_count import TaskCount
+    from backend.utils.stats_utils import count_tasks, rebuild_task_counts
+
+    statuses, priorities = list(TaskStatus), [None, *TaskPriority]
+    with Session(engine) as db:
+        tasks = db.exec(select(Task).where(Task.board_id == board_id)).all()
+        for i, task in enumerate(tasks):
+            task.status = statuses[i % len(statuses)]
+            task.priority = priorities[i // len(statuses) % len(priorities)]
+        db.commit()
+
+        try:
+            rebuild_task_counts(db=db)
+        except Exception as error:
+            print(f"rebuild_task_counts failed: {error!r}")
+            sys.exit(1)
+        expected = dict(count_tasks(db.exec(select(Task)).all()))
+        rebuilt = {
+            (row.board_id, row.list_id, TaskStatus(row.status), TaskPriority(row.priority)): row.count
+            for row in db.exec(select(TaskCount)).all()
+        }
+
+    mismatched = sorted(set(expected.items()) ^ set(rebuilt.items()))
+    for key, count in mismatched:
+        print(f"  {'expected' if expected.get(key) == count else 'rebuilt'} {key}: {count}")
+    print(f"{len(mismatched)} mismatched counter(s)")
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()